@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+notion_writer 端到端检查：在本地模拟 Notion（mock_notion.py）上依次写入同一天的日报，
+每一步之后读回页面内容，确认与 Markdown 转换出的 block 完全一致（类型、文本、顺序）
+
+步骤：创建 → 原样重写（不应有改动）→ 修改中间一行 → 中间插入 → 末尾追加 → 删除
+→ 开头重复标题（第一个 block 不变，但新 block 插在它前面）→ 开头插入 → 开头修改 → 开头删除
+→ 外部删除后修改（记录中的 block 被手动删掉）→ 清空后重新写入。可以增量完成的步骤同时检查新增 / 修改 / 删除的 block 数，不能退化成整体重写。
+
+使用临时 HOME（配置、notion_state.json 都是新的），不需要网络和真实 token。
+
+用法:
+  python check_notion_writer.py [-v]
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent / "scripts"
+DATE = "2026-01-15"
+
+BASE = """# 工作日报 - 2026-01-15
+
+## 今日完成
+- 完成 **登录模块** 重构
+- 修复分页接口的边界问题
+- 补充缓存淘汰的文档
+
+## 进行中
+1. 全分支扫描
+2. watch 模式
+
+---
+
+> 明天继续优化 Notion 写入
+"""
+
+
+def _edit(markdown, old, new):
+    assert old in markdown, old
+    return markdown.replace(old, new, 1)
+
+
+def _steps():
+    """
+    每一步在上一步的内容上修改，都是对同一页面的增量写入
+
+    返回 [(名称, markdown, 期望的计数, before)]，期望的计数只列出需要检查的项（None 表示不检查），
+    用于确认可以增量完成的改动没有退化成整体重写；before(base_url, page_id) 在写入前
+    直接改动页面，模拟用户在 Notion 里的手动编辑。
+    """
+    steps = []
+    add = lambda name, markdown, expect=None, before=None: steps.append((name, markdown, expect, before))
+    last = lambda: steps[-1][1]
+    add("创建页面", BASE)
+    add("原样重写", BASE, {"appended": 0, "updated": 0, "deleted": 0})
+    add("修改中间一行", _edit(last(), "修复分页接口的边界问题", "修复分页接口的边界问题（含单测）"),
+        {"appended": 0, "updated": 1, "deleted": 0})
+    add("中间插入", _edit(last(), "- 补充缓存淘汰的文档\n",
+                          "- 补充缓存淘汰的文档\n- 新增 mock_notion 替身服务\n- 新增检查脚本\n"),
+        {"appended": 2, "updated": 0, "deleted": 0})
+    add("末尾追加", last() + "\n### 备注\n周五前完成评审\n", {"appended": 2, "updated": 0, "deleted": 0})
+    add("删除", _edit(last(), "## 进行中\n1. 全分支扫描\n2. watch 模式\n", ""),
+        {"appended": 0, "updated": 0, "deleted": 3})
+    # 第一个 block 没变，但 difflib 把旧内容整体对齐到后面：插入发生在页首之前，只能整体重写
+    add("开头重复标题", "# 工作日报 - 2026-01-15\n\n> 上午的记录如下\n\n" + last())
+    add("开头插入", "> 今天主要在做性能优化\n\n" + last())
+    add("开头修改", _edit(last(), "> 今天主要在做性能优化", "> 今天主要在做性能和稳定性优化"),
+        {"appended": 0, "updated": 1, "deleted": 0})
+    add("开头删除", _edit(last(), "> 今天主要在做性能和稳定性优化\n\n", ""),
+        {"appended": 0, "updated": 0, "deleted": 1})
+    # 记录中的 block 被手动删掉后再修改它：回退为整体重写，不能在页面上留下第二份内容
+    add("外部删除后修改", _edit(last(), "完成 **登录模块** 重构", "完成 **登录模块** 重构与评审"),
+        before=lambda base_url, page_id: _delete_block_containing(base_url, page_id, "登录模块"))
+    add("清空", "")
+    add("重新写入", BASE)
+    return steps
+
+
+STEPS = _steps()
+
+
+def _setup():
+    """临时 HOME + 模拟服务（NOTION_API_URL 必须在导入 notion_writer 之前设置）"""
+    home = tempfile.mkdtemp(prefix="notion-check-")
+    os.environ["HOME"] = home
+    sys.path.insert(0, str(BENCH_DIR))
+    import mock_notion
+    server, base_url = mock_notion.start_server()
+    os.environ["NOTION_API_URL"] = base_url
+
+    config_dir = Path(home) / ".config" / "github-daily-report"
+    config_dir.mkdir(parents=True)
+    with open(config_dir / "config.json", "w") as f:
+        json.dump({"notion_token": "secret_check", "notion_database_id": "db-check"}, f)
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    return server, base_url
+
+
+def _get(url):
+    from urllib.request import urlopen
+    with urlopen(url) as response:
+        return json.load(response)
+
+
+def _delete_block_containing(base_url, page_id, text):
+    """绕过 notion_writer 直接删除页面上第一个包含 text 的 block"""
+    from urllib.request import Request, urlopen
+    for block in _get(f"{base_url}/blocks/{page_id}/children?page_size=100")["results"]:
+        if text in _plain(block)[1]:
+            with urlopen(Request(f"{base_url}/blocks/{block['id']}", method="DELETE")):
+                return
+    raise AssertionError(f"页面上没有包含 {text} 的 block")
+
+
+def _plain(block):
+    """block 的 (类型, 纯文本, 粗体片段)，用于比较页面内容"""
+    block_type = block["type"]
+    rich_text = block[block_type].get("rich_text", [])
+    text = "".join(r["text"]["content"] for r in rich_text)
+    bold = [r["text"]["content"] for r in rich_text if (r.get("annotations") or {}).get("bold")]
+    return block_type, text, bold
+
+
+def page_content(base_url, page_id):
+    """读回页面的全部子 block（跟随分页）"""
+    blocks = []
+    cursor = None
+    while True:
+        url = f"{base_url}/blocks/{page_id}/children?page_size=100"
+        if cursor:
+            url += f"&start_cursor={cursor}"
+        result = _get(url)
+        blocks.extend(result["results"])
+        if not result["has_more"]:
+            return [_plain(b) for b in blocks]
+        cursor = result["next_cursor"]
+
+
+def _quiet(func, *args):
+    """执行 func 时不打印 notion_writer 的进度输出"""
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def main():
+    verbose = "-v" in sys.argv[1:]
+    server, base_url = _setup()
+    import notion_writer
+
+    failures = 0
+    page_id = None
+    for name, markdown, expect, before in STEPS:
+        if before:
+            before(base_url, page_id)
+        if verbose:
+            stats = notion_writer.write_report(DATE, markdown)
+        else:
+            stats = _quiet(notion_writer.write_report, DATE, markdown)
+        pages = notion_writer._request("POST", "/databases/db-check/query", "secret_check",
+                                       {"filter": {"property": "日期", "date": {"equals": DATE}}})["results"]
+        if page_id is None:
+            page_id = pages[0]["id"]
+        expected = [_plain(b) for b in notion_writer.markdown_to_blocks(markdown)]
+        actual = page_content(base_url, page_id)
+        ok = len(pages) == 1 and pages[0]["id"] == page_id and actual == expected
+        summary = (f"新增 {stats['appended']} 修改 {stats['updated']} "
+                   f"删除 {stats['deleted']} 未变 {stats['unchanged']}")
+        print(f"{'✅' if ok else '❌'} {name:<8} {len(actual):>3} 个 block  {summary}")
+        if not ok:
+            failures += 1
+            for i in range(max(len(expected), len(actual))):
+                want = expected[i] if i < len(expected) else None
+                got = actual[i] if i < len(actual) else None
+                if want != got:
+                    print(f"     #{i}: 期望 {want}")
+                    print(f"     #{i}: 实际 {got}")
+        wrong = {k: stats[k] for k, v in (expect or {}).items() if stats[k] != v}
+        if wrong:
+            print(f"     ❌ 计数与期望不符：{wrong}，期望 {expect}")
+            failures += 1
+
+    server.shutdown()
+    if failures:
+        print(f"\n❌ {failures} 个步骤的页面内容不正确")
+        sys.exit(1)
+    print(f"\n✅ 全部 {len(STEPS)} 个步骤的页面内容正确")
+
+
+if __name__ == "__main__":
+    main()
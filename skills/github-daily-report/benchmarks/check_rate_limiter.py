@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+rate_limiter 配额统计检查：在本地模拟 GitHub（mock_github.py）上并发发出 N 个新请求和
+M 个命中 ETag 缓存的条件请求（304 不扣配额），确认报告的消耗配额恰好为 N
+
+并发响应的到达顺序与服务端扣减配额的顺序不同，只看最后到达的 X-RateLimit-Remaining
+会少算或多算；多轮运行（每轮打乱请求顺序）都要得到准确的 N。
+
+用法:
+  python check_rate_limiter.py [--fresh 40] [--cached 40] [--rounds 5]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent / "scripts"
+
+
+def _setup(repos):
+    """临时 HOME（冷的 ETag 缓存）+ 模拟服务（GITHUB_API_URL 必须在导入 github_client 之前设置）"""
+    home = tempfile.mkdtemp(prefix="rate-check-")
+    os.environ["HOME"] = home
+    sys.path.insert(0, str(BENCH_DIR))
+    import mock_github
+    server, base_url = mock_github.start_server(mock_github.Scale(repos=repos, active=repos, commits=repos))
+    os.environ["GITHUB_API_URL"] = base_url
+
+    config_dir = Path(home) / ".config" / "github-daily-report"
+    config_dir.mkdir(parents=True)
+    with open(config_dir / "config.json", "w") as f:
+        json.dump({"github_token": "t", "github_username": mock_github.USER, "max_concurrency": 16}, f)
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    return server, mock_github.USER
+
+
+def run_round(paths, fresh, cached):
+    """用一个新的调度器并发请求 fresh（首次）和 cached（已缓存）路径，返回报告的消耗配额"""
+    import github_client
+    from fetch_engine import map_unordered
+    github_client._limiter = None
+    mixed = [(p, True) for p in fresh] + [(p, False) for p in cached]
+    random.shuffle(mixed)
+    statuses = {}
+    for (path, _), response in map_unordered(lambda item: github_client.get(item[0], params={"per_page": 1}),
+                                             mixed):
+        statuses[path] = getattr(response, "from_cache", False)
+    assert all(statuses[p] for p in cached), "缓存的请求没有得到 304"
+    assert not any(statuses[p] for p in fresh), "新请求意外命中缓存"
+    return github_client.get_limiter().used(), github_client.get_limiter().summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="检查并发请求下的配额统计")
+    parser.add_argument("--fresh", type=int, default=40, help="每轮的新请求数 N")
+    parser.add_argument("--cached", type=int, default=40, help="每轮命中缓存（304）的请求数 M")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    total = args.cached + args.fresh * args.rounds
+    server, user = _setup(total)
+    import github_client
+    paths = [f"/repos/{user}/repo-{i:04d}/commits" for i in range(total)]
+    cached, rest = paths[:args.cached], paths[args.cached:]
+    for path in cached:
+        github_client.get(path, params={"per_page": 1})
+
+    failures = 0
+    for n in range(args.rounds):
+        fresh = rest[n * args.fresh:(n + 1) * args.fresh]
+        used, summary = run_round(paths, fresh, cached)
+        ok = used == len(fresh)
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} 第 {n + 1} 轮：{len(fresh)} 个新请求 + {len(cached)} 个 304，报告消耗 {used}（{summary}）")
+
+    used, summary = run_round(paths, [], cached)
+    ok = used == 0
+    failures += not ok
+    print(f"{'✅' if ok else '❌'} 全部 304：报告消耗 {used}（{summary}）")
+
+    server.shutdown()
+    if failures:
+        print(f"\n❌ {failures} 轮的配额统计不正确")
+        sys.exit(1)
+    print("\n✅ 配额统计与实际扣减一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+"""
+本地模拟 GitHub API：按指定规模生成账号数据，供基准测试使用
+
+数据完全由参数决定（同样的参数每次生成同样的 sha、时间和文件），不需要网络和真实 token。
+
+- 仓库：repos 个，其中 active 个今天有 push（pushed_at 为今天），其余为一周前
+- commits：今天共 commits 个，轮流分配到活跃仓库，时间均匀分布在今天 00:00 到启动时刻之间
+- 文件：每 large_every 个 commit 中有一个改动 files_max 个文件，其余 1 ~ 8 个；
+  详情接口与 GitHub 一样每页最多 300 个文件，超出部分通过 Link 翻页
+- 分支：每个活跃仓库另有 branches 个功能分支，一半今天有 3 个独有 commits（从 main 中间分出），
+  一半一周前之后就没有更新；/repos/{repo}/commits 支持 sha=（分支名或 sha），分支列表只通过
+  GraphQL refs 提供（与 GitHub 默认一样按名称排序，不按提交时间）
+- 事件：/users/{user}/events 为每个活跃仓库给出一个 PushEvent，带 X-Poll-Interval；
+  POST /_push 模拟一次新的 push（追加 commits 和对应的 PushEvent），供 watch 模式测试
+- 延迟 / 限流：每个请求额外等待 latency_ms；每 rate_limit_every 个请求返回一次
+  403 二级限流（带 Retry-After）；配额 quota 用完后返回 X-RateLimit-Remaining: 0 的 403
+
+支持的接口：
+  GET  /users/{user}/repos   /user/repos   /search/commits
+  GET  /repos/{repo}/commits（sha / since / until / author / 分页）
+  GET  /repos/{repo}/commits/{sha}（files 分页）   /repos/{repo}/compare/{base}...{head}
+  GET  /users/{user}/events
+  POST /graphql（用户 ID 查询、带别名的 history 批量查询和 refs 分支列表）
+  GET  /_stats   POST /_reset   统计本次的请求数、传输字节数，并按接口分类
+  POST /_push {"repo": ..., "count": 1}   在仓库上追加 commits，返回新 commits（REST 格式）
+
+响应支持 ETag / If-None-Match（304）和 gzip 压缩，与真实 API 行为一致。
+
+用法:
+  python mock_github.py [--port 8765] [--repos 100] [--active 10] [--commits 200]
+                        [--files-max 3000] [--large-every 50] [--latency-ms 0]
+                        [--rate-limit-every 0] [--quota 5000]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, urlencode
+
+USER = "bench"
+PER_PAGE_MAX = 100
+FILES_PER_PAGE = 300
+HISTORY_PAGE = 100
+GZIP_MIN_SIZE = 1024
+
+
+class Scale:
+    """模拟账号的规模参数和由此生成的数据"""
+
+    def __init__(self, repos=10, active=None, commits=50, files_max=300, large_every=50,
+                 latency_ms=0, rate_limit_every=0, retry_after=1, quota=5000, poll_interval=60, branches=0,
+                 now=None):
+        self.repos = repos
+        self.active = min(repos, active if active is not None else 10)
+        self.commits = commits
+        self.files_max = files_max
+        self.large_every = large_every
+        self.latency_ms = latency_ms
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.quota = quota
+        self.poll_interval = poll_interval
+        self.feature_branches = branches
+        self.now = (now or datetime.now(timezone.utc)).replace(microsecond=0)
+        self.day_start = self.now.replace(hour=0, minute=0, second=0)
+        self.repo_names = [f"{USER}/repo-{i:04d}" for i in range(repos)]
+        self.repo_index = {name: i for i, name in enumerate(self.repo_names)}
+        self.lock = threading.Lock()
+        self._build()
+
+    def _build(self):
+        # 每个仓库的 commits，按时间倒序（与 REST 接口一致）
+        self.history = {name: [] for name in self.repo_names}
+        self.by_sha = {}
+        span = max(1, int((self.now - self.day_start).total_seconds()))
+        for k in range(self.commits if self.active else 0):
+            repo = self.repo_names[k % self.active]
+            seconds = span * k // max(1, self.commits)
+            sha = hashlib.sha1(f"{repo}:{k}".encode()).hexdigest()
+            files = self.files_max if self.large_every and k % self.large_every == self.large_every - 1 \
+                else 1 + k % 8
+            commit = {
+                "sha": sha,
+                "repo": repo,
+                "index": k,
+                "message": f"feat: change {k} in {repo.split('/')[1]}\n\nDetails of change {k}.",
+                "time": (self.day_start + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "files": files,
+            }
+            self.history[repo].insert(0, commit)
+            self.by_sha[sha] = commit
+
+        # 分支：main 与 history 是同一个列表，push 时一起更新
+        self.refs = {name: {"main": self.history[name]} for name in self.repo_names}
+        for repo in self.repo_names[:self.active]:
+            for j in range(self.feature_branches):
+                self._add_feature_branch(repo, f"feature-{j}", stale=j % 2 == 1)
+
+        # 每个活跃仓库一个 PushEvent（新的在前）
+        self.events = []
+        pushed = [r for r in self.repo_names if self.history[r]]
+        for repo in sorted(pushed, key=lambda r: self.history[r][0]["time"]):
+            self._add_event(repo, list(reversed(self.history[repo])))
+
+    def _add_feature_branch(self, repo, name, stale, count=3):
+        """从 main 中间分出的功能分支（stale 时只有一周前的独有 commits）"""
+        main = self.history[repo]
+        shared = [] if stale else main[len(main) // 2:]
+        if stale:
+            start = self.now - timedelta(days=7)
+            end = start + timedelta(hours=1)
+        else:
+            start = datetime.fromisoformat(shared[0]["time"].replace("Z", "+00:00")) if shared else self.day_start
+            end = self.now
+        unique = []
+        for i in range(count):
+            k = len(self.by_sha)
+            sha = hashlib.sha1(f"{repo}:{name}:{i}".encode()).hexdigest()
+            commit = {
+                "sha": sha,
+                "repo": repo,
+                "index": k,
+                "message": f"feat: {name} step {i} in {repo.split('/')[1]}\n\nWork in progress on {name}.",
+                "time": (start + (end - start) * (i + 1) / (count + 1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "files": 1 + k % 8,
+            }
+            unique.insert(0, commit)
+            self.by_sha[sha] = commit
+        self.refs[repo][name] = unique + shared
+
+    def branch_history(self, repo, ref):
+        """ref（分支名、分支 tip 或任意 commit 的 sha）开始的历史，新的在前；找不到时返回 None"""
+        refs = self.refs.get(repo, {})
+        if not ref:
+            return self.history[repo]
+        for name, history in refs.items():
+            if name == ref or (history and history[0]["sha"] == ref):
+                return history
+        for history in refs.values():
+            for i, c in enumerate(history):
+                if c["sha"] == ref:
+                    return history[i:]
+        return None
+
+    def _add_event(self, repo, commits):
+        """按 push 的顺序（旧的在前）记录一个 PushEvent"""
+        older = self.history[repo][len(commits):]
+        self.events.insert(0, {
+            "id": str(10 ** 10 + len(self.events)),
+            "type": "PushEvent",
+            "actor": {"login": USER},
+            "repo": {"name": repo},
+            "created_at": commits[-1]["time"],
+            "payload": {
+                "ref": "refs/heads/main",
+                "head": commits[-1]["sha"],
+                "before": older[0]["sha"] if older else "0" * 40,
+                "size": len(commits),
+                "commits": [{
+                    "sha": c["sha"],
+                    "author": {"email": f"{USER}@example.com", "name": USER},
+                    "message": c["message"],
+                    "distinct": True,
+                    "url": f"https://api.github.com/repos/{repo}/commits/{c['sha']}",
+                } for c in commits],
+            },
+        })
+
+    def push(self, repo, count=1):
+        """模拟一次 push：在 repo 上追加 count 个时间为当前时刻的 commits，返回新 commits（旧的在前）"""
+        with self.lock:
+            now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            commits = []
+            for _ in range(count):
+                k = len(self.by_sha)
+                sha = hashlib.sha1(f"{repo}:{k}".encode()).hexdigest()
+                commit = {
+                    "sha": sha,
+                    "repo": repo,
+                    "index": k,
+                    "message": f"feat: change {k} in {repo.split('/')[1]}\n\nDetails of change {k}.",
+                    "time": now,
+                    "files": 1 + k % 8,
+                }
+                self.history[repo].insert(0, commit)
+                self.by_sha[sha] = commit
+                commits.append(commit)
+            self._add_event(repo, commits)
+            return commits
+
+    def pushed_at(self, repo):
+        when = self.now if self.repo_index[repo] < self.active else self.now - timedelta(days=7)
+        return when.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def files(self, commit):
+        """commit 改动的文件（含 patch 文本，大小与改动行数成正比）"""
+        result = []
+        for i in range(commit["files"]):
+            additions = 1 + (commit["index"] + i) % 20
+            deletions = (commit["index"] + i) % 5
+            result.append({
+                "sha": hashlib.sha1(f"{commit['sha']}:{i}".encode()).hexdigest(),
+                "filename": f"src/module_{i % 37}/file_{i}.py",
+                "status": "modified",
+                "additions": additions,
+                "deletions": deletions,
+                "changes": additions + deletions,
+                "patch": "@@ -1,%d +1,%d @@\n" % (deletions, additions) + "+    value = compute(x)\n" * additions,
+            })
+        return result
+
+
+def rest_commit(commit):
+    return {
+        "sha": commit["sha"],
+        "html_url": f"https://github.com/{commit['repo']}/commit/{commit['sha']}",
+        "commit": {
+            "message": commit["message"],
+            "author": {"name": USER, "email": f"{USER}@example.com", "date": commit["time"]},
+            "committer": {"name": USER, "email": f"{USER}@example.com", "date": commit["time"]},
+        },
+        "author": {"login": USER},
+        "parents": [],
+    }
+
+
+class Stats:
+    """请求计数，按接口分类，线程安全"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.bytes = 0
+        self.not_modified = 0
+        self.throttled = 0
+        self.endpoints = {}
+
+    def add(self, endpoint, size, status):
+        with self.lock:
+            self.requests += 1
+            self.bytes += size
+            if status == 304:
+                self.not_modified += 1
+            elif status in (403, 429):
+                self.throttled += 1
+            entry = self.endpoints.setdefault(endpoint, {"requests": 0, "bytes": 0})
+            entry["requests"] += 1
+            entry["bytes"] += size
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "bytes": self.bytes,
+                "not_modified": self.not_modified,
+                "throttled": self.throttled,
+                "endpoints": {k: dict(v) for k, v in self.endpoints.items()},
+            }
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    scale = None
+    stats = None
+    counter = None
+
+    def log_message(self, *args):
+        pass
+
+    # ---- 响应 ----
+
+    def _next_request(self):
+        with self.counter["lock"]:
+            self.counter["n"] += 1
+            return self.counter["n"]
+
+    def _throttle(self, endpoint):
+        """按配置注入限流响应，返回 True 表示已经应答"""
+        scale = self.scale
+        n = self._next_request()
+        if scale.rate_limit_every and n % scale.rate_limit_every == 0:
+            self._send(endpoint, {"message": "You have exceeded a secondary rate limit."}, 403,
+                       {"Retry-After": str(scale.retry_after)})
+            return True
+        if self.counter["remaining"] <= 0:
+            self._send(endpoint, {"message": "API rate limit exceeded."}, 403)
+            return True
+        return False
+
+    def _rate_headers(self, charge):
+        with self.counter["lock"]:
+            if charge:
+                self.counter["remaining"] -= 1
+            remaining = max(0, self.counter["remaining"])
+        return {
+            "X-RateLimit-Limit": str(self.scale.quota),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(self.counter["reset"]),
+            "X-RateLimit-Resource": "core",
+        }
+
+    def _send(self, endpoint, obj, status=200, extra=None):
+        body = json.dumps(obj).encode("utf-8")
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        headers = dict(extra or {})
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            # 条件请求命中不消耗配额
+            status, body = 304, b""
+        headers.update(self._rate_headers(charge=status == 200))
+        headers["ETag"] = etag
+        if body and len(body) >= GZIP_MIN_SIZE and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body, 5)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(status)
+        if status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        self.stats.add(endpoint, len(body), status)
+
+    def _paged(self, endpoint, items, query, path, per_page_default=30, per_page_max=PER_PAGE_MAX, key=None,
+               headers=None):
+        """按 page / per_page 返回一页，并给出 GitHub 格式的 Link 头"""
+        per_page = min(int(query.get("per_page", [per_page_default])[0]), per_page_max)
+        page = int(query.get("page", ["1"])[0])
+        last = max(1, (len(items) + per_page - 1) // per_page)
+        base = {k: v[0] for k, v in query.items()}
+
+        def link(n):
+            return f"<http://{self.headers['Host']}{path}?{urlencode(dict(base, page=n))}>"
+
+        links = []
+        if page < last:
+            links += [link(page + 1) + '; rel="next"', link(last) + '; rel="last"']
+        if page > 1:
+            links += [link(1) + '; rel="first"', link(page - 1) + '; rel="prev"']
+        chunk = items[(page - 1) * per_page:page * per_page]
+        extra = dict(headers or {})
+        if links:
+            extra["Link"] = ", ".join(links)
+        return self._send(endpoint, key(chunk) if key else chunk, extra=extra)
+
+    # ---- 路由 ----
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        path = url.path
+        if path == "/_stats":
+            body = json.dumps(self.stats.snapshot()).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if self.scale.latency_ms:
+            time.sleep(self.scale.latency_ms / 1000)
+
+        endpoint = self._endpoint(path)
+        if self._throttle(endpoint):
+            return
+        handler = getattr(self, "_get_" + endpoint.replace("/", "_").replace("-", "_"), None)
+        if not handler:
+            return self._send(endpoint, {"message": "Not Found"}, 404)
+        m = re.match(r"/repos/([^/]+/[^/]+)(?:/commits/(\w+)|/compare/(\w+)\.\.\.(\w+))?", path)
+        return handler(path, query, m)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if path == "/_reset":
+            self.stats.reset()
+            return self._send("_reset", {"ok": True})
+        if path == "/_push":
+            if payload.get("repo") not in self.scale.history:
+                return self._send("_push", {"message": "Not Found"}, 404)
+            commits = self.scale.push(payload["repo"], int(payload.get("count", 1)))
+            return self._send("_push", [rest_commit(c) for c in commits])
+        if path != "/graphql":
+            return self._send("other", {"message": "Not Found"}, 404)
+        if self.scale.latency_ms:
+            time.sleep(self.scale.latency_ms / 1000)
+        if self._throttle("graphql"):
+            return
+        return self._send("graphql", {"data": self._graphql(payload.get("query", ""), payload.get("variables") or {})})
+
+    @staticmethod
+    def _endpoint(path):
+        if re.match(r"^/users/[^/]+/repos$", path):
+            return "user-repos"
+        if path == "/user/repos":
+            return "collaborator-repos"
+        if re.match(r"^/users/[^/]+/events$", path):
+            return "user-events"
+        if path == "/search/commits":
+            return "search-commits"
+        if re.match(r"^/repos/[^/]+/[^/]+/commits$", path):
+            return "commits"
+        if re.match(r"^/repos/[^/]+/[^/]+/commits/\w+$", path):
+            return "commit-detail"
+        if re.match(r"^/repos/[^/]+/[^/]+/compare/\w+\.\.\.\w+$", path):
+            return "compare"
+        return "other"
+
+    def _repo_entry(self, name):
+        return {"full_name": name, "name": name.split("/")[1], "pushed_at": self.scale.pushed_at(name),
+                "archived": False, "size": 100, "default_branch": "main", "private": False}
+
+    def _get_user_repos(self, path, query, m):
+        repos = sorted(self.scale.repo_names, key=self.scale.pushed_at, reverse=True)
+        return self._paged("user-repos", [self._repo_entry(r) for r in repos], query, path)
+
+    def _get_collaborator_repos(self, path, query, m):
+        return self._paged("collaborator-repos", [], query, path)
+
+    def _get_user_events(self, path, query, m):
+        events = self.scale.events if path.split("/")[2] == USER else []
+        return self._paged("user-events", list(events), query, path,
+                           headers={"X-Poll-Interval": str(self.scale.poll_interval)})
+
+    def _get_search_commits(self, path, query, m):
+        q = query.get("q", [""])[0]
+        author = re.search(r"author:(\S+)", q)
+        items = []
+        if not author or author.group(1) == USER:
+            for commit in sorted(self.scale.by_sha.values(), key=lambda c: c["time"], reverse=True):
+                items.append(dict(rest_commit(commit), repository={"full_name": commit["repo"]}))
+        total = len(items)
+        return self._paged("search-commits", items, query, path,
+                           key=lambda chunk: {"total_count": total, "incomplete_results": False, "items": chunk})
+
+    def _window(self, commits, since, until):
+        return [c for c in commits if (not since or c["time"] >= since) and (not until or c["time"] <= until)]
+
+    @staticmethod
+    def _iso(value):
+        if not value:
+            return None
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def _get_commits(self, path, query, m):
+        repo = m.group(1)
+        if repo not in self.scale.history:
+            return self._send("commits", {"message": "Not Found"}, 404)
+        ref = query.get("sha", [None])[0]
+        history = self.scale.branch_history(repo, ref)
+        if history is None:
+            return self._send("commits", {"message": f"No commit found for SHA: {ref}"}, 404)
+        author = query.get("author", [None])[0]
+        commits = [] if author and author != USER else history
+        commits = self._window(commits, self._iso(query.get("since", [None])[0]), self._iso(query.get("until", [None])[0]))
+        return self._paged("commits", [rest_commit(c) for c in commits], query, path)
+
+    def _get_commit_detail(self, path, query, m):
+        sha = m.group(2)
+        commit = self.scale.by_sha.get(sha) or next(
+            (c for s, c in self.scale.by_sha.items() if s.startswith(sha)), None)
+        if not commit:
+            return self._send("commit-detail", {"message": "No commit found"}, 422)
+        files = self.scale.files(commit)
+        additions = sum(f["additions"] for f in files)
+        deletions = sum(f["deletions"] for f in files)
+        body = dict(rest_commit(commit), stats={"additions": additions, "deletions": deletions,
+                                                "total": additions + deletions})
+        return self._paged("commit-detail", files, query, path, per_page_default=FILES_PER_PAGE,
+                           per_page_max=FILES_PER_PAGE, key=lambda chunk: dict(body, files=chunk))
+
+    def _get_compare(self, path, query, m):
+        repo, base, head = m.group(1), m.group(3), m.group(4)
+        history = list(reversed(self.scale.history.get(repo, [])))
+        shas = [c["sha"] for c in history]
+        if base not in shas or head not in shas:
+            return self._send("compare", {"message": "Not Found"}, 404)
+        between = history[shas.index(base) + 1:shas.index(head) + 1]
+        files = {}
+        for commit in between:
+            for f in self.scale.files(commit):
+                entry = files.setdefault(f["filename"], dict(f, additions=0, deletions=0, changes=0))
+                entry["additions"] += f["additions"]
+                entry["deletions"] += f["deletions"]
+                entry["changes"] += f["changes"]
+        return self._send("compare", {
+            "status": "ahead",
+            "ahead_by": len(between),
+            "total_commits": len(between),
+            "commits": [dict(rest_commit(c), parents=[{"sha": "0" * 40}]) for c in between],
+            "files": list(files.values())[:FILES_PER_PAGE],
+        })
+
+    # ---- GraphQL ----
+
+    def _graphql(self, query, variables):
+        if "user(login:" in query:
+            login = variables.get("login")
+            return {"user": {"id": f"U_{login}"} if login == USER else None}
+        if "refs(refPrefix:" in query:
+            return self._graphql_refs(variables)
+
+        since = self._iso(variables.get("since"))
+        until = self._iso(variables.get("until"))
+        author = (variables.get("author") or {}).get("id")
+        data = {}
+        parts = re.split(r"\n\s*(\w+): repository\(", query)[1:]
+        for alias, body in zip(parts[0::2], parts[1::2]):
+            owner = re.search(r'owner: "([^"]+)"', body).group(1)
+            name = re.search(r'name: "([^"]+)"', body).group(1)
+            cursor = re.search(r'after: "([^"]+)"', body)
+            repo = f"{owner}/{name}"
+            if repo not in self.scale.history:
+                data[alias] = None
+                continue
+            commits = [] if author and author != f"U_{USER}" else self.scale.history[repo]
+            commits = self._window(commits, since, until)
+            start = int(cursor.group(1)) if cursor else 0
+            page = commits[start:start + HISTORY_PAGE]
+            nodes = []
+            for c in page:
+                files = self.scale.files(c)
+                nodes.append({
+                    "oid": c["sha"],
+                    "message": c["message"],
+                    "url": f"https://github.com/{repo}/commit/{c['sha']}",
+                    "committedDate": c["time"],
+                    "additions": sum(f["additions"] for f in files),
+                    "deletions": sum(f["deletions"] for f in files),
+                    "changedFilesIfAvailable": len(files),
+                    "author": {"email": f"{USER}@example.com", "user": {"login": USER}},
+                })
+            has_next = start + HISTORY_PAGE < len(commits)
+            data[alias] = {"defaultBranchRef": {"target": {"history": {
+                "pageInfo": {"hasNextPage": has_next, "endCursor": str(start + HISTORY_PAGE) if has_next else None},
+                "nodes": nodes,
+            }}}}
+        return data
+
+    def _graphql_refs(self, variables):
+        """分支列表，按名称排序（GitHub 对分支不保证按提交时间排序），每页 100 个"""
+        repo = f"{variables.get('owner')}/{variables.get('name')}"
+        if repo not in self.scale.refs:
+            return {"repository": None}
+        tips = sorted((name, history[0]) for name, history in self.scale.refs[repo].items() if history)
+        start = int(variables.get("cursor") or 0)
+        has_next = start + HISTORY_PAGE < len(tips)
+        return {"repository": {"refs": {
+            "pageInfo": {"hasNextPage": has_next, "endCursor": str(start + HISTORY_PAGE) if has_next else None},
+            "nodes": [{"name": name, "target": {"oid": tip["sha"], "committedDate": tip["time"]}}
+                      for name, tip in tips[start:start + HISTORY_PAGE]],
+        }}}
+
+
+def start_server(scale, port=0):
+    """在后台线程启动模拟服务，返回 (server, base_url)"""
+    handler = type("BoundHandler", (Handler,), {
+        "scale": scale,
+        "stats": Stats(),
+        # 与 GitHub 一样，同一个配额窗口内的重置时间固定不变
+        "counter": {"lock": threading.Lock(), "n": 0, "remaining": scale.quota, "reset": int(time.time()) + 3600},
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def add_scale_arguments(parser):
+    parser.add_argument("--repos", type=int, default=10, help="仓库数")
+    parser.add_argument("--active", type=int, default=None, help="今天有 push 的仓库数（默认 10）")
+    parser.add_argument("--commits", type=int, default=50, help="今天的 commit 总数")
+    parser.add_argument("--files-max", type=int, default=300, help="大 commit 改动的文件数")
+    parser.add_argument("--large-every", type=int, default=50, help="每多少个 commit 出现一个大 commit（0 表示没有）")
+    parser.add_argument("--latency-ms", type=float, default=0, help="每个请求额外的延迟")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="每多少个请求注入一次 403 二级限流")
+    parser.add_argument("--retry-after", type=int, default=1, help="限流响应的 Retry-After 秒数")
+    parser.add_argument("--quota", type=int, default=5000, help="主配额")
+    parser.add_argument("--poll-interval", type=int, default=60, help="事件接口返回的 X-Poll-Interval 秒数")
+    parser.add_argument("--branches", type=int, default=0, help="每个活跃仓库的功能分支数（一半今天有更新）")
+
+
+def scale_from_args(args):
+    return Scale(repos=args.repos, active=args.active, commits=args.commits, files_max=args.files_max,
+                 large_every=args.large_every, latency_ms=args.latency_ms,
+                 rate_limit_every=args.rate_limit_every, retry_after=args.retry_after, quota=args.quota,
+                 poll_interval=args.poll_interval, branches=args.branches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟 GitHub API")
+    parser.add_argument("--port", type=int, default=8765)
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+    server, base_url = start_server(scale_from_args(args), args.port)
+    print(f"🧪 模拟 GitHub API: {base_url}（用户 {USER}，{args.repos} 个仓库，今天 {args.commits} 个 commits）")
+    print(f"   GITHUB_API_URL={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+本地模拟 Notion API：只实现 notion_writer.py 用到的接口，数据保存在内存里
+
+- 数据库：任意 database_id 都存在，按页面的日期属性（任意名称的 date 属性）查询
+- 页面：子 block 是一个有序列表；追加 children 时支持 after（插入到该 block 之后），
+  不带 after 时追加到末尾，与 Notion 一样没有 "插入到最前面"
+- 每次追加最多 100 个 children，after 不是页面的子 block 时返回 400；
+  已删除 / 不存在的 block 返回 404
+
+支持的接口（前缀 /v1）：
+  POST   /databases/{id}/query      /pages
+  GET    /blocks/{id}/children（page_size / start_cursor 分页）
+  PATCH  /blocks/{id}/children      /blocks/{id}
+  DELETE /blocks/{id}
+  GET    /_stats   POST /_reset   统计本次按方法分类的请求数
+
+用法:
+  python mock_notion.py [--port 8766]
+  NOTION_API_URL=http://127.0.0.1:8766/v1 python notion_writer.py --file report.md
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+MAX_CHILDREN = 100
+PAGE_SIZE_MAX = 100
+
+
+class Workspace:
+    """页面和 block 的内存存储，线程安全"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = {}       # page_id -> {"database_id", "properties", "children": [block_id]}
+        self.blocks = {}      # block_id -> block
+        self.parents = {}     # block_id -> page_id
+        self.requests = {}    # 方法 -> 请求数
+
+    def count(self, method):
+        with self.lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+
+    def reset_stats(self):
+        with self.lock:
+            self.requests = {}
+
+    def stats(self):
+        with self.lock:
+            return {"requests": sum(self.requests.values()), "methods": dict(self.requests)}
+
+
+def _page_date(properties):
+    for value in properties.values():
+        if isinstance(value, dict) and "date" in value:
+            return (value["date"] or {}).get("start")
+    return None
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    workspace = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, obj, status=200):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, code, message):
+        return self._send({"object": "error", "status": status, "code": code, "message": message}, status)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _route(self):
+        parsed = urlparse(self.path)
+        path = parsed.path
+        if path.startswith("/v1/"):
+            path = path[3:]
+        return path, parse_qs(parsed.query)
+
+    # ---- 分发 ----
+
+    def do_GET(self):
+        path, query = self._route()
+        if path == "/_stats":
+            return self._send(self.workspace.stats())
+        self.workspace.count("GET")
+        parts = path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "blocks" and parts[2] == "children":
+            return self._list_children(parts[1], query)
+        return self._error(404, "object_not_found", f"Unknown path {path}")
+
+    def do_POST(self):
+        path, _ = self._route()
+        body = self._body()
+        if path == "/_reset":
+            self.workspace.reset_stats()
+            return self._send({})
+        self.workspace.count("POST")
+        parts = path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "databases" and parts[2] == "query":
+            return self._query_database(parts[1], body)
+        if path == "/pages":
+            return self._create_page(body)
+        return self._error(404, "object_not_found", f"Unknown path {path}")
+
+    def do_PATCH(self):
+        path, _ = self._route()
+        body = self._body()
+        self.workspace.count("PATCH")
+        parts = path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "blocks" and parts[2] == "children":
+            return self._append_children(parts[1], body)
+        if len(parts) == 2 and parts[0] == "blocks":
+            return self._update_block(parts[1], body)
+        return self._error(404, "object_not_found", f"Unknown path {path}")
+
+    def do_DELETE(self):
+        path, _ = self._route()
+        self.workspace.count("DELETE")
+        parts = path.strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "blocks":
+            return self._delete_block(parts[1])
+        return self._error(404, "object_not_found", f"Unknown path {path}")
+
+    # ---- 接口 ----
+
+    def _query_database(self, database_id, body):
+        wanted = ((body.get("filter") or {}).get("date") or {}).get("equals")
+        ws = self.workspace
+        with ws.lock:
+            results = [{"object": "page", "id": page_id}
+                       for page_id, page in ws.pages.items()
+                       if page["database_id"] == database_id and _page_date(page["properties"]) == wanted]
+        return self._send({"object": "list", "results": results[:body.get("page_size", 100)], "has_more": False})
+
+    def _create_page(self, body):
+        database_id = (body.get("parent") or {}).get("database_id")
+        if not database_id:
+            return self._error(400, "validation_error", "parent.database_id is required")
+        page_id = str(uuid.uuid4())
+        with self.workspace.lock:
+            self.workspace.pages[page_id] = {
+                "database_id": database_id,
+                "properties": body.get("properties") or {},
+                "children": [],
+            }
+        return self._send({"object": "page", "id": page_id})
+
+    def _list_children(self, page_id, query):
+        ws = self.workspace
+        page_size = min(int(query.get("page_size", [PAGE_SIZE_MAX])[0]), PAGE_SIZE_MAX)
+        with ws.lock:
+            page = ws.pages.get(page_id)
+            if page is None:
+                return self._error(404, "object_not_found", f"Could not find block with ID: {page_id}")
+            children = list(page["children"])
+            start = children.index(query["start_cursor"][0]) if "start_cursor" in query else 0
+            results = [ws.blocks[b] for b in children[start:start + page_size]]
+        has_more = start + page_size < len(children)
+        return self._send({
+            "object": "list",
+            "results": results,
+            "has_more": has_more,
+            "next_cursor": children[start + page_size] if has_more else None,
+        })
+
+    def _append_children(self, page_id, body):
+        ws = self.workspace
+        children = body.get("children") or []
+        if len(children) > MAX_CHILDREN:
+            return self._error(400, "validation_error", f"body.children.length should be ≤ {MAX_CHILDREN}")
+        with ws.lock:
+            page = ws.pages.get(page_id)
+            if page is None:
+                return self._error(404, "object_not_found", f"Could not find block with ID: {page_id}")
+            after = body.get("after")
+            if after is not None and after not in page["children"]:
+                return self._error(400, "validation_error", f"Block {after} is not a child of {page_id}")
+            position = page["children"].index(after) + 1 if after else len(page["children"])
+            created = []
+            for child in children:
+                block_id = str(uuid.uuid4())
+                block = dict(child, id=block_id, object="block")
+                ws.blocks[block_id] = block
+                ws.parents[block_id] = page_id
+                created.append(block)
+            page["children"][position:position] = [b["id"] for b in created]
+        return self._send({"object": "list", "results": created, "has_more": False})
+
+    def _update_block(self, block_id, body):
+        ws = self.workspace
+        with ws.lock:
+            block = ws.blocks.get(block_id)
+            if block is None:
+                return self._error(404, "object_not_found", f"Could not find block with ID: {block_id}")
+            block_type = block["type"]
+            if block_type not in body:
+                return self._error(400, "validation_error", f"body.{block_type} should be defined")
+            block[block_type] = body[block_type]
+            result = dict(block)
+        return self._send(result)
+
+    def _delete_block(self, block_id):
+        ws = self.workspace
+        with ws.lock:
+            block = ws.blocks.pop(block_id, None)
+            if block is None:
+                return self._error(404, "object_not_found", f"Could not find block with ID: {block_id}")
+            page_id = ws.parents.pop(block_id)
+            ws.pages[page_id]["children"].remove(block_id)
+        return self._send(dict(block, archived=True))
+
+
+def start_server(port=0):
+    """在后台线程启动模拟服务，返回 (server, base_url)；base_url 可直接作为 NOTION_API_URL"""
+    handler = type("BoundHandler", (Handler,), {"workspace": Workspace()})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟 Notion API")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    server, base_url = start_server(args.port)
+    print(f"🧪 模拟 Notion API: {base_url}")
+    print(f"   NOTION_API_URL={base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
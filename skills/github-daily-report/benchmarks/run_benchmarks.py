@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+基准测试：在本地模拟 GitHub API 上端到端运行各获取路径，输出可跨提交比较的 JSON 结果
+
+每个 (场景, 目标) 在独立的子进程里运行，使用全新的 HOME（配置、缓存都是冷的），记录：
+  wall_s       墙钟时间（多次运行取中位数）
+  requests     发到模拟服务的请求数（含 304 / 限流响应）
+  bytes        响应体传输字节数（gzip 压缩后）
+  peak_rss_mb  子进程的峰值常驻内存
+
+目标:
+  all      fetch_all_commits.main                         全账号扫描今日 commits
+  range    generate_report_flexible.fetch_commits_with_range  配置仓库的今日 commits（含详情）
+  details  fetch_commits_with_diff.fetch_today_commits_with_details
+  prompt   fetch_commits_with_diff.generate_llm_prompt    用 details 的结果渲染提示文本（不发请求）
+
+用法:
+  python run_benchmarks.py [--scenarios small,medium] [--targets all,details,prompt] [--repeat 3]
+                           [--set backend=graphql] [--output FILE] [--compare BASE.json]
+  python run_benchmarks.py --scenarios custom --repos 300 --commits 100 --latency-ms 20
+
+结果默认保存到 benchmarks/results/<git 提交>.json；--compare 与之前的结果逐项对比。
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent / "scripts"
+RESULTS_DIR = BENCH_DIR / "results"
+sys.path.insert(0, str(BENCH_DIR))
+import mock_github
+
+SCENARIOS = {
+    "empty": dict(repos=100, active=0, commits=0),
+    "small": dict(repos=10, active=5, commits=20, files_max=300),
+    "medium": dict(repos=100, active=20, commits=200, files_max=1000),
+    "large": dict(repos=1000, active=50, commits=500, files_max=3000),
+    "throttled": dict(repos=100, active=20, commits=100, latency_ms=20, rate_limit_every=40, retry_after=1),
+    "branches": dict(repos=20, active=10, commits=100, branches=8),
+}
+DEFAULT_SCENARIOS = ("empty", "small", "medium")
+
+TARGETS = {
+    "all": "fetch_all_commits.main",
+    "range": "generate_report_flexible.fetch_commits_with_range",
+    "details": "fetch_commits_with_diff.fetch_today_commits_with_details",
+    "prompt": "fetch_commits_with_diff.generate_llm_prompt",
+}
+DEFAULT_TARGETS = ("all", "range", "details", "prompt")
+# 子进程超时（秒）
+WORKER_TIMEOUT = 1800
+
+
+# ---- 子进程 ----
+
+def _mock_stats(api):
+    from urllib.request import urlopen
+    with urlopen(f"{api}/_stats") as response:
+        return json.load(response)
+
+
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_worker(target, api, commits_file):
+    """在当前进程执行一个目标，把测量结果作为一行 JSON 写到 stdout"""
+    import contextlib
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    sys.argv = [target]
+    devnull = open(os.devnull, "w")
+
+    if target == "prompt":
+        from fetch_commits_with_diff import generate_llm_prompt
+        with open(commits_file) as f:
+            commits = json.load(f)
+        run = lambda: generate_llm_prompt(commits)
+    elif target == "all":
+        from fetch_all_commits import main
+        run = main
+    elif target == "range":
+        from commit_source import get_today_range
+        from generate_report_flexible import fetch_commits_with_range
+        run = lambda: fetch_commits_with_range(*get_today_range())
+    else:
+        from fetch_commits_with_diff import fetch_today_commits_with_details
+        run = fetch_today_commits_with_details
+
+    before = _mock_stats(api)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(devnull):
+        result = run()
+    wall = time.perf_counter() - start
+    after = _mock_stats(api)
+
+    if target == "details" and commits_file:
+        with open(commits_file, "w") as f:
+            json.dump(result, f, ensure_ascii=False)
+    measured = {
+        "wall_s": round(wall, 4),
+        "requests": after["requests"] - before["requests"],
+        "bytes": after["bytes"] - before["bytes"],
+        "not_modified": after["not_modified"] - before["not_modified"],
+        "throttled": after["throttled"] - before["throttled"],
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    if isinstance(result, list):
+        measured["commits"] = len(result)
+    elif isinstance(result, str):
+        measured["output_chars"] = len(result)
+    print(json.dumps(measured))
+
+
+# ---- 调度 ----
+
+def _write_config(home, scale, overrides):
+    config_dir = Path(home) / ".config" / "github-daily-report"
+    config_dir.mkdir(parents=True)
+    config = {
+        "github_token": "bench-token",
+        "github_username": mock_github.USER,
+        "repositories": scale.repo_names,
+    }
+    config.update(overrides)
+    with open(config_dir / "config.json", "w") as f:
+        json.dump(config, f)
+
+
+def run_target(target, api, scale, overrides, commits_file):
+    """用全新的 HOME 在子进程中运行一次目标，返回测量结果"""
+    home = tempfile.mkdtemp(prefix="gdr-bench-")
+    try:
+        _write_config(home, scale, overrides)
+        env = dict(os.environ, HOME=home, GITHUB_API_URL=api, PYTHONDONTWRITEBYTECODE="1")
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", target, "--api", api, "--commits-file", commits_file],
+            env=env, capture_output=True, text=True, timeout=WORKER_TIMEOUT)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "worker failed")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+
+
+def run_scenario(name, params, targets, repeat, overrides):
+    scale = mock_github.Scale(**params)
+    server, api = mock_github.start_server(scale)
+    workdir = tempfile.mkdtemp(prefix="gdr-bench-data-")
+    commits_file = os.path.join(workdir, "commits.json")
+    results = []
+    try:
+        # prompt 需要 details 的输出作为输入
+        if "prompt" in targets and "details" not in targets:
+            run_target("details", api, scale, overrides, commits_file)
+        for target in sorted(targets, key=lambda t: t == "prompt"):
+            runs = []
+            for _ in range(repeat):
+                try:
+                    runs.append(run_target(target, api, scale, overrides, commits_file))
+                except (RuntimeError, subprocess.TimeoutExpired) as e:
+                    print(f"  ❌ {name} / {target}: {e}")
+                    break
+            if not runs:
+                continue
+            entry = dict(runs[-1])
+            entry["wall_s"] = round(statistics.median(r["wall_s"] for r in runs), 4)
+            entry["wall_s_runs"] = [r["wall_s"] for r in runs]
+            entry.update(scenario=name, target=TARGETS[target], scale=params)
+            results.append(entry)
+            print(f"  ⏱️ {name:<10} {target:<8} {entry['wall_s']:>8.3f}s  {entry['requests']:>6} 个请求  "
+                  f"{entry['bytes'] / 1024:>10.1f} KB  峰值内存 {entry['peak_rss_mb']:.1f} MB")
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def _git_rev():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                             capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", str(SCRIPTS_DIR)], cwd=BENCH_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "") if rev else "unknown"
+    except OSError:
+        return "unknown"
+
+
+def compare(results, base_path):
+    """与之前保存的结果逐项对比，打印变化百分比"""
+    with open(base_path) as f:
+        base = json.load(f)
+    old = {(r["scenario"], r["target"]): r for r in base["results"]}
+    print("")
+    print(f"📊 与 {base['meta'].get('git_rev')} 对比：")
+    for r in results:
+        b = old.get((r["scenario"], r["target"]))
+        if not b:
+            continue
+        parts = []
+        for key in ("wall_s", "requests", "bytes", "peak_rss_mb"):
+            if b.get(key):
+                parts.append(f"{key} {(r[key] - b[key]) / b[key] * 100:+.1f}%")
+            else:
+                parts.append(f"{key} {b.get(key)} -> {r[key]}")
+        print(f"  {r['scenario']:<10} {r['target'].split('.')[-1]:<36} {'  '.join(parts)}")
+
+
+def _parse_overrides(values):
+    overrides = {}
+    for item in values or []:
+        key, _, value = item.partition("=")
+        try:
+            overrides[key] = json.loads(value)
+        except ValueError:
+            overrides[key] = value
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GitHub Daily Report 基准测试")
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                        help=f"逗号分隔：{', '.join(SCENARIOS)}、custom")
+    parser.add_argument("--targets", default=",".join(DEFAULT_TARGETS), help=f"逗号分隔：{', '.join(TARGETS)}")
+    parser.add_argument("--repeat", type=int, default=1, help="每个目标运行次数（取中位数）")
+    parser.add_argument("--set", action="append", metavar="KEY=VALUE", help="覆盖 config.json 中的配置项")
+    parser.add_argument("--output", help="结果文件（默认 results/<git 提交>.json）")
+    parser.add_argument("--compare", metavar="BASE", help="与之前的结果文件对比")
+    mock_github.add_scale_arguments(parser)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--api", help=argparse.SUPPRESS)
+    parser.add_argument("--commits-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.api, args.commits_file)
+        return
+
+    targets = [t.strip() for t in args.targets.split(",") if t.strip()]
+    unknown = [t for t in targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"未知目标: {', '.join(unknown)}")
+    overrides = _parse_overrides(args.set)
+
+    scenarios = {}
+    for name in (s.strip() for s in args.scenarios.split(",") if s.strip()):
+        if name == "custom":
+            scale = mock_github.scale_from_args(args)
+            scenarios[name] = dict(repos=scale.repos, active=scale.active, commits=scale.commits,
+                                   files_max=scale.files_max, large_every=scale.large_every,
+                                   latency_ms=scale.latency_ms, rate_limit_every=scale.rate_limit_every,
+                                   retry_after=scale.retry_after, quota=scale.quota,
+                                   branches=scale.feature_branches)
+        elif name in SCENARIOS:
+            scenarios[name] = SCENARIOS[name]
+        else:
+            parser.error(f"未知场景: {name}")
+
+    git_rev = _git_rev()
+    print(f"🧪 基准测试 {git_rev}：{', '.join(scenarios)} × {', '.join(targets)}")
+    results = []
+    for name, params in scenarios.items():
+        results.extend(run_scenario(name, params, targets, max(1, args.repeat), overrides))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{git_rev}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "meta": {
+                "git_rev": git_rev,
+                "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "config": overrides,
+            },
+            "results": results,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"📁 结果已保存到: {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+本地 webhook 发送器：模拟 GitHub 向 watch 模式的接收端发送签名的 push 事件
+
+- 指定 --api（mock_github.py 的地址）时先调用 POST /_push 在模拟服务上生成新 commits，
+  再把这些 commits 作为 push payload 发出，watch 模式的后台详情请求也能在模拟服务上完成
+- 不指定 --api 时生成随机 sha 的 commits，只用于测试接收和签名校验
+- payload 格式与 GitHub 的 push webhook 一致，签名放在 X-Hub-Signature-256（HMAC-SHA256）
+
+用法:
+  python webhook_sender.py --secret S [--url http://127.0.0.1:8787/] [--api http://127.0.0.1:8765]
+                           [--repo bench/repo-0000] [--count 1] [--author bench]
+                           [--branch main] [--event push|ping] [--bad-signature]
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+import mock_github
+
+
+def _post_json(url, body, headers=None):
+    data = json.dumps(body).encode("utf-8")
+    request = Request(url, data=data, method="POST",
+                      headers=dict({"Content-Type": "application/json"}, **(headers or {})))
+    try:
+        with urlopen(request) as response:
+            return response.status, response.read().decode("utf-8")
+    except HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+
+
+def mock_push(api, repo, count):
+    """在模拟服务上追加 commits，返回 REST 格式的 commits（旧的在前）"""
+    status, body = _post_json(f"{api.rstrip('/')}/_push", {"repo": repo, "count": count})
+    if status != 200:
+        raise SystemExit(f"❌ 模拟服务 /_push 失败: {status} {body}")
+    return json.loads(body)
+
+
+def random_commits(repo, count, author):
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    commits = []
+    for _ in range(count):
+        sha = os.urandom(20).hex()
+        commits.append({
+            "sha": sha,
+            "html_url": f"https://github.com/{repo}/commit/{sha}",
+            "commit": {
+                "message": f"test: webhook commit {sha[:7]}",
+                "author": {"name": author, "email": f"{author}@example.com", "date": now},
+                "committer": {"name": author, "email": f"{author}@example.com", "date": now},
+            },
+        })
+    return commits
+
+
+def push_payload(repo, commits, author, branch="main"):
+    """用 REST 格式的 commits 构造 GitHub push webhook 的 payload"""
+    entries = [{
+        "id": c["sha"],
+        "tree_id": hashlib.sha1(c["sha"].encode()).hexdigest(),
+        "distinct": True,
+        "message": c["commit"]["message"],
+        "timestamp": c["commit"]["committer"]["date"],
+        "url": c["html_url"],
+        "author": {"name": author, "email": c["commit"]["author"]["email"], "username": author},
+        "committer": {"name": author, "email": c["commit"]["committer"]["email"], "username": author},
+        "added": [],
+        "removed": [],
+        "modified": [],
+    } for c in commits]
+    owner, name = repo.split("/")
+    return {
+        "ref": f"refs/heads/{branch}",
+        "before": "0" * 40,
+        "after": commits[-1]["sha"] if commits else "0" * 40,
+        "repository": {"full_name": repo, "name": name, "owner": {"login": owner}, "default_branch": "main"},
+        "pusher": {"name": author},
+        "sender": {"login": author},
+        "commits": entries,
+        "head_commit": entries[-1] if entries else None,
+    }
+
+
+def send(url, secret, event, payload, bad_signature=False):
+    """发送一个 webhook 事件，返回 (状态码, 响应体)"""
+    body = json.dumps(payload).encode("utf-8")
+    signature = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    if bad_signature:
+        signature = "0" * len(signature)
+    request = Request(url, data=body, method="POST", headers={
+        "Content-Type": "application/json",
+        "X-GitHub-Event": event,
+        "X-GitHub-Delivery": os.urandom(16).hex(),
+        "X-Hub-Signature-256": f"sha256={signature}",
+    })
+    try:
+        with urlopen(request) as response:
+            return response.status, response.read().decode("utf-8")
+    except HTTPError as e:
+        return e.code, e.read().decode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向 watch 模式发送签名的 GitHub webhook")
+    parser.add_argument("--url", default="http://127.0.0.1:8787/", help="webhook 接收地址")
+    parser.add_argument("--secret", required=True, help="与 config.json 中 webhook_secret 相同")
+    parser.add_argument("--api", help="mock_github.py 的地址；指定时先在模拟服务上生成 commits")
+    parser.add_argument("--repo", default=f"{mock_github.USER}/repo-0000")
+    parser.add_argument("--count", type=int, default=1, help="push 的 commit 数")
+    parser.add_argument("--author", default=mock_github.USER, help="commit 作者的 GitHub 用户名")
+    parser.add_argument("--branch", default="main", help="push 的分支（默认分支是 main）")
+    parser.add_argument("--event", default="push", choices=("push", "ping"))
+    parser.add_argument("--bad-signature", action="store_true", help="发送错误的签名（应被拒绝）")
+    args = parser.parse_args()
+
+    if args.event == "ping":
+        payload = {"zen": "Keep it logically awesome.", "hook_id": 1}
+    else:
+        commits = mock_push(args.api, args.repo, args.count) if args.api \
+            else random_commits(args.repo, args.count, args.author)
+        payload = push_payload(args.repo, commits, args.author, args.branch)
+        print(f"📤 {args.repo}: {', '.join(c['sha'][:7] for c in commits)}")
+    status, body = send(args.url, args.secret, args.event, payload, args.bad_signature)
+    print(f"{'✅' if status < 300 else '❌'} {status} {body}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+多日补录：一次获取整个日期范围，再按报告日拆分，逐日输出日报
+
+每个仓库只请求一次整个范围（详情同样只获取一次），然后按时区和分界时间把 commits
+分到各个报告日：分界时间之前的 commits 算前一天（如 cutoff 为 6 时，凌晨 5 点的提交算昨天）。
+compare 模式下区间合计只在同一天内计算。
+
+配置项：
+  timezone         报告日所在时区（IANA 名称，如 Asia/Shanghai，默认 UTC）
+  day_cutoff_hour  每个报告日从几点开始（默认 0）
+
+用法:
+  python backfill.py START END [--tz Asia/Shanghai] [--cutoff 6]
+                     [--format prompt|json|markdown] [--out DIR] [--notion-location 25-26]
+  START / END 为报告日（YYYY-MM-DD，包含两端）
+"""
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone, time as dtime
+sys.path.insert(0, str(__file__).rsplit('/', 1)[0])
+from config_manager import load_config
+import run_trace
+
+DEFAULT_OUTPUT_DIR = "/tmp/github_daily_backfill"
+DEFAULT_CUTOFF_HOUR = 0
+FORMATS = ("prompt", "json", "markdown")
+
+
+def get_timezone(name=None):
+    """返回时区对象，name 为空时读取 config.json 的 timezone（默认 UTC）"""
+    name = name or load_config().get('timezone', 'UTC')
+    if name.upper() == "UTC":
+        return timezone.utc
+    from zoneinfo import ZoneInfo
+    return ZoneInfo(name)
+
+
+def get_cutoff_hour(value=None):
+    if value is None:
+        value = load_config().get('day_cutoff_hour', DEFAULT_CUTOFF_HOUR)
+    return int(value)
+
+
+def day_window(start_day, end_day, tz, cutoff_hour):
+    """报告日 [start_day, end_day] 对应的 UTC 时间范围"""
+    start = datetime.combine(start_day, dtime(cutoff_hour), tzinfo=tz)
+    end = datetime.combine(end_day + timedelta(days=1), dtime(cutoff_hour), tzinfo=tz) - timedelta(seconds=1)
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+
+
+def report_day(commit, tz, cutoff_hour):
+    """commit 所属的报告日"""
+    committed = datetime.fromisoformat(commit["time"].replace("Z", "+00:00")).astimezone(tz)
+    return (committed - timedelta(hours=cutoff_hour)).date()
+
+
+def bucket_by_day(commits, tz, cutoff_hour):
+    """一次遍历把 commits 分到各报告日，返回 {date: [commit, ...]}（保持时间顺序）"""
+    buckets = {}
+    for c in commits:
+        buckets.setdefault(report_day(c, tz, cutoff_hour), []).append(c)
+    return buckets
+
+
+def render_day(day, commits, fmt, notion_location):
+    """渲染一天的报告，返回 (文件扩展名, 内容)"""
+    if fmt == "json":
+        return "json", json.dumps({"date": day.isoformat(), "total_commits": len(commits), "commits": commits},
+                                  indent=2, ensure_ascii=False)
+    if fmt == "markdown":
+        from generate_report import generate_markdown_report
+        grouped = sorted(commits, key=lambda c: (c["repo"], c["time"]))
+        return "md", generate_markdown_report({
+            "date": day.isoformat(),
+            "total_commits": len(commits),
+            "repos_with_commits": list(dict.fromkeys(c["repo"] for c in grouped)),
+            "commits": grouped,
+        })
+    from generate_report_flexible import generate_llm_prompt
+    return "txt", generate_llm_prompt(commits, day.strftime("%Y-%m-%d (%b %d)"), notion_location)
+
+
+def backfill(start_day, end_day, tz, cutoff_hour, fmt="prompt", out_dir=DEFAULT_OUTPUT_DIR, notion_location="25-26"):
+    """获取整个范围一次，并为每个报告日写出一份报告，返回 {date: commit 数}"""
+    from generate_report_flexible import fetch_commits_with_range
+
+    start_time, end_time = day_window(start_day, end_day, tz, cutoff_hour)
+    commits = fetch_commits_with_range(start_time, end_time,
+                                       detail_group=lambda c: report_day(c, tz, cutoff_hour))
+    buckets = bucket_by_day(commits, tz, cutoff_hour)
+
+    os.makedirs(out_dir, exist_ok=True)
+    print("")
+    counts = {}
+    day = start_day
+    while day <= end_day:
+        day_commits = buckets.get(day, [])
+        counts[day] = len(day_commits)
+        if day_commits:
+            ext, content = render_day(day, day_commits, fmt, notion_location)
+            path = os.path.join(out_dir, f"{day.isoformat()}.{ext}")
+            with open(path, "w") as f:
+                f.write(content)
+            print(f"  📅 {day.isoformat()}: {len(day_commits)} 个 commits -> {path}")
+        else:
+            print(f"  📅 {day.isoformat()}: 无")
+        day += timedelta(days=1)
+    return counts
+
+
+def main():
+    args = sys.argv[1:]
+    positional = [a for i, a in enumerate(args) if not a.startswith("--") and (i == 0 or not args[i - 1].startswith("--"))]
+    if len(positional) != 2:
+        print(__doc__)
+        sys.exit(1)
+
+    def option(name, default=None):
+        return args[args.index(name) + 1] if name in args else default
+
+    try:
+        start_day = datetime.strptime(positional[0], "%Y-%m-%d").date()
+        end_day = datetime.strptime(positional[1], "%Y-%m-%d").date()
+    except ValueError:
+        print("❌ 日期格式错误，应为 YYYY-MM-DD")
+        sys.exit(1)
+    fmt = option("--format", "prompt")
+    if fmt not in FORMATS:
+        print(f"❌ 不支持的格式: {fmt}（可选 {', '.join(FORMATS)}）")
+        sys.exit(1)
+
+    tz = get_timezone(option("--tz"))
+    cutoff_hour = get_cutoff_hour(option("--cutoff"))
+    print(f"📅 补录 {start_day} ~ {end_day}（时区 {tz}，每天从 {cutoff_hour}:00 开始）")
+    counts = backfill(start_day, end_day, tz, cutoff_hour, fmt,
+                      option("--out", DEFAULT_OUTPUT_DIR), option("--notion-location", "25-26"))
+    print(f"✅ 共 {sum(counts.values())} 个 commits，{sum(1 for n in counts.values() if n)} 天有提交")
+
+
+if __name__ == "__main__":
+    run_trace.run(main)
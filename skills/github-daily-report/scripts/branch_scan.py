@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+全分支扫描（branches: all）：只获取窗口内有更新的分支，按 sha 去重
+
+默认只扫描默认分支，功能分支上的 commits 要等合并后才出现在日报里。逐个分支请求会让
+请求数乘以分支数，这里：
+- 用 GraphQL refs 查询（每页 100 个分支，通常一个仓库一次请求）拿到所有分支的 tip sha 和
+  提交时间，不需要逐个分支请求 tip 时间；GitHub 只保证 tag 按提交时间排序，
+  所以分支要全部翻完，逐个按时间筛选
+- tip 早于窗口起点的分支直接跳过；其余分支按 tip 从新到旧用 sha= 逐个获取窗口内的 commits
+- 所有分支共用一个已见 sha 集合：重复的 commit 只保留一次，连续一整页都是已见过的 commits
+  时停止翻页（剩下的是与其他分支共同的历史）
+
+跨仓库（fork 与上游同时配置）的去重由 commit_source.iter_commits 完成。
+"""
+from datetime import datetime, timezone
+from graphql_backend import _graphql
+
+# 连续这么多个已见过的 commits（一整页）后停止翻页
+SEEN_RUN = 100
+REFS_QUERY = """query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    refs(refPrefix: "refs/heads/", first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes { name target { oid ... on Commit { committedDate } } }
+    }
+  }
+}"""
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def updated_branches(repo, token, start_time):
+    """
+    窗口内有更新的分支（tip 时间不早于 start_time），返回 [(name, tip sha, tip 时间)]，按 tip 从新到旧
+    """
+    owner, name = repo.split("/", 1)
+    since = start_time.astimezone(timezone.utc)
+    variables = {"owner": owner, "name": name, "cursor": None}
+    result = []
+    while True:
+        data = _graphql(REFS_QUERY, token, variables)
+        refs = (data.get("repository") or {}).get("refs")
+        if not refs:
+            break
+        for node in refs["nodes"]:
+            target = node.get("target") or {}
+            time = target.get("committedDate")
+            if not time:
+                # 指向非 commit 对象的分支
+                continue
+            if _parse_time(time) < since:
+                continue
+            result.append((node["name"], target["oid"], time))
+        if not refs["pageInfo"]["hasNextPage"]:
+            break
+        variables["cursor"] = refs["pageInfo"]["endCursor"]
+    return sorted(result, key=lambda b: _parse_time(b[2]), reverse=True)
+
+
+def list_all_branches(repo, token, start_time, list_branch):
+    """
+    逐个获取窗口内有更新的分支的 commits，按 sha 去重后按时间倒序返回（与 REST 列表一致）
+
+    list_branch(sha, stop) 返回该分支的 commit dict 列表，stop(item) 接收原始 REST 条目，
+    返回 True 时停止翻页（stop 为 None 时完整获取）。
+    """
+    seen = set()
+    result = []
+    for _, tip, _ in updated_branches(repo, token, start_time):
+        run = [0]
+
+        def stop(item):
+            run[0] = run[0] + 1 if item["sha"] in seen else 0
+            return run[0] >= SEEN_RUN
+
+        # 第一个分支没有可以提前停下的依据，不传 stop 以便并发翻页
+        for c in list_branch(tip, stop if seen else None):
+            full_sha = c["url"].rsplit("/", 1)[-1]
+            if full_sha in seen:
+                continue
+            seen.add(full_sha)
+            result.append(c)
+    return sorted(result, key=lambda c: c["time"], reverse=True)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+commit 获取库：所有脚本共用的列表、详情和后端选择逻辑
+
+- get_commits_in_range / get_today_commits：REST 按仓库列出 commits（原先各脚本里的四份拷贝），
+  branches 为 all 时扫描窗口内有更新的所有分支（branch_scan）
+- get_commit_detail：单个 commit 的文件改动（优先读取 detail_cache）
+- iter_commits：按配置的 backend（rest / graphql / git）产出 (repo, commits)，全分支模式下跨 fork 按 sha 去重
+- enrich_commits：按 detail_mode 补充 stats / files
+- collect_commits：列表 → 合并 → 补充详情的完整流程，供各入口脚本调用
+
+返回约定与原先一致：获取失败为 None，没有 commits 为 []（空仓库 409 也算 []）。
+"""
+from datetime import datetime, timezone
+from config_manager import get_fetch_backend, get_detail_mode, get_branch_mode
+from fetch_engine import map_ordered, map_unordered, fetch_details, report_failures, commit_full_sha, login_from_email
+from commit_stream import repo_stream, merge_streams
+import github_client
+import detail_cache
+import detail_stream
+import run_trace
+
+
+def get_today_range():
+    """今日的 UTC 时间范围 (00:00:00 ~ 23:59:59)"""
+    now = datetime.now(timezone.utc)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    today_end = today_start.replace(hour=23, minute=59, second=59)
+    return today_start, today_end
+
+
+def commit_author(c):
+    """REST commit 的作者登录名；邮箱没有关联账号时尝试从 noreply 邮箱中取出"""
+    if c.get("author") and c["author"].get("login"):
+        return c["author"]["login"]
+    return login_from_email(c["commit"]["author"].get("email"))
+
+
+def _list_commits(repo, username, token, start_time, end_time, sha=None, stop=None):
+    """列出一个分支（sha 为空时是默认分支）时间范围内的 commits，失败时抛出异常"""
+    params = {
+        "since": start_time.isoformat(),
+        "until": end_time.isoformat()
+    }
+    if username:
+        params["author"] = username
+    if sha:
+        params["sha"] = sha
+
+    # 有 stop 时逐页请求，才能在提前结束时少发请求
+    commits = github_client.paginate(f"/repos/{repo}/commits", token, params=params, stop=stop,
+                                     concurrent=stop is None)
+    result = []
+    for c in commits:
+        entry = {
+            "sha": c["sha"][:7],
+            "message": c["commit"]["message"],
+            "repo": repo,
+            "url": c["html_url"],
+            "time": c["commit"]["committer"]["date"]
+        }
+        if not username:
+            entry["author"] = commit_author(c)
+        result.append(entry)
+    return result
+
+
+def get_commits_in_range(repo, username, token, start_time, end_time):
+    """
+    获取指定时间范围内的 commits，获取失败时返回 None
+
+    username 为空时不按作者过滤，每个 commit 额外带上 author（登录名，可能为 None）。
+    branches 为 all 时覆盖窗口内有更新的所有分支，同一个 commit 只出现一次。
+    """
+    try:
+        if get_branch_mode() == "all":
+            import branch_scan
+            return branch_scan.list_all_branches(
+                repo, token, start_time,
+                lambda sha, stop: _list_commits(repo, username, token, start_time, end_time, sha, stop))
+        return _list_commits(repo, username, token, start_time, end_time)
+    except github_client.GitHubAPIError as e:
+        if e.status_code == 409:
+            # 空仓库
+            return []
+        print(f"  ⚠️ 获取 {repo} 失败: {e.status_code}")
+    except Exception as e:
+        print(f"  ⚠️ 获取 {repo} 失败: {e}")
+    return None
+
+
+def get_today_commits(repo, username, token):
+    """获取指定仓库今日的 commits，获取失败时返回 None"""
+    return get_commits_in_range(repo, username, token, *get_today_range())
+
+
+def get_commit_detail(repo, sha, token):
+    """获取单个 commit 的详细信息，包括文件改动（传入完整 sha 时优先读取 detail_cache）"""
+    cached = detail_cache.get(repo, sha)
+    if cached:
+        return cached
+
+    try:
+        # 流式解析、丢弃 patch 并合并文件分页；结果由 detail_cache 永久缓存，不经过 ETag 缓存
+        detail = detail_stream.fetch_commit_detail(repo, sha, token)
+        detail_cache.put(repo, sha, detail)
+        return detail
+    except github_client.GitHubAPIError:
+        pass
+    except Exception as e:
+        print(f"  获取详情失败: {e}")
+
+    return None
+
+
+def iter_commits(repos, username, token, start_time, end_time, with_stats=False, ordered=True, backend=None,
+                 since=None):
+    """
+    按配置的 backend 产出 (repo, commits)
+
+    ordered 为 False 时按完成顺序产出（GraphQL 按批次产出）；
+    backend 可覆盖配置，例如全账号扫描不使用 git 镜像。
+    since 为 {repo: 起点}，按仓库覆盖 start_time（例如追加更新时从各仓库的水位开始列出）；
+    GraphQL 一次查询共用一个起点，取这些仓库中最早的。
+    branches 为 all 时 GraphQL 后端改走 REST（GraphQL 只查询默认分支），
+    并且同一个 commit 出现在多个仓库（fork）时只保留先产出的一份。
+    """
+    backend = backend or get_fetch_backend()
+    all_branches = get_branch_mode() == "all"
+    since = since or {}
+    start_of = lambda r: since.get(r, start_time)
+    if all_branches and backend == "graphql":
+        backend = "rest"
+    if backend == "graphql":
+        import graphql_backend
+        batch_start = min((start_of(r) for r in repos), default=start_time)
+        return _traced(graphql_backend.iter_commits_batch(repos, username, token, batch_start, end_time, with_stats))
+    if backend == "git":
+        # 本地镜像直接给出 stats / files，后面的详情阶段会跳过这些 commits
+        import git_mirror
+        fetch = lambda r: git_mirror.get_commits_in_range(r, username, token, start_of(r), end_time)
+    else:
+        fetch = lambda r: get_commits_in_range(r, username, token, start_of(r), end_time)
+    results = map_ordered(fetch, repos) if ordered else map_unordered(fetch, repos)
+    return _traced(_dedupe_forks(results) if all_branches else results)
+
+
+def _dedupe_forks(results):
+    """跨仓库按完整 sha 去重（fork 与上游同时配置时，共同的 commits 只计一次）"""
+    seen = set()
+    for repo, commits in results:
+        if commits:
+            commits = [c for c in commits if commit_full_sha(c) not in seen]
+            seen.update(commit_full_sha(c) for c in commits)
+        yield repo, commits
+
+
+def _traced(results):
+    """遍历列表结果期间计入 commit_listing 阶段"""
+    with run_trace.phase("commit_listing"):
+        yield from results
+
+
+@run_trace.phase("detail_enrichment")
+def enrich_commits(commits, token, detail_group=None):
+    """
+    为 commits 补充 stats / files，detail_mode 为 compare 时按仓库区间批量获取
+
+    detail_group(commit) 用于 compare 模式：区间合计只在同一组内计算（例如按报告日、按作者），
+    不会跨组合并统计。
+    """
+    get_detail = lambda c: get_commit_detail(c["repo"], commit_full_sha(c), token)
+    if get_detail_mode() != "compare":
+        return fetch_details(commits, get_detail)
+
+    import compare_stats
+    groups = {}
+    for c in commits:
+        groups.setdefault(detail_group(c) if detail_group else None, []).append(c)
+    for group in groups.values():
+        compare_stats.fetch_compare_details(group, token, get_detail)
+    return commits
+
+
+def collect_commits(repos, username, token, start_time, end_time, keep=None, sink=None,
+                    with_details=True, detail_group=None, backend=None, since=None):
+    """
+    列出所有仓库的 commits、按时间归并，并补充详情
+
+    - since 为 {repo: 起点} 时按仓库缩小列出范围（见 iter_commits）
+    - keep(commit) 返回 False 的 commits 在获取详情之前就被丢弃
+    - 传入 sink（commit_stream.NdjsonSink）时按仓库完成顺序逐个补充详情并写出，
+      不在内存中累积，返回写出的 commit 数
+    否则返回按时间升序的 commit 列表。
+    """
+    results = iter_commits(repos, username, token, start_time, end_time,
+                           with_stats=with_details, ordered=sink is None, backend=backend,
+                           since=since)
+    streams = []
+    failed_repos = []
+    for repo, commits in results:
+        print(f"  📁 {repo}...", end=" ", flush=True)
+        if commits is None:
+            print("⚠️ 获取失败")
+            failed_repos.append(repo)
+            continue
+        if not commits:
+            print("无")
+            continue
+        commits = repo_stream(commits)
+        if keep:
+            kept = [c for c in commits if keep(c)]
+            print(f"✅ {len(commits)} 个（保留 {len(kept)} 个）")
+            commits = kept
+        else:
+            print(f"✅ {len(commits)} 个")
+        if not commits:
+            continue
+        if sink:
+            # 流式模式：这个仓库的详情补齐后立即写出
+            if with_details:
+                enrich_commits(commits, token, detail_group)
+            sink.write_all(commits)
+        else:
+            streams.append(commits)
+    report_failures(failed_repos)
+
+    if sink:
+        return sink.count
+
+    # 各仓库已按时间升序，归并即得到全局时间顺序
+    all_commits = list(merge_streams(streams))
+
+    # 所有仓库列完之后，再统一并发获取每个 commit 的文件改动
+    if all_commits and with_details:
+        print(f"  🔎 正在获取 {len(all_commits)} 个 commits 的详细改动...")
+        enrich_commits(all_commits, token, detail_group)
+    return all_commits
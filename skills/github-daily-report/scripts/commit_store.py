@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+本地 SQLite commit 库：持久保存 commits、stats 和文件改动
+
+- 每个 (仓库, 作者) 记录高水位（最新 commit 时间）和已覆盖的最早时间，
+  同步时只请求高水位之后的新 commits（以及比已覆盖范围更早的部分）
+- 生成任意时间范围的日报时直接查询本地库，不再访问 API
+
+注意：高水位按 committer 时间计算，如果推送了 committer 时间早于高水位的旧 commits，
+需要用 `python commit_store.py sync --full` 重新同步。
+
+用法:
+  python commit_store.py sync [--since YYYY-MM-DD] [--full]
+  python commit_store.py query START END     (格式: YYYY-MM-DD 或 "YYYY-MM-DD HH:MM")
+"""
+import sqlite3
+import threading
+from datetime import datetime, timezone, timedelta
+import sys
+sys.path.insert(0, str(__file__).rsplit('/', 1)[0])
+from config_manager import CONFIG_DIR, ensure_config_dir
+
+STORE_FILE = CONFIG_DIR / "commits.db"
+DEFAULT_SYNC_DAYS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    repo TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    author TEXT NOT NULL,
+    message TEXT NOT NULL,
+    url TEXT NOT NULL,
+    committed_at TEXT NOT NULL,
+    additions INTEGER,
+    deletions INTEGER,
+    total INTEGER,
+    has_details INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (repo, sha)
+);
+CREATE INDEX IF NOT EXISTS idx_commits_time ON commits (committed_at);
+CREATE INDEX IF NOT EXISTS idx_commits_author ON commits (author, committed_at);
+CREATE INDEX IF NOT EXISTS idx_commits_repo ON commits (repo, committed_at);
+
+CREATE TABLE IF NOT EXISTS files (
+    repo TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    status TEXT NOT NULL,
+    additions INTEGER NOT NULL,
+    deletions INTEGER NOT NULL,
+    changes INTEGER NOT NULL,
+    PRIMARY KEY (repo, sha, filename)
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    repo TEXT NOT NULL,
+    author TEXT NOT NULL,
+    covered_since TEXT NOT NULL,
+    last_time TEXT,
+    last_sha TEXT,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (repo, author)
+);
+"""
+
+
+def _iso(dt):
+    """统一为 GitHub 的时间格式，便于按字符串比较和使用索引"""
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class CommitStore:
+    """
+    commit 库的读写封装，多个线程共用一个连接
+
+    读写都加锁（查询也会写临时表），并发获取和 watch 模式的各线程可以共用一个实例。
+    """
+
+    def __init__(self, path=STORE_FILE):
+        if path == STORE_FILE:
+            ensure_config_dir()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ---- 写入 ----
+
+    def add_commits(self, commits, author):
+        """写入 commits（已存在的只补充详情），返回新增条数"""
+        added = 0
+        with self._lock, self.conn:
+            for c in commits:
+                sha = c["url"].rsplit("/", 1)[-1]
+                stats = c.get("stats") or {}
+                has_details = 1 if "files" in c else 0
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO commits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (c["repo"], sha, author, c["message"], c["url"], c["time"],
+                     stats.get("additions"), stats.get("deletions"), stats.get("total"), has_details))
+                added += cur.rowcount
+                if has_details:
+                    self._write_details(c["repo"], sha, stats, c["files"])
+        return added
+
+    def _write_details(self, repo, sha, stats, files):
+        self.conn.execute(
+            "UPDATE commits SET additions = ?, deletions = ?, total = ?, has_details = 1 "
+            "WHERE repo = ? AND sha = ?",
+            (stats.get("additions"), stats.get("deletions"), stats.get("total"), repo, sha))
+        self.conn.execute("DELETE FROM files WHERE repo = ? AND sha = ?", (repo, sha))
+        self.conn.executemany(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(repo, sha, f["filename"], f["status"], f["additions"], f["deletions"], f["changes"])
+             for f in files])
+
+    def set_details(self, repo, sha, detail):
+        with self._lock, self.conn:
+            self._write_details(repo, sha, detail["stats"], detail["files"])
+
+    def update_sync_state(self, repo, author, covered_since, last_time, last_sha):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?, ?, ?)",
+                (repo, author, covered_since, last_time, last_sha, _iso(datetime.now(timezone.utc))))
+
+    # ---- 读取 ----
+
+    def get_sync_state(self, repo, author):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT covered_since, last_time, last_sha FROM sync_state WHERE repo = ? AND author = ?",
+                (repo, author)).fetchone()
+        return {"covered_since": row[0], "last_time": row[1], "last_sha": row[2]} if row else None
+
+    def missing_details(self, author):
+        """返回还没有详情的 commits，(repo, sha) 列表"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT repo, sha FROM commits WHERE author = ? AND has_details = 0", (author,)).fetchall()
+
+    def query(self, start_time, end_time, author=None, repos=None):
+        """
+        查询时间范围 [start_time, end_time] 内的 commits，按时间升序
+
+        返回与 fetch_commits_with_range 相同结构的 commit dict。
+        """
+        sql = ("SELECT repo, sha, message, url, committed_at, additions, deletions, total, has_details "
+               "FROM commits WHERE committed_at >= ? AND committed_at <= ?")
+        args = [_iso(start_time), _iso(end_time)]
+        if author:
+            sql += " AND author = ?"
+            args.append(author)
+        if repos:
+            sql += f" AND repo IN ({', '.join('?' * len(repos))})"
+            args.extend(repos)
+        sql += " ORDER BY committed_at, repo"
+
+        files_by_commit = {}
+        # 临时表的写入在同一个事务里提交，不会留下未结束的事务
+        with self._lock, self.conn:
+            rows = self.conn.execute(sql, args).fetchall()
+            if rows:
+                self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (repo TEXT, sha TEXT)")
+                self.conn.execute("DELETE FROM wanted")
+                self.conn.executemany("INSERT INTO wanted VALUES (?, ?)", [(r[0], r[1]) for r in rows])
+                for repo, sha, filename, status, additions, deletions, changes in self.conn.execute(
+                        "SELECT f.repo, f.sha, f.filename, f.status, f.additions, f.deletions, f.changes "
+                        "FROM files f JOIN wanted w ON f.repo = w.repo AND f.sha = w.sha "
+                        "ORDER BY f.rowid"):
+                    files_by_commit.setdefault((repo, sha), []).append({
+                        "filename": filename,
+                        "status": status,
+                        "additions": additions,
+                        "deletions": deletions,
+                        "changes": changes
+                    })
+
+        commits = []
+        for repo, sha, message, url, committed_at, additions, deletions, total, has_details in rows:
+            commit = {
+                "sha": sha[:7],
+                "message": message,
+                "repo": repo,
+                "url": url,
+                "time": committed_at
+            }
+            if has_details:
+                commit["stats"] = {"additions": additions, "deletions": deletions, "total": total}
+                commit["files"] = files_by_commit.get((repo, sha), [])
+            commits.append(commit)
+        return commits
+
+
+def sync(store, repos, username, token, since, full=False, with_details=True):
+    """
+    增量同步：每个仓库只请求高水位之后的 commits，必要时补齐比已覆盖范围更早的部分
+
+    新 commits 以及之前详情获取失败的 commits 会补充 stats / files；
+    with_details 为 False 时只同步列表，详情由调用方稍后补充（watch 模式的后台线程）。
+    """
+    from config_manager import get_fetch_backend
+    from fetch_engine import map_ordered, fetch_details, report_failures
+    from commit_source import get_commits_in_range, get_commit_detail
+    if get_fetch_backend() == "git":
+        from git_mirror import get_commits_in_range
+
+    now = datetime.now(timezone.utc)
+
+    def windows_for(repo):
+        """计算需要请求的时间窗口"""
+        state = None if full else store.get_sync_state(repo, username)
+        if not state:
+            return [(since, now)]
+        windows = []
+        if _iso(since) < state["covered_since"]:
+            windows.append((since, _parse(state["covered_since"])))
+        # since 参数是包含端点的，最后一个 commit 会再返回一次，由主键去重
+        windows.append((_parse(state["last_time"]) if state["last_time"] else _parse(state["covered_since"]), now))
+        return windows
+
+    # 先在主线程读好每个仓库的同步状态，并发阶段只访问网络
+    windows = {repo: windows_for(repo) for repo in repos}
+
+    def sync_repo(repo):
+        found = []
+        for start, end in windows[repo]:
+            commits = get_commits_in_range(repo, username, token, start, end)
+            if commits is None:
+                return None
+            found.extend(commits)
+        return found
+
+    failed_repos = []
+    new_total = 0
+    for repo, commits in map_ordered(sync_repo, repos):
+        if commits is None:
+            failed_repos.append(repo)
+            continue
+        new_total += store.add_commits(commits, username)
+        state = None if full else store.get_sync_state(repo, username)
+        covered_since = min(_iso(since), state["covered_since"]) if state else _iso(since)
+        last_time, last_sha = (state["last_time"], state["last_sha"]) if state else (None, None)
+        for c in commits:
+            if last_time is None or c["time"] > last_time:
+                last_time, last_sha = c["time"], c["url"].rsplit("/", 1)[-1]
+        store.update_sync_state(repo, username, covered_since, last_time, last_sha)
+    report_failures(failed_repos)
+
+    if not with_details:
+        return new_total
+    missing = [{"repo": repo, "sha": sha} for repo, sha in store.missing_details(username)]
+    if missing:
+        print(f"  🔎 正在获取 {len(missing)} 个 commits 的详细改动...")
+
+        def get_detail(c):
+            detail = get_commit_detail(c["repo"], c["sha"], token)
+            if detail:
+                store.set_details(c["repo"], c["sha"], detail)
+            return detail
+
+        fetch_details(missing, get_detail)
+    return new_total
+
+
+def _parse_cli_time(value, end=False):
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            dt = datetime.strptime(value, fmt).replace(tzinfo=timezone.utc)
+            if end and fmt == "%Y-%m-%d":
+                dt += timedelta(days=1) - timedelta(seconds=1)
+            return dt
+        except ValueError:
+            continue
+    raise ValueError(f"日期格式错误: {value}")
+
+
+if __name__ == "__main__":
+    import json
+    from config_manager import get_github_token, get_github_username, get_repositories
+    import github_client
+
+    args = sys.argv[1:]
+    if args[:1] == ["sync"]:
+        since = datetime.now(timezone.utc) - timedelta(days=DEFAULT_SYNC_DAYS)
+        if "--since" in args:
+            since = _parse_cli_time(args[args.index("--since") + 1])
+        store = CommitStore()
+        added = sync(store, get_repositories(), get_github_username(), get_github_token(), since,
+                     full="--full" in args)
+        print(f"✅ 同步完成，新增 {added} 个 commits")
+        github_client.print_request_summary()
+    elif args[:1] == ["query"] and len(args) == 3:
+        store = CommitStore()
+        commits = store.query(_parse_cli_time(args[1]), _parse_cli_time(args[2], end=True),
+                              author=get_github_username())
+        print(json.dumps(commits, indent=2, ensure_ascii=False))
+    else:
+        print(__doc__)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+流式管道：按仓库产出的 commits 归并、逐仓库输出
+
+- 每个仓库的 commits 整理成按时间升序的流（API 返回的是新的在前）
+- merge_streams 用堆做 k 路归并，代替把全部结果 extend 到一起后再整体排序；
+  全局最早的 commit 要等所有仓库都返回后才能确定，所以默认路径仍会先收齐所有仓库的
+  列表再归并，内存占用随 commits 总数增长，并不是有界的
+- NdjsonSink 每拿到一个仓库的结果就逐行写出 JSON 并 flush，下游可以边读边处理（tail -f）；
+  文件按仓库完成顺序排列（仓库内按时间升序），不是全局时间顺序，需要时由下游排序
+- render_* 把单个 commit / 仓库渲染成文本片段，调用方边拿结果边打印
+"""
+import heapq
+import json
+
+DEFAULT_NDJSON_PATH = "/tmp/github_daily_commits.ndjson"
+
+
+def time_key(commit):
+    return commit["time"]
+
+
+def repo_stream(commits):
+    """把单个仓库的 commits 整理成按时间升序的列表（对倒序输入 sorted 也只需线性时间）"""
+    return sorted(commits, key=time_key)
+
+
+def merge_streams(streams):
+    """
+    k 路归并多个已按时间升序的 commit 流，返回惰性迭代器
+
+    只省掉整体排序；传入的 streams 需要已经全部就绪。
+    """
+    return heapq.merge(*streams, key=time_key)
+
+
+class NdjsonSink:
+    """逐行写出 commit 的 NDJSON 文件，每个仓库写完就 flush"""
+
+    def __init__(self, path=DEFAULT_NDJSON_PATH):
+        self.path = path
+        self.file = open(path, "w", encoding="utf-8")
+        self.count = 0
+
+    def write_all(self, commits):
+        for c in commits:
+            self.file.write(json.dumps(c, ensure_ascii=False))
+            self.file.write("\n")
+            self.count += 1
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_ndjson_arg(argv):
+    """
+    解析命令行中的 --ndjson [PATH]
+
+    没有该参数时返回 None；只写 --ndjson 时使用默认路径。
+    """
+    if "--ndjson" not in argv:
+        return None
+    i = argv.index("--ndjson")
+    if i + 1 < len(argv) and not argv[i + 1].startswith("-"):
+        return argv[i + 1]
+    return DEFAULT_NDJSON_PATH
+
+
+def render_commit_line(commit, width=50):
+    """单行摘要：  • [sha] 标题"""
+    return f"  • [{commit['sha']}] {commit['message'].split(chr(10))[0][:width]}"
+
+
+def render_repo_section(repo, commits):
+    """一个仓库的摘要段落，仓库结果一到就可以打印"""
+    return "\n".join([f"\n【{repo}】"] + [render_commit_line(c) for c in commits])
+
@@ -106,6 +106,26 @@ def get_repositories():
     return repos
 
 
+def get_fetch_backend():
+    """获取 commit 列表的获取方式：rest（默认，逐仓库请求）、graphql（批量请求）或 git（本地镜像，不消耗 API 配额）"""
+    return load_config().get('backend', 'rest')
+
+
+def get_detail_mode():
+    """获取文件改动的获取方式：commit（默认，逐个 commit 请求详情）或 compare（按区间一次请求）"""
+    return load_config().get('detail_mode', 'commit')
+
+
+def get_branch_mode():
+    """获取扫描的分支范围：default（默认，只扫描默认分支）或 all（窗口内有更新的所有分支）"""
+    return load_config().get('branches', 'default')
+
+
+def get_discovery_mode():
+    """获取全账号扫描时发现仓库的方式：probe（默认，逐仓库检查）或 search（commit 搜索 API）"""
+    return load_config().get('discovery', 'probe')
+
+
 def show_config():
     """显示当前配置"""
     config = load_config()
@@ -115,6 +135,9 @@ def show_config():
     print(f"  Notion Token: {'已设置' if config.get('notion_token') else '未设置'}")
     print(f"  Notion Database ID: {config.get('notion_database_id', '未设置')}")
     print(f"  监控仓库: {', '.join(config.get('repositories', [])) or '未设置'}")
+    print(f"  获取方式: {config.get('backend', 'rest')}")
+    print(f"  仓库发现方式: {config.get('discovery', 'probe')}")
+    print(f"  改动获取方式: {config.get('detail_mode', 'commit')}")
 
 
 def reset_config():
@@ -124,7 +147,7 @@ def reset_config():
         print("✓ 配置已重置")
 
 
-if __name__ == "__main__":
+def main():
     import sys
     if len(sys.argv) > 1:
         if sys.argv[1] == "show":
@@ -142,3 +165,7 @@ if __name__ == "__main__":
         get_notion_token()
         get_notion_database_id()
         print("\n✓ 配置完成！")
+
+
+if __name__ == "__main__":
+    main()
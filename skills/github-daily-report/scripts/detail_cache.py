@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+commit 详情缓存：以 repo@完整sha 为键，保存裁剪后的详情（不含 patch）
+
+同一个完整 sha 的详情永远不会变，所以缓存不需要过期，只按总大小做 LRU 淘汰
+（detail_cache_max_mb，默认 50MB；命中时更新文件时间）。磁盘缓存前面还有一层进程内 memo。
+"""
+import atexit
+import hashlib
+import json
+import os
+import threading
+from config_manager import CONFIG_DIR, load_config
+
+CACHE_DIR = CONFIG_DIR / "detail_cache"
+DEFAULT_MAX_MB = 50
+
+_memo = {}
+_lock = threading.Lock()
+_evict_registered = False
+
+
+def trim_detail(data):
+    """把 /commits/{sha} 的响应裁剪成需要保留的字段"""
+    return {
+        "sha": data["sha"][:7],
+        "message": data["commit"]["message"],
+        "author": data["commit"]["author"]["name"],
+        "time": data["commit"]["committer"]["date"],
+        "stats": data.get("stats", {}),
+        "files": [
+            {
+                "filename": f["filename"],
+                "status": f["status"],  # added, modified, removed
+                "additions": f["additions"],
+                "deletions": f["deletions"],
+                "changes": f["changes"]
+            }
+            for f in data.get("files", [])
+        ]
+    }
+
+
+def _key(repo, sha):
+    return hashlib.sha256(f"{repo}@{sha}".encode("utf-8")).hexdigest()
+
+
+def _path(key):
+    return CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def get(repo, sha):
+    """读取缓存的详情，只接受完整 sha（短 sha 不保证唯一），未命中返回 None"""
+    if len(sha) != 40:
+        return None
+    key = _key(repo, sha)
+    with _lock:
+        if key in _memo:
+            return _memo[key]
+    path = _path(key)
+    try:
+        with open(path, "r") as f:
+            detail = json.load(f)
+        os.utime(path)  # 记录最近使用时间，供 LRU 淘汰
+    except (OSError, ValueError):
+        return None
+    with _lock:
+        _memo[key] = detail
+    return detail
+
+
+def put(repo, sha, detail):
+    """写入缓存（原子替换），进程退出时按大小上限淘汰最久未使用的条目"""
+    global _evict_registered
+    if len(sha) != 40:
+        return
+    key = _key(repo, sha)
+    with _lock:
+        _memo[key] = detail
+        if not _evict_registered:
+            atexit.register(evict)
+            _evict_registered = True
+    path = _path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(detail, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def clear_memo():
+    """清空进程内 memo（常驻进程定期调用，内存不随处理过的 commits 增长）"""
+    with _lock:
+        _memo.clear()
+
+
+def evict(max_bytes=None):
+    """删除最久未使用的条目，直到总大小不超过上限"""
+    if max_bytes is None:
+        max_bytes = float(load_config().get('detail_cache_max_mb', DEFAULT_MAX_MB)) * 1024 * 1024
+    entries = []
+    total = 0
+    for path in CACHE_DIR.glob("*/*.json"):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+    if total <= max_bytes:
+        return
+    entries.sort()
+    for _, size, path in entries:
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        if total <= max_bytes:
+            break
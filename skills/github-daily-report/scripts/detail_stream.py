@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+流式获取 commit 详情：边下载边丢弃 patch，并跟随文件分页
+
+/commits/{sha} 的响应里每个文件都带完整的 patch 文本，依赖目录或数据集的 commit
+可能有几十 MB，而我们每个文件只需要五个字段。这里按块读取响应，在解析前就把所有
+"patch" 字段的字符串值替换成 null（跨块的长字符串边读边丢弃，不在内存中拼接），
+剩下的小 JSON 再交给 json.loads。峰值内存只与块大小和文件数有关，与 patch 大小无关。
+
+超过 300 个文件的 commit，GitHub 会把其余文件放在后续分页里（Link: rel="next"，
+每页重复 commit 信息，最多 3000 个文件），这里逐页获取并合并 files。
+"""
+import json
+import re
+import github_client
+import detail_cache
+
+CHUNK_SIZE = 64 * 1024
+# GitHub 最多返回 3000 个文件（每页 300 个）
+MAX_FILE_PAGES = 10
+PATCH_KEY = b"patch"
+
+# 字符串内容中尽可能长的一段完整内容（普通字符或完整的转义序列）
+_STRING_BODY = re.compile(rb'(?:[^"\\]+|\\.)*', re.S)
+_WHITESPACE = b" \t\r\n"
+
+_NORMAL, _STRING, _SKIP = range(3)
+
+
+class PatchStripper:
+    """
+    增量扫描 JSON 字节流，把 "patch" 键对应的字符串值替换成 null
+
+    只跟踪字符串边界（字符串内部的引号、转义都能正确处理），其余字节原样保留。
+    """
+
+    def __init__(self):
+        self.out = []
+        self.state = _NORMAL
+        self.escaped = False
+        # 当前字符串内容的前几个字节，用于判断是否是 "patch" 键
+        self.prefix = b""
+        # None / "colon" / "value"：刚读完 "patch" 字符串后，等待冒号和值
+        self.expect = None
+
+    def feed(self, data):
+        i, n = 0, len(data)
+        while i < n:
+            if self.state == _NORMAL:
+                if self.expect:
+                    start = i
+                    while i < n and data[i] in _WHITESPACE:
+                        i += 1
+                    self.out.append(data[start:i])
+                    if i == n:
+                        break
+                    if self.expect == "colon":
+                        if data[i:i + 1] == b":":
+                            self.out.append(b":")
+                            i += 1
+                            self.expect = "value"
+                        else:
+                            # 不是键，只是值为 "patch" 的字符串
+                            self.expect = None
+                        continue
+                    self.expect = None
+                    if data[i:i + 1] == b'"':
+                        self.out.append(b"null")
+                        self.state, self.escaped = _SKIP, False
+                        i += 1
+                    continue
+                j = data.find(b'"', i)
+                if j < 0:
+                    self.out.append(data[i:])
+                    break
+                self.out.append(data[i:j + 1])
+                self.state, self.escaped, self.prefix = _STRING, False, b""
+                i = j + 1
+                continue
+
+            # 字符串内部（_STRING 原样保留，_SKIP 丢弃）
+            keep = self.state == _STRING
+            start = i
+            if self.escaped:
+                # 上一块以反斜杠结尾，这一块的第一个字节属于转义序列
+                i += 1
+                self.escaped = False
+            end = _STRING_BODY.match(data, i).end()
+            if keep:
+                self.prefix = (self.prefix + data[start:end])[:len(PATCH_KEY) + 1]
+            if end < n and data[end:end + 1] == b'"':
+                if keep:
+                    self.out.append(data[start:end + 1])
+                    if self.prefix == PATCH_KEY:
+                        self.expect = "colon"
+                self.state = _NORMAL
+                i = end + 1
+                continue
+            # 字符串跨块：这一块剩下的都属于字符串，末尾可能是未完成的转义
+            if keep:
+                self.out.append(data[start:n])
+            self.escaped = end == n - 1
+            break
+
+    def result(self):
+        """解析去掉 patch 之后的 JSON"""
+        return json.loads(b"".join(self.out))
+
+
+def parse_without_patches(chunks):
+    """把字节块流解析成 JSON 对象，所有 patch 字段的值为 None"""
+    stripper = PatchStripper()
+    for chunk in chunks:
+        stripper.feed(chunk)
+    return stripper.result()
+
+
+def fetch_commit_detail(repo, sha, token):
+    """
+    流式获取 commit 详情并合并文件分页，返回 detail_cache.trim_detail 格式的结果
+
+    请求失败时抛出 GitHubAPIError（第一页）；后续分页失败时保留已获取的文件。
+    """
+    path = f"/repos/{repo}/commits/{sha}"
+    detail = None
+    for page in range(MAX_FILE_PAGES):
+        response = github_client.get_stream(path, token, priority="high")
+        try:
+            if response.status_code != 200:
+                if detail is None:
+                    raise github_client.GitHubAPIError(response.status_code, path)
+                print(f"  ⚠️ {repo}@{sha[:7]} 的文件列表第 {page + 1} 页获取失败，只保留前 {len(detail['files'])} 个文件")
+                break
+            data = parse_without_patches(github_client.iter_chunks(response, CHUNK_SIZE))
+            next_link = response.links.get("next")
+        finally:
+            response.close()
+
+        trimmed = detail_cache.trim_detail(data)
+        if detail is None:
+            detail = trimmed
+        else:
+            detail["files"].extend(trimmed["files"])
+        if not next_link:
+            break
+        path = next_link["url"]
+    return detail
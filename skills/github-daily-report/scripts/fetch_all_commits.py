@@ -2,107 +2,104 @@
 """
 获取所有 GitHub 仓库的今日 commits
 """
-import requests
 from datetime import datetime, timezone
 import json
 import sys
 sys.path.insert(0, str(__file__).rsplit('/', 1)[0])
-from config_manager import get_github_token, get_github_username
+from config_manager import get_github_token, get_github_username, get_fetch_backend, get_discovery_mode
+from fetch_engine import report_failures
+from commit_source import get_today_range, iter_commits
+from commit_stream import repo_stream, merge_streams, NdjsonSink, parse_ndjson_arg, render_repo_section, render_commit_line
+import github_client
+import repo_inventory
+import run_trace
 
+# 搜索 API 最多只返回 1000 条结果
+SEARCH_RESULT_LIMIT = 1000
 
-def get_all_repos(token, username):
-    """获取用户的所有仓库（包括参与的）"""
-    repos = []
-    page = 1
-    
-    # 获取用户自己的仓库
-    while True:
-        url = f"https://api.github.com/users/{username}/repos"
-        headers = {"Authorization": f"token {token}"}
-        params = {"per_page": 100, "page": page, "sort": "pushed", "direction": "desc"}
-        
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code != 200:
-            print(f"获取仓库列表失败: {response.status_code}")
-            break
-        
-        data = response.json()
-        if not data:
-            break
-        
-        repos.extend([r["full_name"] for r in data])
-        page += 1
-        
-        # 限制只获取最近活跃的 200 个仓库
-        if len(repos) >= 200:
-            break
-    
-    # 获取用户参与的仓库（有 push 权限的）
-    page = 1
-    while True:
-        url = "https://api.github.com/user/repos"
-        headers = {"Authorization": f"token {token}"}
-        params = {"per_page": 100, "page": page, "affiliation": "collaborator", "sort": "pushed"}
-        
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code != 200:
-            break
-        
-        data = response.json()
-        if not data:
-            break
-        
-        for r in data:
-            if r["full_name"] not in repos:
-                repos.append(r["full_name"])
-        
-        page += 1
-        if page > 5:  # 限制页数
-            break
-    
+
+def get_all_repos(token, username, since=None):
+    """
+    获取用户的所有仓库（包括参与的），按最近 push 时间倒序
+
+    通过 repo_inventory 的本地清单增量刷新；指定 since 时只返回
+    pushed_at 不早于 since 的仓库，列表也只翻到 since 为止。
+    """
+    repos, _ = repo_inventory.get_active_repos(token, username, since)
     return repos
 
 
-def get_today_commits(repo, username, token):
-    """获取指定仓库今日的 commits"""
-    now = datetime.now(timezone.utc)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    today_end = today_start.replace(hour=23, minute=59, second=59)
-    
-    url = f"https://api.github.com/repos/{repo}/commits"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
+def search_commit_repos(username, token, start_time, end_time):
+    """
+    用 commit 搜索 API 找出时间范围内有该用户 commits 的仓库
+
+    只需要少量分页请求；搜索结果不完整（incomplete_results 或超过 1000 条）
+    或请求失败时返回 None，由调用方回退到逐仓库检查。
+    """
+    since = start_time.strftime("%Y-%m-%dT%H:%M:%SZ")
+    until = end_time.strftime("%Y-%m-%dT%H:%M:%SZ")
+    path = "/search/commits"
     params = {
-        "author": username,
-        "since": today_start.isoformat(),
-        "until": today_end.isoformat(),
+        "q": f"author:{username} committer-date:{since}..{until}",
+        "sort": "committer-date",
         "per_page": 100
     }
+    repos = []
     
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        if response.status_code == 200:
-            commits = response.json()
-            return [
-                {
-                    "sha": c["sha"][:7],
-                    "message": c["commit"]["message"],
-                    "repo": repo,
-                    "url": c["html_url"],
-                    "time": c["commit"]["committer"]["date"]
-                }
-                for c in commits
-            ]
-        elif response.status_code == 409:
-            # 空仓库
-            return []
-        else:
-            return []
+        while path:
+            response = github_client.get(path, token, params=params)
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            if data.get("incomplete_results") or data.get("total_count", 0) > SEARCH_RESULT_LIMIT:
+                return None
+            for item in data.get("items", []):
+                repo = item["repository"]["full_name"]
+                if repo not in repos:
+                    repos.append(repo)
+            path = response.links.get("next", {}).get("url")
+            params = None
     except Exception as e:
-        print(f"  请求失败 {repo}: {e}")
-        return []
+        print(f"  搜索请求失败: {e}")
+        return None
+    
+    return repos
+
+
+@run_trace.phase("repo_listing")
+def find_candidate_repos(token, username):
+    """
+    确定需要检查今日 commits 的仓库
+
+    discovery 为 search 时先用 commit 搜索只找出今天有提交的仓库，
+    搜索结果不完整时回退到列出全部仓库逐个检查。
+    """
+    if get_discovery_mode() == "search":
+        print(f"🔍 正在通过 commit 搜索查找 {username} 今日有提交的仓库...")
+        today_start, today_end = get_today_range()
+        repos = search_commit_repos(username, token, today_start, today_end)
+        if repos is not None:
+            print(f"✅ 搜索到 {len(repos)} 个仓库有今日 commits")
+            return repos
+        print("⚠️ 搜索结果不完整，回退到逐仓库检查")
+    
+    print(f"🔍 正在获取 {username} 今日有 push 的仓库...")
+    today_start, _ = get_today_range()
+    repos, skipped = repo_inventory.get_active_repos(token, username, today_start)
+    print(f"✅ 共找到 {len(repos)} 个仓库（跳过 {skipped} 个今日没有 push 的仓库）")
+    return repos
+
+
+def iter_today_commits(repos, username, token, ordered=True):
+    """
+    产出 (repo, 今日 commits)，根据配置选择 REST 并发或 GraphQL 批量获取
+
+    ordered 为 False 时 REST 模式按完成顺序产出，先完成的仓库先输出。
+    全账号扫描的仓库不固定，不使用 git 镜像后端。
+    """
+    backend = "rest" if get_fetch_backend() == "git" else None
+    return iter_commits(repos, username, token, *get_today_range(), ordered=ordered, backend=backend)
 
 
 def main():
@@ -113,35 +110,55 @@ def main():
         print("❌ 缺少 GitHub 配置")
         return
     
-    print(f"🔍 正在获取 {username} 的所有仓库...")
-    repos = get_all_repos(token, username)
-    print(f"✅ 共找到 {len(repos)} 个仓库")
+    repos = find_candidate_repos(token, username)
     print("")
     
+    ndjson_path = parse_ndjson_arg(sys.argv[1:])
+    sink = NdjsonSink(ndjson_path) if ndjson_path else None
+    
     print(f"📊 正在检查今日的 commits...")
-    all_commits = []
+    streams = []
+    total = 0
     repos_with_commits = []
+    failed_repos = []
     
-    for i, repo in enumerate(repos, 1):
+    # 流式模式下按完成顺序处理，每个仓库的结果一到就写出，不在内存里累积
+    results = iter_today_commits(repos, username, token, ordered=sink is None)
+    for i, (repo, commits) in enumerate(results, 1):
         print(f"  [{i}/{len(repos)}] {repo}...", end=" ", flush=True)
-        commits = get_today_commits(repo, username, token)
-        if commits:
+        if commits is None:
+            print("⚠️ 获取失败")
+            failed_repos.append(repo)
+        elif commits:
             print(f"✅ {len(commits)} 个")
-            all_commits.extend(commits)
+            commits = repo_stream(commits)
+            total += len(commits)
             repos_with_commits.append(repo)
+            if sink:
+                sink.write_all(commits)
+                print(render_repo_section(repo, commits))
+            else:
+                streams.append(commits)
         else:
             print("无")
-    
-    # 按时间排序
-    all_commits.sort(key=lambda x: x["time"])
+    report_failures(failed_repos)
     
     print("")
     print("=" * 60)
     print(f"📈 统计结果：{len(repos_with_commits)} 个仓库有今日 commits")
-    print(f"📈 总 commits 数：{len(all_commits)}")
+    print(f"📈 总 commits 数：{total}")
+    github_client.print_request_summary()
     print("=" * 60)
     print("")
     
+    if sink:
+        sink.close()
+        print(f"📁 {sink.count} 个 commits 已逐行写入: {sink.path}")
+        return
+    
+    # 各仓库已按时间升序，归并即得到全局时间顺序
+    all_commits = list(merge_streams(streams))
+    
     if all_commits:
         print("📋 今日 Commits 详情：")
         print("")
@@ -150,8 +167,7 @@ def main():
             if c["repo"] != current_repo:
                 current_repo = c["repo"]
                 print(f"\n【{current_repo}】")
-            msg = c["message"].split('\n')[0][:50]
-            print(f"  • [{c['sha']}] {msg}")
+            print(render_commit_line(c))
     else:
         print("😴 今日暂无 commits")
     
@@ -170,4 +186,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    run_trace.run(main)
@@ -2,51 +2,13 @@
 """
 获取 GitHub 今日 commits
 """
-import requests
-from datetime import datetime, timezone, timedelta
+import sys
+sys.path.insert(0, str(__file__).rsplit('/', 1)[0])
 from config_manager import get_github_token, get_github_username, get_repositories
-
-
-def get_today_commits_for_repo(repo, username, token):
-    """获取指定仓库今日的 commits"""
-    # 计算今天和明天的日期（UTC）
-    now = datetime.now(timezone.utc)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    today_end = today_start + timedelta(days=1)
-    
-    # 格式化为 ISO 8601
-    since = today_start.isoformat()
-    until = today_end.isoformat()
-    
-    url = f"https://api.github.com/repos/{repo}/commits"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-    params = {
-        "author": username,
-        "since": since,
-        "until": until,
-        "per_page": 100
-    }
-    
-    response = requests.get(url, headers=headers, params=params)
-    
-    if response.status_code == 200:
-        commits = response.json()
-        return [
-            {
-                "sha": c["sha"][:7],
-                "message": c["commit"]["message"],
-                "repo": repo,
-                "url": c["html_url"],
-                "time": c["commit"]["committer"]["date"]
-            }
-            for c in commits
-        ]
-    else:
-        print(f"⚠️ 获取 {repo} 失败: {response.status_code}")
-        return []
+from fetch_engine import report_failures
+from commit_source import get_today_commits
+from commit_stream import repo_stream, merge_streams
+import github_client
 
 
 def fetch_all_commits():
@@ -59,22 +21,28 @@ def fetch_all_commits():
         print("❌ 配置不完整，请先运行: python config_manager.py")
         return []
     
-    all_commits = []
+    streams = []
+    failed_repos = []
     print(f"\n📊 正在获取 {username} 今日的 commits...")
     
     for repo in repos:
         print(f"  检查 {repo}...", end=" ")
-        commits = get_today_commits_for_repo(repo, username, token)
-        if commits:
+        commits = get_today_commits(repo, username, token)
+        if commits is None:
+            print("⚠️ 获取失败")
+            failed_repos.append(repo)
+        elif commits:
             print(f"✓ 找到 {len(commits)} 个")
-            all_commits.extend(commits)
+            streams.append(repo_stream(commits))
         else:
             print("无")
+    report_failures(failed_repos)
     
-    # 按时间排序
-    all_commits.sort(key=lambda x: x["time"])
+    # 各仓库已按时间升序，归并即得到全局时间顺序
+    all_commits = list(merge_streams(streams))
     
     print(f"\n✅ 共找到 {len(all_commits)} 个 commits")
+    github_client.print_request_summary()
     return all_commits
 
 
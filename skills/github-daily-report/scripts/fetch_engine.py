@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+并发获取引擎：用有界线程池并发执行按仓库 / 按 commit 的请求，结果保持输入顺序
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config_manager import load_config
+import run_trace
+
+DEFAULT_MAX_CONCURRENCY = 8
+# GitHub 的 noreply 提交邮箱：[id+]login@users.noreply.github.com
+NOREPLY_EMAIL = re.compile(r"^(?:\d+\+)?([^@]+)@users\.noreply\.github\.com$", re.IGNORECASE)
+
+
+def get_max_concurrency():
+    """获取全局并发上限（config.json 中的 max_concurrency，默认 8）"""
+    try:
+        value = int(load_config().get('max_concurrency', DEFAULT_MAX_CONCURRENCY))
+    except (TypeError, ValueError):
+        value = DEFAULT_MAX_CONCURRENCY
+    return max(1, value)
+
+
+def map_ordered(func, items, max_workers=None):
+    """
+    并发执行 func(item)，按 items 的原始顺序逐个产出 (item, result)
+
+    结果在前面的项完成后立即产出，调用方可以边拿结果边打印进度。
+    工作线程发出的请求计入调用方所在的追踪阶段（run_trace.inherit）。
+    func 内部抛出的异常会在产出对应项时重新抛出。
+    """
+    items = list(items)
+    if not items:
+        return
+    workers = min(max_workers or get_max_concurrency(), len(items))
+    if workers == 1:
+        for item in items:
+            yield item, func(item)
+        return
+    func = run_trace.inherit(func)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for item, result in zip(items, executor.map(func, items)):
+            yield item, result
+
+
+def map_unordered(func, items, max_workers=None):
+    """
+    与 map_ordered 相同，但按完成顺序产出 (item, result)
+
+    流式输出时使用：慢的仓库不会挡住已经完成的仓库。
+    """
+    items = list(items)
+    if not items:
+        return
+    workers = min(max_workers or get_max_concurrency(), len(items))
+    if workers == 1:
+        for item in items:
+            yield item, func(item)
+        return
+    func = run_trace.inherit(func)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(func, item): item for item in items}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def commit_full_sha(commit):
+    """commit dict 中的 sha 只保留了 7 位，完整 sha 从 url 末尾取出"""
+    return commit["url"].rsplit("/", 1)[-1]
+
+
+def login_from_email(email):
+    """从 noreply 邮箱中取出 GitHub 登录名，不是 noreply 邮箱时返回 None"""
+    match = NOREPLY_EMAIL.match(email or "")
+    return match.group(1) if match else None
+
+
+def fetch_details(commits, get_detail, max_workers=None):
+    """
+    并发为每个 commit 获取详细信息，并把 stats / files 合并进 commit
+
+    get_detail(commit) 返回包含 stats / files 的 dict，失败时返回 None。
+    已经带有 files 或已合并统计到其他 commit（stats_in）的 commit 会被跳过。
+    """
+    pending = [c for c in commits if "files" not in c and "stats_in" not in c]
+    failed = 0
+    for commit, detail in map_ordered(get_detail, pending, max_workers):
+        if detail:
+            commit["stats"] = detail["stats"]
+            commit["files"] = detail["files"]
+        else:
+            failed += 1
+    if failed:
+        print(f"  ⚠️ {failed} 个 commits 的详情获取失败，这些 commits 不含文件改动信息")
+    return commits
+
+
+def report_failures(failed_repos):
+    """打印获取失败的仓库，提醒结果不完整（失败不再被当作“无 commits”）"""
+    if failed_repos:
+        print(f"⚠️ {len(failed_repos)} 个仓库获取失败，结果可能不完整: {', '.join(failed_repos)}")
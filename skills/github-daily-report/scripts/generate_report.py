@@ -1,12 +1,24 @@
 #!/usr/bin/env python3
 """
 生成工作日报并准备推送到 Notion
+
+用法:
+  python generate_report.py [--record [PATH]]     获取今日 commits（--record 同时录制快照）
+  python generate_report.py --from-snapshot [PATH]  不联网，用快照重新生成日报和摘要
 """
 import json
+import sys
 from datetime import datetime, timezone
-from fetch_all_commits import get_all_repos, get_today_commits, get_github_token, get_github_username
+sys.path.insert(0, str(__file__).rsplit('/', 1)[0])
+from fetch_all_commits import find_candidate_repos, iter_today_commits, get_github_token, get_github_username
+from fetch_engine import report_failures
+from commit_stream import repo_stream, merge_streams
+import github_client
+import run_trace
+import snapshot
 
 
+@run_trace.phase("prompt_rendering")
 def generate_markdown_report(commits_data):
     """生成 Markdown 格式的工作日报"""
     date = commits_data["date"]
@@ -47,6 +59,7 @@ def generate_markdown_report(commits_data):
     return '\n'.join(lines)
 
 
+@run_trace.phase("prompt_rendering")
 def generate_summary(commits_data):
     """生成供 LLM 使用的总结"""
     date = commits_data["date"]
@@ -67,7 +80,8 @@ def generate_summary(commits_data):
     return summary
 
 
-def main():
+def fetch_commits_data():
+    """获取今日 commits，返回 generate_markdown_report / generate_summary 使用的数据，配置不完整时返回 None"""
     print("📊 正在获取所有仓库的今日 commits...")
     print("")
     
@@ -76,26 +90,31 @@ def main():
     
     if not token or not username:
         print("❌ 缺少 GitHub 配置")
-        return
+        return None
     
-    repos = get_all_repos(token, username)
-    print(f"✅ 找到 {len(repos)} 个仓库，开始检查...")
+    repos = find_candidate_repos(token, username)
+    print("开始检查...")
     print("")
     
-    all_commits = []
+    streams = []
     repos_with_commits = []
+    failed_repos = []
     
-    for i, repo in enumerate(repos, 1):
+    results = iter_today_commits(repos, username, token)
+    for i, (repo, commits) in enumerate(results, 1):
         print(f"  [{i}/{len(repos)}] {repo}...", end=" ", flush=True)
-        commits = get_today_commits(repo, username, token)
-        if commits:
+        if commits is None:
+            print("⚠️ 获取失败")
+            failed_repos.append(repo)
+        elif commits:
             print(f"✅ {len(commits)} 个")
-            all_commits.extend(commits)
+            streams.append(repo_stream(commits))
             repos_with_commits.append(repo)
         else:
             print("无")
+    report_failures(failed_repos)
     
-    all_commits.sort(key=lambda x: x["time"])
+    all_commits = list(merge_streams(streams))
     
     commits_data = {
         "date": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
@@ -105,6 +124,29 @@ def main():
     }
     
     print("")
+    github_client.print_request_summary()
+    return commits_data
+
+
+def main():
+    record_path, snapshot_path = snapshot.parse_args(sys.argv[1:])
+    if snapshot_path:
+        recorded = snapshot.load(snapshot_path)
+        commits = recorded["commits"]
+        commits_data = {
+            "date": recorded["date"],
+            "total_commits": len(commits),
+            "repos_with_commits": recorded.get("repos_with_commits") or snapshot.repos_with_commits(commits),
+            "commits": commits
+        }
+    else:
+        commits_data = fetch_commits_data()
+        if commits_data is None:
+            return
+        if record_path:
+            snapshot.save(record_path, commits_data["commits"], date=commits_data["date"],
+                          repos_with_commits=commits_data["repos_with_commits"])
+    all_commits = commits_data["commits"]
     print("=" * 60)
     
     if not all_commits:
@@ -138,4 +180,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    run_trace.run(main)
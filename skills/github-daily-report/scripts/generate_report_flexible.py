@@ -3,82 +3,27 @@
 灵活版工作日报生成器
 - 支持自定义日期范围（如包含次日凌晨）
 - 支持指定 Notion 目标位置
+- --record [PATH] 录制获取到的 commits；--from-snapshot [PATH] 不联网、不再询问，用快照重新生成提示
 """
-import requests
 from datetime import datetime, timezone, timedelta
 import json
 import sys
 sys.path.insert(0, str(__file__).rsplit('/', 1)[0])
-from config_manager import get_github_token, get_github_username, get_repositories
+from config_manager import get_github_token, get_github_username, get_repositories, load_config
+from commit_source import collect_commits, enrich_commits
+import prompt_builder
+import github_client
+import run_trace
+import snapshot
 
 
-def get_commits_in_range(repo, username, token, start_time, end_time):
-    """获取指定时间范围内的 commits"""
-    url = f"https://api.github.com/repos/{repo}/commits"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-    params = {
-        "author": username,
-        "since": start_time.isoformat(),
-        "until": end_time.isoformat(),
-        "per_page": 100
-    }
-    
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        if response.status_code == 200:
-            commits = response.json()
-            return [
-                {
-                    "sha": c["sha"][:7],
-                    "message": c["commit"]["message"],
-                    "repo": repo,
-                    "url": c["html_url"],
-                    "time": c["commit"]["committer"]["date"]
-                }
-                for c in commits
-            ]
-    except Exception as e:
-        print(f"  请求失败 {repo}: {e}")
-    
-    return []
-
+def fetch_commits_with_range(start_time, end_time, detail_group=None):
+    """
+    获取指定时间范围的 commits
 
-def get_commit_detail(repo, sha, token):
-    """获取单个 commit 的详细信息"""
-    url = f"https://api.github.com/repos/{repo}/commits/{sha}"
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-    
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "stats": data.get("stats", {}),
-                "files": [
-                    {
-                        "filename": f["filename"],
-                        "status": f["status"],
-                        "additions": f["additions"],
-                        "deletions": f["deletions"],
-                        "changes": f["changes"]
-                    }
-                    for f in data.get("files", [])
-                ]
-            }
-    except Exception as e:
-        print(f"  获取详情失败: {e}")
-    
-    return None
-
-
-def fetch_commits_with_range(start_time, end_time):
-    """获取指定时间范围的 commits"""
+    detail_group(commit) 用于 compare 模式：区间合计只在同一组内计算（例如按报告日分组），
+    不会跨组合并统计。启用 commit_store 时详情总是逐个 commit 获取，不使用 detail_group。
+    """
     token = get_github_token()
     username = get_github_username()
     repos = get_repositories()
@@ -91,35 +36,41 @@ def fetch_commits_with_range(start_time, end_time):
         print("❌ 未配置监控的仓库列表")
         return []
     
-    all_commits = []
     print(f"📊 正在获取 {username} 的 commits...")
     print(f"   时间范围: {start_time.strftime('%Y-%m-%d %H:%M')} ~ {end_time.strftime('%Y-%m-%d %H:%M')}")
     print(f"   监控仓库: {', '.join(repos)}")
     print("")
     
-    for repo in repos:
-        print(f"  📁 {repo}...", end=" ", flush=True)
-        commits = get_commits_in_range(repo, username, token, start_time, end_time)
-        
-        # 获取详细信息
-        detailed_commits = []
-        for c in commits:
-            detail = get_commit_detail(repo, c["sha"], token)
-            if detail:
-                c.update(detail)
-            detailed_commits.append(c)
-        
-        if detailed_commits:
-            print(f"✅ {len(detailed_commits)} 个")
-            all_commits.extend(detailed_commits)
-        else:
-            print("无")
+    import watch_daemon
+    stored = watch_daemon.read_store(start_time, end_time, username, repos)
+    if stored is not None:
+        # watch 守护进程保持本地库最新，只为后台还没补齐详情的 commits 发请求
+        enrich_commits([c for c in stored if "files" not in c], token, detail_group)
+        print("")
+        print(f"✅ 共找到 {len(stored)} 个 commits")
+        github_client.print_request_summary()
+        return stored
+    
+    if load_config().get('commit_store'):
+        # 增量同步到本地 commit 库，再从本地查询。库里只保存逐个 commit 的精确详情，
+        # sync 总是按 commit 获取详情；compare 模式的区间合计不会写进库，detail_group 在这里用不上
+        import commit_store
+        store = commit_store.CommitStore()
+        try:
+            added = commit_store.sync(store, repos, username, token, start_time)
+            all_commits = store.query(start_time, end_time, author=username, repos=repos)
+        finally:
+            store.close()
+        print("")
+        print(f"✅ 本地库新增 {added} 个 commits，共找到 {len(all_commits)} 个 commits")
+        github_client.print_request_summary()
+        return all_commits
     
-    # 按时间排序
-    all_commits.sort(key=lambda x: x["time"])
+    all_commits = collect_commits(repos, username, token, start_time, end_time, detail_group=detail_group)
     
     print("")
     print(f"✅ 共找到 {len(all_commits)} 个 commits")
+    github_client.print_request_summary()
     
     return all_commits
 
@@ -129,7 +80,7 @@ def generate_llm_prompt(commits, report_date, notion_location):
     if not commits:
         return f"今日 ({report_date}) 暂无 commits"
     
-    prompt = f"""请帮我生成工作日报并推送到 Notion 的指定位置。
+    header = f"""请帮我生成工作日报并推送到 Notion 的指定位置。
 
 **日报日期**: {report_date}
 **Notion 目标位置**: {notion_location}
@@ -138,26 +89,7 @@ def generate_llm_prompt(commits, report_date, notion_location):
 
 """
     
-    for c in commits:
-        prompt += f"【{c['repo']}】\n"
-        prompt += f"Commit: {c['sha']}\n"
-        prompt += f"Message: {c['message']}\n"
-        
-        if "stats" in c:
-            stats = c["stats"]
-            prompt += f"改动: +{stats.get('additions', 0)} / -{stats.get('deletions', 0)} 行\n"
-        
-        if "files" in c and c["files"]:
-            prompt += "涉及文件:\n"
-            for f in c["files"][:8]:
-                status_icon = {"added": "+", "modified": "~", "removed": "-"}.get(f["status"], "?")
-                prompt += f"  {status_icon} {f['filename']} ({f['changes']}行)\n"
-            if len(c["files"]) > 8:
-                prompt += f"  ... 等共 {len(c['files'])} 个文件\n"
-        
-        prompt += "\n"
-    
-    prompt += f"""
+    footer = f"""
 请执行以下操作：
 
 1. 在 Notion 的 "{notion_location}" 页面/数据库中，查找或创建日期为 "{report_date}" 的日报
@@ -175,10 +107,21 @@ def generate_llm_prompt(commits, report_date, notion_location):
 请确认并生成日报。
 """
     
+    # 按 prompt_token_budget 决定每个 commit 的详细程度
+    prompt, report = prompt_builder.build_prompt(commits, header, footer)
+    prompt_builder.print_report(report)
+    
     return prompt
 
 
 def main():
+    record_path, snapshot_path = snapshot.parse_args(sys.argv[1:])
+    if snapshot_path:
+        recorded = snapshot.load(snapshot_path)
+        report_date = recorded.get("report_date") or recorded["date"]
+        print(generate_llm_prompt(recorded["commits"], report_date, recorded.get("notion_location", "25-26")))
+        return
+    
     now = datetime.now(timezone.utc)
     
     print("=" * 70)
@@ -231,6 +174,9 @@ def main():
     
     # 获取 commits
     commits = fetch_commits_with_range(start_time, end_time)
+    if record_path:
+        snapshot.save(record_path, commits, date=start_time.strftime("%Y-%m-%d"),
+                      report_date=report_date, notion_location=notion_location)
     
     if not commits:
         print("\n😴 该时间段暂无 commits")
@@ -257,4 +203,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    run_trace.run(main)
@@ -1,21 +1,32 @@
 #!/usr/bin/env python3
 """
 生成工作日报 v2 - 支持智能内容分析和追加更新
+
+用法:
+  python generate_report_v2.py            获取今日全部 commits，输出创建 / 追加两种提示
+  python generate_report_v2.py --append   只获取上次生成日报之后的新 commits，输出追加提示
+  python generate_report_v2.py --record [PATH]          同时把 commits 录制到快照
+  python generate_report_v2.py --from-snapshot [PATH]   不联网，用快照重新生成提示（不更新水位）
 """
 import json
+import sys
 from datetime import datetime, timezone
+sys.path.insert(0, str(__file__).rsplit('/', 1)[0])
 from fetch_commits_with_diff import fetch_today_commits_with_details, generate_llm_prompt
+import report_watermark
+import run_trace
+import snapshot
 
 
-def generate_notion_prompt(commits, mode="create"):
+def generate_notion_prompt(commits, mode="create", date_str=None):
     """
-    生成 Notion 操作的提示文本
+    生成 Notion 操作的提示文本（date_str 默认为今天）
     
     mode: 
       - "create": 创建新日报
       - "append": 追加到已有日报
     """
-    date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    date_str = date_str or datetime.now(timezone.utc).strftime("%Y-%m-%d")
     
     if mode == "create":
         prompt = f"""请帮我生成今日工作日报并推送到 Notion。
@@ -33,7 +44,7 @@ def generate_notion_prompt(commits, mode="create"):
 """
     
     # 添加 commits 信息
-    prompt += generate_llm_prompt(commits).split("\n\n请根据以上")[0]
+    prompt += generate_llm_prompt(commits, date_str).split("\n\n请根据以上")[0]
     
     if mode == "create":
         prompt += f"""
@@ -68,36 +79,78 @@ def generate_notion_prompt(commits, mode="create"):
 
 
 def main():
-    print("📊 正在获取今日详细 commits（包含文件改动信息）...")
-    print("")
+    append = "--append" in sys.argv[1:]
+    record_path, snapshot_path = snapshot.parse_args(sys.argv[1:])
+    date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    recorded = None
+    if snapshot_path:
+        recorded = snapshot.load(snapshot_path)
+        date_str = recorded["date"]
     
-    commits = fetch_today_commits_with_details()
+    if append:
+        marks = report_watermark.load(date_str)
+        keep = lambda c: report_watermark.is_new(c, marks)
+        if recorded:
+            commits = [c for c in recorded["commits"] if keep(c)]
+        else:
+            print("📊 正在获取上次日报之后的新 commits（包含文件改动信息）...")
+            print("")
+            commits = fetch_today_commits_with_details(keep=keep, since=report_watermark.since_times(marks))
+        
+        if not commits:
+            print("😴 上次生成日报之后没有新的 commits，无需追加")
+            return
+        
+        print("")
+        print("=" * 70)
+        print("🌙 追加更新已有日报")
+        print("=" * 70)
+        print("")
+        print("在 Kimi CLI 中输入：")
+        print("-" * 70)
+        print(generate_notion_prompt(commits, mode="append", date_str=date_str))
+    else:
+        if recorded:
+            commits = recorded["commits"]
+        else:
+            print("📊 正在获取今日详细 commits（包含文件改动信息）...")
+            print("")
+            commits = fetch_today_commits_with_details()
+        
+        if not commits:
+            print("😴 今日暂无 commits")
+            return
+        
+        print("")
+        print("=" * 70)
+        print("🌅 场景 1：创建新的日报（上午/第一次）")
+        print("=" * 70)
+        print("")
+        print("在 Kimi CLI 中输入：")
+        print("-" * 70)
+        print(generate_notion_prompt(commits, mode="create", date_str=date_str))
+        
+        print("")
+        print("=" * 70)
+        print("🌙 场景 2：追加更新已有日报（下午/晚上）")
+        print("=" * 70)
+        print("")
+        print("在 Kimi CLI 中输入：")
+        print("-" * 70)
+        print(generate_notion_prompt(commits, mode="append", date_str=date_str))
     
-    if not commits:
-        print("😴 今日暂无 commits")
+    if record_path:
+        snapshot.save(record_path, commits, date=date_str)
+    if recorded:
+        # 离线重放不代表日报已更新，不改动水位和输出文件
         return
     
-    print("")
-    print("=" * 70)
-    print("🌅 场景 1：创建新的日报（上午/第一次）")
-    print("=" * 70)
-    print("")
-    print("在 Kimi CLI 中输入：")
-    print("-" * 70)
-    print(generate_notion_prompt(commits, mode="create"))
-    
-    print("")
-    print("=" * 70)
-    print("🌙 场景 2：追加更新已有日报（下午/晚上）")
-    print("=" * 70)
-    print("")
-    print("在 Kimi CLI 中输入：")
-    print("-" * 70)
-    print(generate_notion_prompt(commits, mode="append"))
+    # 记录水位，下次 --append 只处理之后的 commits
+    report_watermark.advance(date_str, commits)
     
     # 同时输出 JSON 供其他工具使用
     result = {
-        "date": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+        "date": date_str,
         "total_commits": len(commits),
         "commits": commits
     }
@@ -114,4 +167,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    run_trace.run(main)
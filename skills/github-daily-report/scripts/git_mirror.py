@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+本地 git 镜像后端：用 git log --numstat 读取 commits，不消耗 API 配额
+
+为配置的 repositories 在 ~/.config/github-daily-report/mirrors 下维护裸镜像，
+每次运行对每个仓库执行一次 git fetch，再用一个 git log 进程读出时间范围内的
+commits、作者和逐文件增删行数，输出与 get_commits_in_range + get_commit_detail 相同的 commit dict。
+
+配置项：
+  git_url_template  克隆地址模板，默认 https://github.com/{repo}.git（可改成 file:// 或 ssh 地址）
+  git_author        git log --author 的匹配模式，默认为 GitHub 用户名（匹配 noreply 邮箱）
+
+与 REST 的差异：重命名记为一个 removed 加一个 added（--no-renames）。
+"""
+import base64
+import os
+import subprocess
+from datetime import datetime, timezone
+from config_manager import CONFIG_DIR, load_config, get_branch_mode
+
+MIRROR_DIR = CONFIG_DIR / "mirrors"
+DEFAULT_URL_TEMPLATE = "https://github.com/{repo}.git"
+STATUS_NAMES = {"A": "added", "M": "modified", "D": "removed", "T": "changed", "C": "copied", "R": "renamed"}
+# 记录之间和字段之间的分隔符
+RS, FS = "\x1e", "\x1f"
+LOG_FORMAT = "%x1e%H%x1f%cI%x1f%B%x1f"
+
+
+def _git(args, token=None, cwd=None):
+    """
+    运行 git 命令，token 通过临时的 http.extraHeader 传入，不写进镜像配置
+
+    配置放在 GIT_CONFIG_COUNT / GIT_CONFIG_KEY_n / GIT_CONFIG_VALUE_n 环境变量里（git 2.31+），
+    不出现在命令行参数中，其他用户用 ps 看不到 token。
+    """
+    env = None
+    if token:
+        basic = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+        env = dict(os.environ)
+        # 接在环境里已有的配置项后面
+        index = int(env.get("GIT_CONFIG_COUNT") or 0)
+        env["GIT_CONFIG_COUNT"] = str(index + 1)
+        env[f"GIT_CONFIG_KEY_{index}"] = "http.extraHeader"
+        env[f"GIT_CONFIG_VALUE_{index}"] = f"Authorization: Basic {basic}"
+    result = subprocess.run(["git", "-c", "core.quotePath=false"] + args, cwd=cwd, env=env,
+                            capture_output=True, text=True, encoding="utf-8", errors="replace")
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"git {args[0]} 失败")
+    return result.stdout
+
+
+def mirror_path(repo):
+    return MIRROR_DIR / f"{repo}.git"
+
+
+def update_mirror(repo, token=None):
+    """首次运行时 clone --mirror，之后只执行 git fetch"""
+    path = mirror_path(repo)
+    if path.exists():
+        _git(["fetch", "--prune", "--quiet", "origin"], token, cwd=str(path))
+    else:
+        template = load_config().get('git_url_template', DEFAULT_URL_TEMPLATE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _git(["clone", "--mirror", "--quiet", template.format(repo=repo), str(path)], token)
+    return path
+
+
+def _has_branches(path):
+    """镜像里是否有分支：空仓库 clone 下来没有任何 ref，HEAD 也无法解析"""
+    return bool(_git(["for-each-ref", "--count=1", "--format=%(refname)", "refs/heads"], cwd=str(path)).strip())
+
+
+def _utc(iso_time):
+    """git 的 %cI 带本地时区，转换成 GitHub API 的 UTC 格式"""
+    dt = datetime.fromisoformat(iso_time)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_log(output, repo):
+    """解析 --raw --numstat 输出，返回 commit dict 列表（新的在前）"""
+    commits = []
+    for record in output.split(RS)[1:]:
+        sha, committed, message, diff = record.split(FS, 3)
+        statuses = {}
+        files = []
+        for line in diff.splitlines():
+            if not line:
+                continue
+            if line.startswith(":"):
+                meta, path = line.split("\t", 1)
+                statuses[path] = STATUS_NAMES.get(meta.split()[-1][0], "modified")
+                continue
+            added, deleted, path = line.split("\t", 2)
+            # 二进制文件显示为 "-"，与 API 一样记为 0
+            additions = int(added) if added != "-" else 0
+            deletions = int(deleted) if deleted != "-" else 0
+            files.append({
+                "filename": path,
+                "status": statuses.get(path, "modified"),
+                "additions": additions,
+                "deletions": deletions,
+                "changes": additions + deletions
+            })
+        additions = sum(f["additions"] for f in files)
+        deletions = sum(f["deletions"] for f in files)
+        commits.append({
+            "sha": sha[:7],
+            "message": message.rstrip("\n"),
+            "repo": repo,
+            "url": f"https://github.com/{repo}/commit/{sha}",
+            "time": _utc(committed),
+            "stats": {"additions": additions, "deletions": deletions, "total": additions + deletions},
+            "files": files
+        })
+    return commits
+
+
+def get_commits_in_range(repo, username, token, start_time, end_time):
+    """
+    更新镜像并读取时间范围内的 commits（含 stats / files）
+
+    范围内没有 commits（包括空仓库）时返回 []，clone / fetch / git log 失败时返回 None。
+
+    默认只读默认分支；branches 为 all 时读所有分支（--branches，git log 本身按 sha 去重，
+    不包含镜像里的 refs/pull/*）。
+    """
+    try:
+        path = update_mirror(repo, token)
+        if not _has_branches(path):
+            return []
+        refs = "--branches" if get_branch_mode() == "all" else "HEAD"
+        args = [
+            "log", "--raw", "--numstat", "--no-renames", "--diff-merges=first-parent",
+            f"--since={start_time.isoformat()}", f"--until={end_time.isoformat()}",
+            f"--format={LOG_FORMAT}",
+        ]
+        author = load_config().get('git_author', username)
+        if author:
+            args.append(f"--author={author}")
+        return _parse_log(_git(args + [refs, "--"], cwd=str(path)), repo)
+    except Exception as e:
+        print(f"  git 镜像读取失败 {repo}: {e}")
+        return None
+
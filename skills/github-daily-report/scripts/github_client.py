@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+共享的 GitHub HTTP 客户端：连接池 + keep-alive、gzip/brotli 压缩、可选 HTTP/2、统一超时和认证头
+
+所有脚本都通过 get() 访问 GitHub API，整个进程只复用少量 TCP/TLS 连接。
+GET 请求默认经过 http_cache 的 ETag 条件请求缓存（config.json 中 http_cache 设为 false 可关闭）。
+所有请求都经过 rate_limiter 调度：同时在途的请求数受 max_concurrency 全局限制
+（嵌套的并发也不会超出），并按速率限制头自适应降速、重试。
+"""
+import os
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+from config_manager import load_config, get_github_token
+from fetch_engine import get_max_concurrency, map_ordered
+from http_cache import HttpCache, CachedResponse
+from rate_limiter import RateLimiter, DEFAULT_RESERVE, DEFAULT_MAX_RETRIES, DEFAULT_MAX_WAIT
+import run_trace
+
+API_BASE = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+DEFAULT_TIMEOUT = 10
+USER_AGENT = "github-daily-report"
+
+_client = None
+_client_lock = threading.Lock()
+_cache = None
+_limiter = None
+_transport_errors = (OSError,)
+_request_count = 0
+_count_lock = threading.Lock()
+
+
+def _accept_encoding():
+    """协商响应压缩方式，安装了 brotli 时额外接受 br"""
+    encodings = ["gzip", "deflate"]
+    try:
+        import brotli  # noqa: F401
+        encodings.append("br")
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            encodings.append("br")
+        except ImportError:
+            pass
+    return ", ".join(encodings)
+
+
+def _create_client():
+    """创建底层客户端：config.json 中 http2 为 true 且安装了 httpx[http2] 时使用 HTTP/2，否则使用 requests 连接池"""
+    config = load_config()
+    pool_size = max(10, int(config.get('max_concurrency', 8)))
+    base_headers = {
+        "Accept": "application/vnd.github.v3+json",
+        "Accept-Encoding": _accept_encoding(),
+        "User-Agent": USER_AGENT,
+    }
+
+    if config.get('http2'):
+        try:
+            import httpx
+            limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            client = httpx.Client(http2=True, limits=limits, headers=base_headers, timeout=DEFAULT_TIMEOUT)
+            _set_transport_errors(httpx.TransportError)
+            return client
+        except ImportError:
+            print("⚠️ 未安装 httpx[http2]，回退到 HTTP/1.1 连接池")
+
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(base_headers)
+    _set_transport_errors(requests.ConnectionError, requests.Timeout)
+    return session
+
+
+def _set_transport_errors(*errors):
+    """记录底层客户端的网络错误类型，这些错误会被重试"""
+    global _transport_errors
+    _transport_errors = (OSError,) + errors
+
+
+def get_client():
+    """获取进程内共享的客户端（线程安全的懒加载单例）"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _create_client()
+    return _client
+
+
+class GitHubAPIError(Exception):
+    """GitHub 返回了非预期的状态码"""
+
+    def __init__(self, status_code, url):
+        super().__init__(f"{status_code} {url}")
+        self.status_code = status_code
+        self.url = url
+
+
+def get_limiter():
+    """获取进程内共享的速率限制调度器"""
+    global _limiter
+    if _limiter is None:
+        with _client_lock:
+            if _limiter is None:
+                config = load_config()
+                _limiter = RateLimiter(
+                    get_max_concurrency(),
+                    reserve=int(config.get('rate_limit_reserve', DEFAULT_RESERVE)),
+                    max_retries=int(config.get('max_retries', DEFAULT_MAX_RETRIES)),
+                    max_wait=float(config.get('rate_limit_max_wait', DEFAULT_MAX_WAIT)),
+                )
+    return _limiter
+
+
+def _send(method, url, priority="normal", **kwargs):
+    """
+    经调度器发送请求：占用一个并发名额，限流 / 5xx / 网络错误按退避策略重试
+
+    priority="high" 的请求（commit 详情）可以使用保留配额。
+    """
+    client = get_client()
+    limiter = get_limiter()
+    request_headers = kwargs.get("headers") or {}
+    conditional = "If-None-Match" in request_headers or "If-Modified-Since" in request_headers
+    attempt = 0
+    while True:
+        limiter.acquire(priority)
+        response = error = None
+        started = time.perf_counter()
+        try:
+            if method == "stream":
+                response = _open_stream(client, url, **kwargs)
+            else:
+                response = getattr(client, method)(url, **kwargs)
+        except _transport_errors as e:
+            error = e
+        finally:
+            limiter.release()
+        _count_request()
+        run_trace.record_request(method, url, response, time.perf_counter() - started, attempt,
+                                 conditional, error)
+
+        if response is None:
+            if attempt >= limiter.max_retries:
+                raise error
+        else:
+            limiter.observe(response)
+            if not limiter.should_retry(response, attempt):
+                return response
+            if method == "stream":
+                response.close()
+
+        delay = limiter.retry_delay(response, attempt)
+        limiter.note_retry(response, delay)
+        time.sleep(delay)
+        attempt += 1
+
+
+def _open_stream(client, url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """发送 GET 请求但不读取响应体，由调用方通过 iter_chunks 逐块读取后 close()"""
+    if hasattr(client, "build_request"):
+        # httpx
+        return client.send(client.build_request("GET", url, timeout=timeout, **kwargs), stream=True)
+    return client.get(url, stream=True, timeout=timeout, **kwargs)
+
+
+def iter_chunks(response, chunk_size=64 * 1024):
+    """逐块产出 get_stream 响应体（已解压）"""
+    if hasattr(response, "iter_bytes"):
+        return response.iter_bytes(chunk_size)
+    return response.iter_content(chunk_size)
+
+
+def get_cache():
+    """获取进程内共享的条件请求缓存，配置中关闭时返回 None"""
+    global _cache
+    if _cache is None:
+        with _client_lock:
+            if _cache is None:
+                _cache = HttpCache() if load_config().get('http_cache', True) else False
+    return _cache or None
+
+
+def build_headers(token=None, extra=None):
+    """统一构建认证头，token 为空时从 config_manager 读取"""
+    token = token or get_github_token()
+    headers = {}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    if extra:
+        headers.update(extra)
+    return headers
+
+
+def api_url(path):
+    """把 /repos/... 形式的路径补全为完整 URL，已是完整 URL 的原样返回"""
+    if path.startswith("http://") or path.startswith("https://"):
+        return path
+    return f"{API_BASE}/{path.lstrip('/')}"
+
+
+def _count_request():
+    global _request_count
+    with _count_lock:
+        _request_count += 1
+
+
+def get(path, token=None, params=None, headers=None, timeout=DEFAULT_TIMEOUT, use_cache=True,
+        priority="normal"):
+    """
+    通过共享连接池发送 GET 请求，返回响应对象（requests.Response 或 httpx.Response）
+
+    有缓存条目时发送条件请求，收到 304 则返回由缓存构造的 CachedResponse。
+    """
+    url = api_url(path)
+    token = token or get_github_token()
+    request_headers = build_headers(token, headers)
+    cache = get_cache() if use_cache else None
+    key = entry = None
+    if cache:
+        key = cache.key(url, params, token)
+        entry = cache.load(key)
+        if entry:
+            request_headers.update(cache.conditional_headers(entry))
+
+    response = _send("get", url, priority=priority, params=params, headers=request_headers, timeout=timeout)
+
+    if cache:
+        if response.status_code == 304 and entry:
+            cache.record(hit=True)
+            return CachedResponse(entry)
+        cache.record(hit=False)
+        if response.status_code == 200:
+            cache.store(key, response)
+    return response
+
+
+def get_stream(path, token=None, params=None, headers=None, timeout=DEFAULT_TIMEOUT, priority="normal"):
+    """
+    流式 GET：只读取响应头就返回，响应体用 iter_chunks(response) 逐块读取，用完必须 close()
+
+    不经过 ETag 缓存（缓存需要完整的响应体）。
+    """
+    return _send("stream", api_url(path), priority=priority, params=params,
+                 headers=build_headers(token, headers), timeout=timeout)
+
+
+def post(path, token=None, json_body=None, headers=None, timeout=DEFAULT_TIMEOUT):
+    """通过共享连接池发送 POST 请求（用于 GraphQL）"""
+    return _send(
+        "post",
+        api_url(path),
+        json=json_body,
+        headers=build_headers(token, headers),
+        timeout=timeout,
+    )
+
+
+def _page_number(url):
+    """从分页 URL 中取出 page 参数"""
+    try:
+        return int(parse_qs(urlparse(url).query)["page"][0])
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+def _get_page(url, token, params=None):
+    response = get(url, token, params=params)
+    if response.status_code != 200:
+        raise GitHubAPIError(response.status_code, url)
+    return response
+
+
+def paginate(path, token=None, params=None, stop=None, max_pages=None, concurrent=False):
+    """
+    跟随 Link: rel="next" 逐页请求的生成器，每页到达后立即逐个产出条目
+
+    stop(item) 返回 True 时立即结束，既不产出该条目也不再请求后续页。
+    concurrent=True 且第一页给出 rel="last" 时，剩余页并发获取后按顺序产出
+    （这种模式下 stop 只能减少产出的条目，不能减少请求数）。
+    非 200 响应抛出 GitHubAPIError。
+    """
+    params = dict(params or {})
+    params.setdefault("per_page", 100)
+    response = _get_page(path, token, params)
+    pages = 1
+
+    while True:
+        for item in response.json():
+            if stop and stop(item):
+                return
+            yield item
+
+        next_link = response.links.get("next")
+        if not next_link or (max_pages and pages >= max_pages):
+            return
+
+        last_link = response.links.get("last")
+        if concurrent and last_link and pages == 1:
+            first, last = _page_number(next_link["url"]), _page_number(last_link["url"])
+            if first and last:
+                if max_pages:
+                    last = min(last, max_pages)
+                base = api_url(path)
+                page_params = [dict(params, page=n) for n in range(first, last + 1)]
+                for _, page in map_ordered(lambda p: _get_page(base, token, p), page_params):
+                    for item in page.json():
+                        if stop and stop(item):
+                            return
+                        yield item
+                return
+
+        response = _get_page(next_link["url"], token)
+        pages += 1
+
+
+def print_request_summary():
+    """打印本次运行的请求统计，包括由缓存应答（304）的请求数"""
+    cache = get_cache()
+    line = f"🌐 本次共发出 {_request_count} 个 GitHub 请求"
+    if cache:
+        line += f"，其中 {cache.hits} 个由本地缓存应答（304，不计入速率限制）"
+    print(line)
+    quota = get_limiter().summary()
+    if quota:
+        print(f"📉 速率限制：{quota}")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+GitHub Daily Report 统一入口
+
+子命令只在执行时才导入对应的模块（requests、并发、GraphQL 等都不会在启动时加载），
+`config show` 这类命令和 cron 定时任务都能快速启动。加 --timing 可以查看启动和执行耗时。
+
+用法:
+  github_daily_report.py fetch [--details] [--ndjson [PATH]]   获取今日 commits
+  github_daily_report.py report [--append] [--record [PATH] | --from-snapshot [PATH]]
+                                                                生成日报提示（创建 / 追加），可录制 / 离线重放
+  github_daily_report.py report --notion [--date D] [--file F]  直接写入 Notion
+  github_daily_report.py backfill START END [--tz TZ] [--cutoff H] [--format F] [--out DIR]
+  github_daily_report.py watch [status] [--no-webhook] [--no-poll]
+                                                                常驻后台保持本地 commit 库最新（webhook + 事件轮询）
+  github_daily_report.py config [show|reset]                    查看 / 重置 / 交互式配置
+
+全局开关（放在子命令之前）：--trace [PATH] 逐请求追踪、--profile cProfile、--trace-memory tracemalloc，
+详见 run_trace.py。
+
+可以在 shell 中设置别名: alias github-daily-report="python3 /path/to/scripts/github_daily_report.py"
+"""
+import sys
+import time
+
+_START = time.perf_counter()
+sys.path.insert(0, str(__file__).rsplit('/', 1)[0])
+
+
+def _snapshot_argv(args):
+    argv = []
+    for name in ("record", "from_snapshot"):
+        value = getattr(args, name)
+        if value is not None:
+            argv += ["--" + name.replace("_", "-")] + ([value] if value else [])
+    return argv
+
+
+def _run(main, argv):
+    """以 argv 调用各脚本原有的 main()"""
+    sys.argv = [sys.argv[0]] + argv
+    return main()
+
+
+def cmd_fetch(args):
+    ndjson = []
+    if args.ndjson is not None:
+        ndjson = ["--ndjson"] + ([args.ndjson] if args.ndjson else [])
+    if args.details:
+        from fetch_commits_with_diff import main
+    else:
+        from fetch_all_commits import main
+    _run(main, ndjson)
+
+
+def cmd_report(args):
+    if args.notion:
+        from notion_writer import main
+        argv = []
+        if args.date:
+            argv += ["--date", args.date]
+        if args.file:
+            argv += ["--file", args.file]
+        _run(main, argv)
+    else:
+        from generate_report_v2 import main
+        _run(main, (["--append"] if args.append else []) + _snapshot_argv(args))
+
+
+def cmd_backfill(args):
+    from backfill import main
+    argv = [args.start, args.end]
+    for name in ("tz", "cutoff", "format", "out", "notion_location"):
+        value = getattr(args, name)
+        if value is not None:
+            argv += ["--" + name.replace("_", "-"), str(value)]
+    _run(main, argv)
+
+
+def cmd_watch(args):
+    from watch_daemon import main
+    argv = [args.action] if args.action else []
+    if args.no_webhook:
+        argv.append("--no-webhook")
+    if args.no_poll:
+        argv.append("--no-poll")
+    _run(main, argv)
+
+
+def cmd_config(args):
+    from config_manager import main
+    _run(main, [args.action] if args.action else [])
+
+
+def build_parser():
+    import argparse
+    parser = argparse.ArgumentParser(prog="github-daily-report", description="GitHub 工作日报")
+    parser.add_argument("--timing", action="store_true", help="输出启动和执行耗时")
+    parser.add_argument("--trace", nargs="?", const="/tmp/github_daily_trace.jsonl", metavar="PATH",
+                        help="逐请求追踪，写入 JSON Lines 文件并打印各阶段汇总")
+    parser.add_argument("--profile", action="store_true", help="用 cProfile 分析运行耗时")
+    parser.add_argument("--trace-memory", action="store_true", help="用 tracemalloc 记录各阶段峰值内存")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("fetch", help="获取今日 commits")
+    p.add_argument("--details", action="store_true", help="同时获取文件改动，并输出 LLM 提示")
+    p.add_argument("--ndjson", nargs="?", const="", default=None, metavar="PATH", help="逐行写出 NDJSON")
+    p.set_defaults(func=cmd_fetch)
+
+    p = sub.add_parser("report", help="生成日报")
+    p.add_argument("--append", action="store_true", help="只处理上次日报之后的新 commits")
+    p.add_argument("--notion", action="store_true", help="直接写入 Notion")
+    p.add_argument("--date", help="Notion 日报日期（YYYY-MM-DD）")
+    p.add_argument("--file", help="写入 Notion 的 Markdown 文件")
+    p.add_argument("--record", nargs="?", const="", default=None, metavar="PATH", help="把 commits 录制到快照")
+    p.add_argument("--from-snapshot", nargs="?", const="", default=None, metavar="PATH", help="不联网，用快照生成")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("backfill", help="多日补录")
+    p.add_argument("start", help="开始日期 YYYY-MM-DD")
+    p.add_argument("end", help="结束日期 YYYY-MM-DD")
+    p.add_argument("--tz")
+    p.add_argument("--cutoff", type=int)
+    p.add_argument("--format", choices=("prompt", "json", "markdown"))
+    p.add_argument("--out")
+    p.add_argument("--notion-location")
+    p.set_defaults(func=cmd_backfill)
+
+    p = sub.add_parser("watch", help="常驻后台，接收 webhook / 轮询事件并补充详情")
+    p.add_argument("action", nargs="?", choices=("status",), help="status 查看守护进程状态")
+    p.add_argument("--no-webhook", action="store_true", help="不启动 webhook 接收")
+    p.add_argument("--no-poll", action="store_true", help="不轮询事件接口")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("config", help="配置")
+    p.add_argument("action", nargs="?", choices=("show", "reset"), help="不填则进入交互式配置")
+    p.set_defaults(func=cmd_config)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    ready = time.perf_counter()
+    try:
+        if args.trace or args.profile or args.trace_memory:
+            import run_trace
+            run_trace.run(lambda: args.func(args), args.trace, args.profile, args.trace_memory)
+        else:
+            args.func(args)
+    finally:
+        if args.timing:
+            done = time.perf_counter()
+            print(f"⏱️ 启动 {(ready - _START) * 1000:.1f} ms，执行 {(done - ready) * 1000:.1f} ms",
+                  file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+GraphQL 批量后端：用带别名的 GraphQL 查询一次获取多个仓库的 commit 历史
+
+每个请求覆盖 graphql_batch_size 个仓库（默认 25），返回的 commit dict
+与 REST 版 get_commits_in_range 完全一致；需要时附带 additions/deletions 组成的 stats。
+GraphQL 不提供逐文件改动，files 仍由 REST 的 get_commit_detail 补充
+（changedFilesIfAvailable 为 0 的 commit 直接跳过）。
+"""
+import json
+from config_manager import load_config
+from fetch_engine import login_from_email
+import github_client
+
+DEFAULT_BATCH_SIZE = 25
+HISTORY_FIELDS = """
+        pageInfo { hasNextPage endCursor }
+        nodes {
+          oid
+          message
+          url
+          committedDate
+          additions
+          deletions
+          changedFilesIfAvailable
+          author { email user { login } }
+        }"""
+
+_author_ids = {}
+
+
+def _graphql(query, token, variables=None):
+    """执行一次 GraphQL 查询，返回 data（失败时抛出 RuntimeError）"""
+    response = github_client.post("/graphql", token, json_body={"query": query, "variables": variables or {}})
+    if response.status_code != 200:
+        raise RuntimeError(f"GraphQL 请求失败: {response.status_code}")
+    payload = response.json()
+    errors = [e for e in payload.get("errors", []) if e.get("type") != "NOT_FOUND"]
+    if errors:
+        raise RuntimeError(f"GraphQL 错误: {errors[0].get('message')}")
+    return payload.get("data") or {}
+
+
+def get_author_id(username, token):
+    """把 GitHub 用户名解析为 GraphQL 节点 ID（history 的 author 过滤需要）"""
+    if username not in _author_ids:
+        data = _graphql("query($login: String!) { user(login: $login) { id } }", token, {"login": username})
+        _author_ids[username] = (data.get("user") or {}).get("id")
+    return _author_ids[username]
+
+
+def _history_query(entries):
+    """
+    构建带别名的查询，entries 为 [(alias, repo, cursor)]
+
+    每个仓库对应一个 repository(...) 别名，cursor 不为空时从该位置继续翻页。
+    """
+    parts = []
+    for alias, repo, cursor in entries:
+        owner, name = repo.split("/", 1)
+        after = f", after: {json.dumps(cursor)}" if cursor else ""
+        parts.append(f"""
+  {alias}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{
+    defaultBranchRef {{
+      target {{
+        ... on Commit {{
+          history(first: 100, since: $since, until: $until, author: $author{after}) {{{HISTORY_FIELDS}
+          }}
+        }}
+      }}
+    }}
+  }}""")
+    return ("query($since: GitTimestamp!, $until: GitTimestamp!, $author: CommitAuthor) {"
+            + "".join(parts) + "\n}")
+
+
+def _author_login(node):
+    author = node.get("author") or {}
+    if author.get("user"):
+        return author["user"]["login"]
+    return login_from_email(author.get("email"))
+
+
+def _to_commit(node, repo, with_stats, with_author=False):
+    """把 GraphQL 的 commit 节点转换为与 REST 版一致的 commit dict"""
+    commit = {
+        "sha": node["oid"][:7],
+        "message": node["message"],
+        "repo": repo,
+        "url": node["url"],
+        "time": node["committedDate"]
+    }
+    if with_author:
+        commit["author"] = _author_login(node)
+    if with_stats:
+        commit["stats"] = {
+            "additions": node["additions"],
+            "deletions": node["deletions"],
+            "total": node["additions"] + node["deletions"]
+        }
+        if node.get("changedFilesIfAvailable") == 0:
+            # 确定没有文件改动的 commit 不需要再调用 REST 详情接口
+            commit["files"] = []
+    return commit
+
+
+def get_commits_batch(repos, username, token, start_time, end_time, with_stats=False):
+    """
+    批量获取多个仓库在时间范围内的 commits
+
+    返回 {repo: [commit, ...]}，每个仓库内的顺序与 REST 接口一致（新的在前），
+    无法访问的仓库对应 None。username 为空时不按作者过滤，commit 额外带上 author。
+    """
+    config = load_config()
+    batch_size = max(1, int(config.get('graphql_batch_size', DEFAULT_BATCH_SIZE)))
+    variables = {
+        "since": start_time.isoformat(),
+        "until": end_time.isoformat(),
+        "author": None
+    }
+    if username:
+        author_id = get_author_id(username, token)
+        if not author_id:
+            print(f"⚠️ 找不到 GitHub 用户 {username}")
+            return {repo: [] for repo in repos}
+        variables["author"] = {"id": author_id}
+
+    results = {repo: [] for repo in repos}
+    # 待查询的 (repo, cursor)，有下一页的仓库会带着 cursor 重新入队
+    pending = [(repo, None) for repo in repos]
+
+    while pending:
+        batch, pending = pending[:batch_size], pending[batch_size:]
+        entries = [(f"r{i}", repo, cursor) for i, (repo, cursor) in enumerate(batch)]
+        data = _graphql(_history_query(entries), token, variables)
+
+        for alias, repo, _ in entries:
+            node = data.get(alias)
+            if not node:
+                print(f"  ⚠️ 无法访问仓库 {repo}")
+                results[repo] = None
+                continue
+            target = (node.get("defaultBranchRef") or {}).get("target") or {}
+            history = target.get("history")
+            if not history:
+                # 空仓库
+                continue
+            results[repo].extend(_to_commit(n, repo, with_stats, with_author=not username) for n in history["nodes"])
+            page_info = history["pageInfo"]
+            if page_info["hasNextPage"]:
+                pending.append((repo, page_info["endCursor"]))
+
+    return results
+
+
+def iter_commits_batch(repos, username, token, start_time, end_time, with_stats=False):
+    """按 repos 顺序产出 (repo, commits)，与 fetch_engine.map_ordered 的输出形式一致"""
+    try:
+        results = get_commits_batch(repos, username, token, start_time, end_time, with_stats)
+    except Exception as e:
+        print(f"  GraphQL 请求失败: {e}")
+        results = {}
+    for repo in repos:
+        yield repo, results.get(repo)
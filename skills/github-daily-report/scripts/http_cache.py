@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+持久化的 HTTP 条件请求缓存：保存 ETag / Last-Modified，下次请求带上 If-None-Match / If-Modified-Since
+
+GitHub 对 304 响应不计入速率限制，同一天多次运行（创建 / 追加日报）时，
+没有变化的仓库列表和 commit 页面直接从磁盘读取。
+
+每次请求的参数（since / until 等）不同就是新的条目，缓存会一直增长，所以与 detail_cache 一样
+按总大小做 LRU 淘汰（http_cache_max_mb，默认 100MB；命中时更新文件时间），在进程退出时执行。
+"""
+import atexit
+import hashlib
+import json
+import os
+import threading
+from config_manager import CONFIG_DIR, ensure_config_dir, load_config
+
+CACHE_DIR = CONFIG_DIR / "http_cache"
+DEFAULT_MAX_MB = 100
+
+
+class CachedResponse:
+    """由缓存内容构造的响应，接口与 requests.Response 常用部分一致"""
+
+    def __init__(self, entry):
+        self.status_code = 200
+        self.headers = entry.get("headers", {})
+        self.text = entry["body"]
+        self.content = self.text.encode("utf-8")
+        self.from_cache = True
+
+    def json(self):
+        return json.loads(self.text)
+
+    @property
+    def links(self):
+        return parse_link_header(self.headers.get("Link", ""))
+
+
+def parse_link_header(value):
+    """解析 Link 头，返回 {rel: {"url": ..., "rel": ...}}，与 requests.Response.links 格式一致"""
+    links = {}
+    for part in value.split(","):
+        segments = part.strip().split(";")
+        if len(segments) < 2:
+            continue
+        url = segments[0].strip().strip("<>")
+        for param in segments[1:]:
+            key, _, val = param.strip().partition("=")
+            if key == "rel":
+                rel = val.strip('"')
+                links[rel] = {"url": url, "rel": rel}
+    return links
+
+
+class HttpCache:
+    """按 URL + 参数 + token 建键的磁盘缓存，每个条目一个 JSON 文件"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._evict_registered = False
+
+    def key(self, url, params, token):
+        raw = json.dumps([url, sorted((params or {}).items()), token or ""], default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def load(self, key):
+        """读取缓存条目，不存在或损坏时返回 None"""
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path)  # 记录最近使用时间，供 LRU 淘汰
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def conditional_headers(self, entry):
+        """根据缓存条目生成条件请求头"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, key, response):
+        """保存带 ETag / Last-Modified 的 200 响应（先写临时文件再原子替换）"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": {k: response.headers[k] for k in ("Link", "Content-Type") if k in response.headers},
+            "body": response.text,
+        }
+        with self._lock:
+            if not self._evict_registered:
+                atexit.register(self.evict)
+                self._evict_registered = True
+        path = self._path(key)
+        try:
+            if not self.cache_dir.exists():
+                ensure_config_dir()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "w") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def evict(self, max_bytes=None):
+        """删除最久未使用的条目，直到总大小不超过上限"""
+        if max_bytes is None:
+            max_bytes = float(load_config().get('http_cache_max_mb', DEFAULT_MAX_MB)) * 1024 * 1024
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total <= max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            if total <= max_bytes:
+                break
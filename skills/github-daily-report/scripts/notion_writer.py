@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+直接写入 Notion：不经过 LLM 和 MCP，把日报写进 notion_database_id 指定的数据库
+
+- 按 "日期" 属性查找当天的日报页面，没有就创建（标题属性 "工作内容"）
+- 新内容按每批最多 100 个 block 追加
+- 再次写入同一页面时，与上次写入的 block 逐个比较（记录在 notion_state.json），
+  只更新变化的 block、删除多余的、在对应位置插入新增的，不重写整个页面；
+  Notion 只能插入到已有 block 之后，有 block 要插到第一个沿用的 block 之前时整体重写
+
+日报内容可以是 LLM 生成后保存的 Markdown 文件，也可以直接由今日 commits 生成。
+API 地址可以用环境变量 NOTION_API_URL 指向本地的替身服务。
+
+用法:
+  python notion_writer.py [--date YYYY-MM-DD] [--file report.md]
+  不指定 --file 时用 --date 当天（UTC，默认今天）的 commits 生成日报
+"""
+import difflib
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import sys
+sys.path.insert(0, str(__file__).rsplit('/', 1)[0])
+from config_manager import CONFIG_DIR, ensure_config_dir, load_config, get_notion_token, get_notion_database_id
+import run_trace
+
+NOTION_API = os.environ.get("NOTION_API_URL", "https://api.notion.com/v1").rstrip("/")
+NOTION_VERSION = "2022-06-28"
+STATE_FILE = CONFIG_DIR / "notion_state.json"
+DEFAULT_TIMEOUT = 10
+MAX_RETRIES = 3
+# 每次追加 children 的上限
+BLOCK_BATCH_SIZE = 100
+# 单个 rich_text 对象的字符上限
+TEXT_CHUNK = 2000
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class NotionAPIError(Exception):
+    """Notion 返回了非预期的状态码"""
+
+    def __init__(self, status_code, url, message=""):
+        super().__init__(f"{status_code} {url} {message}".strip())
+        self.status_code = status_code
+        self.url = url
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                _session = requests.Session()
+    return _session
+
+
+def _request(method, path, token, json_body=None):
+    """发送请求，429 / 5xx 时按 Retry-After 或指数退避重试"""
+    url = f"{NOTION_API}{path}"
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Notion-Version": NOTION_VERSION,
+        "Content-Type": "application/json",
+    }
+    for attempt in range(MAX_RETRIES + 1):
+        response = _get_session().request(method, url, headers=headers, json=json_body, timeout=DEFAULT_TIMEOUT)
+        if response.status_code == 200:
+            return response.json()
+        if attempt < MAX_RETRIES and (response.status_code == 429 or response.status_code >= 500):
+            time.sleep(float(response.headers.get("Retry-After") or 2 ** attempt))
+            continue
+        try:
+            message = response.json().get("message", "")
+        except ValueError:
+            message = ""
+        raise NotionAPIError(response.status_code, url, message)
+
+
+# ---- Markdown -> block ----
+
+def _rich_text(text):
+    """把 **粗体** 转成 annotations，超长文本按 2000 字符切分"""
+    parts = []
+    for i, segment in enumerate(re.split(r"\*\*(.+?)\*\*", text)):
+        for start in range(0, len(segment), TEXT_CHUNK):
+            item = {"type": "text", "text": {"content": segment[start:start + TEXT_CHUNK]}}
+            if i % 2:
+                item["annotations"] = {"bold": True}
+            parts.append(item)
+    return parts[:100]
+
+
+def _block(block_type, text=None):
+    if block_type == "divider":
+        return {"object": "block", "type": "divider", "divider": {}}
+    return {"object": "block", "type": block_type, block_type: {"rich_text": _rich_text(text)}}
+
+
+def markdown_to_blocks(markdown):
+    """把日报 Markdown 转成 Notion block（标题、列表、引用、分隔线、段落）"""
+    blocks = []
+    for line in markdown.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped == "---":
+            blocks.append(_block("divider"))
+        elif stripped.startswith("### "):
+            blocks.append(_block("heading_3", stripped[4:]))
+        elif stripped.startswith("## "):
+            blocks.append(_block("heading_2", stripped[3:]))
+        elif stripped.startswith("# "):
+            blocks.append(_block("heading_1", stripped[2:]))
+        elif stripped.startswith(("- ", "* ", "• ")):
+            blocks.append(_block("bulleted_list_item", stripped[2:]))
+        elif re.match(r"\d+\. ", stripped):
+            blocks.append(_block("numbered_list_item", stripped.split(". ", 1)[1]))
+        elif stripped.startswith("> "):
+            blocks.append(_block("quote", stripped[2:]))
+        else:
+            blocks.append(_block("paragraph", stripped))
+    return blocks
+
+
+def _block_hash(block):
+    content = {"type": block["type"], block["type"]: block[block["type"]]}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+# ---- 页面 ----
+
+def find_or_create_page(date_str, token, database_id):
+    """按日期属性查找当天的日报页面，没有则创建，返回 (page_id, created)"""
+    config = load_config()
+    date_property = config.get('notion_date_property', '日期')
+    title_property = config.get('notion_title_property', '工作内容')
+
+    result = _request("POST", f"/databases/{database_id}/query", token, {
+        "filter": {"property": date_property, "date": {"equals": date_str}},
+        "page_size": 1,
+    })
+    if result.get("results"):
+        return result["results"][0]["id"], False
+
+    page = _request("POST", "/pages", token, {
+        "parent": {"database_id": database_id},
+        "properties": {
+            title_property: {"title": _rich_text(f"工作日报 - {date_str}")},
+            date_property: {"date": {"start": date_str}},
+        },
+    })
+    return page["id"], True
+
+
+def _append(page_id, blocks, after, token):
+    """分批追加 block，after 为 None 时追加到页面末尾，返回新 block 的 id"""
+    ids = []
+    for start in range(0, len(blocks), BLOCK_BATCH_SIZE):
+        body = {"children": blocks[start:start + BLOCK_BATCH_SIZE]}
+        if after:
+            body["after"] = after
+        result = _request("PATCH", f"/blocks/{page_id}/children", token, body)
+        created = [b["id"] for b in result.get("results", [])][-len(body["children"]):]
+        ids.extend(created)
+        after = created[-1] if created else after
+    return ids
+
+
+def _update(block, block_id, token):
+    _request("PATCH", f"/blocks/{block_id}", token, {block["type"]: block[block["type"]]})
+
+
+def _delete(block_id, token):
+    try:
+        _request("DELETE", f"/blocks/{block_id}", token)
+    except NotionAPIError as e:
+        if e.status_code != 404:
+            raise
+
+
+def _discard(block_id, token):
+    """删除 block，已经不存在（404）或已归档（400）的直接跳过"""
+    try:
+        _request("DELETE", f"/blocks/{block_id}", token)
+    except NotionAPIError as e:
+        if e.status_code not in (400, 404):
+            raise
+
+
+# ---- 写入状态 ----
+
+def _load_state():
+    try:
+        with open(STATE_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state):
+    ensure_config_dir()
+    tmp = STATE_FILE.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, STATE_FILE)
+
+
+def _diff_opcodes(old, hashes):
+    """旧 block 与新 block 的 difflib 编辑序列"""
+    matcher = difflib.SequenceMatcher(None, [o["hash"] for o in old], hashes, autojunk=False)
+    return matcher.get_opcodes()
+
+
+def _plan(old, blocks, opcodes):
+    """
+    把编辑序列展开为逐个 block 的操作，按页面顺序排列：
+    ("keep", i, j) / ("update", i, j) 沿用旧 block（同类型的原地更新），("delete", i, None)，("insert", None, j)
+    """
+    plan = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == "equal":
+            plan.extend(("keep", i1 + k, j1 + k) for k in range(i2 - i1))
+            continue
+        for k in range(max(i2 - i1, j2 - j1)):
+            i = i1 + k if i1 + k < i2 else None
+            j = j1 + k if j1 + k < j2 else None
+            if i is not None and j is not None and old[i]["type"] == blocks[j]["type"]:
+                plan.append(("update", i, j))
+                continue
+            if i is not None:
+                plan.append(("delete", i, None))
+            if j is not None:
+                plan.append(("insert", None, j))
+    return plan
+
+
+def _anchored(plan):
+    """
+    操作序列能否在原页面上增量执行
+
+    Notion 只能把 block 插入到某个已有 block 之后（after），没有 "插入到最前面"。
+    第一个 insert 之前必须有沿用的 block（keep / update）可以挂靠，否则插到开头的 block
+    会落到页面末尾，只能整体重写；开头的 block 被修改或删除不影响增量执行。
+    """
+    for action, _, _ in plan:
+        if action in ("keep", "update"):
+            return True
+        if action == "insert":
+            return False
+    return True
+
+
+def _apply_diff(page_id, old, blocks, plan, token, stats, created_ids):
+    """
+    按操作序列把页面上的旧 block 改成新 block，返回新 block 的 id
+
+    调用前需确认 _anchored(plan)：追加新 block 时总有前一个 block 的 id 可以作为 after。
+    新建的 block id 同时记入 created_ids，中途失败时调用方据此清理。
+    """
+    ids = [None] * len(blocks)
+    pending = []
+    prev_id = None
+
+    def flush():
+        nonlocal prev_id
+        if pending:
+            if prev_id is None:
+                # after 为空会追加到页面末尾而不是当前位置
+                raise ValueError("插入位置之前没有可以挂靠的 block")
+            created = _append(page_id, [blocks[j] for j in pending], prev_id, token)
+            created_ids.extend(created)
+            for j, block_id in zip(pending, created):
+                ids[j] = block_id
+            prev_id = created[-1]
+            stats["appended"] += len(pending)
+            pending.clear()
+
+    for action, i, j in plan:
+        if action == "keep":
+            flush()
+            ids[j] = prev_id = old[i]["id"]
+            stats["unchanged"] += 1
+        elif action == "update":
+            # 同类型的 block 原地更新，位置不变
+            flush()
+            _update(blocks[j], old[i]["id"], token)
+            ids[j] = prev_id = old[i]["id"]
+            stats["updated"] += 1
+        elif action == "delete":
+            _delete(old[i]["id"], token)
+            stats["deleted"] += 1
+        else:
+            pending.append(j)
+    flush()
+    return ids
+
+
+def sync_page(page_id, blocks, token):
+    """
+    把页面内容同步为 blocks，只改动与上次写入不同的部分
+
+    没有上次写入记录时（例如页面是手动或通过 MCP 创建的），新内容追加到页面末尾。
+    返回 {"appended", "updated", "deleted", "unchanged"} 计数。
+    """
+    state = _load_state()
+    old = state.get(page_id)
+    hashes = [_block_hash(b) for b in blocks]
+    stats = {"appended": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+
+    plan = _plan(old, blocks, _diff_opcodes(old, hashes)) if old else None
+    if old and not _anchored(plan):
+        # 有 block 要插到第一个沿用的 block 之前：无处挂靠，整体重写
+        for o in old:
+            _delete(o["id"], token)
+        stats["deleted"] += len(old)
+        old = []
+
+    if old:
+        created_ids = []
+        try:
+            ids = _apply_diff(page_id, old, blocks, plan, token, stats, created_ids)
+        except NotionAPIError as e:
+            if e.status_code not in (400, 404):
+                raise
+            # 记录中的 block 被手动删除或移动过：清掉记录中的 block 和这次已经追加的 block，
+            # 再整体写入，不在页面上留下第二份内容
+            print("⚠️ 页面内容与上次写入的记录不一致，删除已记录的 block 后重新写入全部内容")
+            for block_id in [o["id"] for o in old] + created_ids:
+                _discard(block_id, token)
+            stats.update(appended=len(blocks), updated=0, unchanged=0, deleted=len(old))
+            ids = _append(page_id, blocks, None, token)
+    else:
+        ids = _append(page_id, blocks, None, token)
+        stats["appended"] += len(blocks)
+
+    state[page_id] = [{"id": i, "hash": h, "type": b["type"]} for i, h, b in zip(ids, hashes, blocks)]
+    _save_state(state)
+    return stats
+
+
+def write_report(date_str, markdown):
+    """查找或创建 date_str 的日报页面，并把 markdown 同步进去"""
+    token = get_notion_token()
+    database_id = get_notion_database_id()
+    if not token or not database_id:
+        print("❌ Notion 配置不完整，请先运行: python config_manager.py")
+        return None
+
+    page_id, created = find_or_create_page(date_str, token, database_id)
+    print(f"📄 {'已创建' if created else '找到'} {date_str} 的日报页面: {page_id}")
+    stats = sync_page(page_id, markdown_to_blocks(markdown), token)
+    print(f"✅ Notion 已更新：新增 {stats['appended']} 个 block，修改 {stats['updated']} 个，"
+          f"删除 {stats['deleted']} 个，{stats['unchanged']} 个未变化")
+    return stats
+
+
+def _commits_markdown(commits, date_str):
+    """没有提供 Markdown 文件时，直接用 commits 生成按仓库分组的日报"""
+    from generate_report import generate_markdown_report
+    commits = sorted(commits, key=lambda c: (c["repo"], c["time"]))
+    repos = list(dict.fromkeys(c["repo"] for c in commits))
+    return generate_markdown_report({
+        "date": date_str,
+        "total_commits": len(commits),
+        "repos_with_commits": repos,
+        "commits": commits,
+    })
+
+
+def main():
+    from datetime import datetime, timezone
+
+    args = sys.argv[1:]
+    date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    if "--date" in args:
+        date_str = args[args.index("--date") + 1]
+    try:
+        day_start = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        print(f"❌ 日期格式应为 YYYY-MM-DD: {date_str}")
+        sys.exit(1)
+
+    if "--file" in args:
+        with open(args[args.index("--file") + 1], "r") as f:
+            markdown = f.read()
+    else:
+        # commits 与页面使用同一个日期（UTC 自然日），--date 补写往日日报时不会混入今天的 commits
+        from generate_report_flexible import fetch_commits_with_range
+        commits = fetch_commits_with_range(day_start, day_start.replace(hour=23, minute=59, second=59))
+        if not commits:
+            print(f"😴 {date_str} 暂无 commits")
+            sys.exit(0)
+        markdown = _commits_markdown(commits, date_str)
+
+    try:
+        write_report(date_str, markdown)
+    except NotionAPIError as e:
+        print(f"❌ 写入 Notion 失败: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_trace.run(main)
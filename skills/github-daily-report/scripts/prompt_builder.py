@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+按 token 预算生成 LLM 提示文本
+
+每个 commit 有几档详细程度，逐档升级，越往后越占预算：
+  0  仓库、sha、标题、行数统计、文件数
+  1  完整的 commit message
+  2  文件按目录汇总（文件数与增删行数），lockfile / vendor / 生成文件各折叠成一行
+  3  逐个列出文件（lockfile / vendor / 生成文件仍然折叠）
+所有 commits 先拿到第 0 档，之后每一轮按重要程度（改动行数、文件数）从高到低升级一档，
+放不下的就停在当前档；连第 0 档都放不下时，最不重要的 commits 按仓库合并成一行概要。
+文本片段放在列表里最后一次 join，整体是线性的。
+
+预算来自 config.json 的 prompt_token_budget（默认 8000），token 数按字符粗略估算。
+"""
+import math
+import posixpath
+from config_manager import load_config
+import run_trace
+
+DEFAULT_TOKEN_BUDGET = 8000
+STATUS_ICONS = {"added": "+", "modified": "~", "removed": "-"}
+
+LOCKFILES = {
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "npm-shrinkwrap.json", "bun.lockb",
+    "poetry.lock", "Pipfile.lock", "uv.lock", "Cargo.lock", "go.sum", "Gemfile.lock",
+    "composer.lock", "mix.lock", "pubspec.lock", "Podfile.lock", "flake.lock",
+}
+VENDOR_DIRS = {"vendor", "vendors", "third_party", "thirdparty", "node_modules", "external"}
+GENERATED_DIRS = {"dist", "build", "generated", "__generated__", "gen"}
+GENERATED_SUFFIXES = (
+    ".min.js", ".min.css", ".map", ".pb.go", "_pb2.py", "_pb2_grpc.py", ".pb.h", ".pb.cc",
+    ".g.dart", ".freezed.dart", ".snap", ".generated.ts", ".generated.cs", ".designer.cs",
+)
+FOLD_LABELS = {"lockfile": "依赖锁文件", "vendor": "第三方 / vendor 代码", "generated": "生成文件"}
+
+
+def estimate_tokens(text):
+    """粗略估算 token 数：中日韩字符约 1 个 token，其余约 4 个字符 1 个 token"""
+    wide = sum(1 for ch in text if ord(ch) >= 0x2E80)
+    return wide + (len(text) - wide + 3) // 4
+
+
+def get_token_budget():
+    try:
+        return max(500, int(load_config().get('prompt_token_budget', DEFAULT_TOKEN_BUDGET)))
+    except (TypeError, ValueError):
+        return DEFAULT_TOKEN_BUDGET
+
+
+def classify_file(filename):
+    """返回 lockfile / vendor / generated，普通文件返回 None"""
+    parts = filename.split("/")
+    if parts[-1] in LOCKFILES:
+        return "lockfile"
+    if any(p in VENDOR_DIRS for p in parts[:-1]):
+        return "vendor"
+    if any(p in GENERATED_DIRS for p in parts[:-1]) or filename.endswith(GENERATED_SUFFIXES):
+        return "generated"
+    return None
+
+
+def _split_files(files):
+    """拆分为普通文件和按类别折叠的文件"""
+    regular = []
+    folded = {}
+    for f in files:
+        kind = classify_file(f["filename"])
+        if kind:
+            folded.setdefault(kind, []).append(f)
+        else:
+            regular.append(f)
+    return regular, folded
+
+
+def _churn_line(label, files):
+    additions = sum(f["additions"] for f in files)
+    deletions = sum(f["deletions"] for f in files)
+    return f"  {label} ({len(files)} 个文件, +{additions}/-{deletions})\n"
+
+
+def _fold_lines(folded):
+    return "".join(_churn_line(f"[{FOLD_LABELS[kind]}]", folded[kind]) for kind in FOLD_LABELS if kind in folded)
+
+
+def _directory_lines(regular):
+    by_dir = {}
+    for f in regular:
+        by_dir.setdefault(posixpath.dirname(f["filename"]) or ".", []).append(f)
+    return "".join(_churn_line(f"{d}/", fs) for d, fs in sorted(by_dir.items()))
+
+
+def _file_lines(regular):
+    return "".join(
+        f"  {STATUS_ICONS.get(f['status'], '?')} {f['filename']} ({f['changes']}行)\n" for f in regular)
+
+
+def _commit_levels(c):
+    """返回该 commit 各档的文本片段（档位越高越详细）"""
+    title = c["message"].split("\n", 1)[0]
+    head = f"【{c['repo']}】\nCommit: {c['sha']}\n"
+    stats = ""
+    if "stats" in c:
+        s = c["stats"]
+        stats = f"改动: +{s.get('additions', 0)} / -{s.get('deletions', 0)} 行"
+        if c.get("range_commits", 1) > 1:
+            stats += f"（本仓库连续 {c['range_commits']} 个 commits 的合计）"
+        stats += "\n"
+    elif "stats_in" in c:
+        stats = f"改动: 已合并统计到 {c['stats_in']}\n"
+
+    files = c.get("files") or []
+    count_line = f"涉及 {len(files)} 个文件\n" if files else ""
+    levels = [
+        head + f"Message: {title}\n" + stats + count_line + "\n",
+        head + f"Message: {c['message']}\n" + stats + count_line + "\n",
+    ]
+    if files:
+        regular, folded = _split_files(files)
+        full = head + f"Message: {c['message']}\n" + stats
+        levels.append(full + f"涉及文件（按目录汇总，共 {len(files)} 个）:\n"
+                      + _directory_lines(regular) + _fold_lines(folded) + "\n")
+        levels.append(full + "涉及文件:\n" + _file_lines(regular) + _fold_lines(folded) + "\n")
+    return levels
+
+
+def _significance(c):
+    stats = c.get("stats") or {}
+    churn = stats.get("total") or sum(f["changes"] for f in c.get("files") or [])
+    return math.log1p(churn) + math.log1p(len(c.get("files") or []))
+
+
+@run_trace.phase("prompt_rendering")
+def build_prompt(commits, header, footer, budget=None):
+    """
+    在预算内生成 header + commits + footer
+
+    第 0 档都放不下时，从最不重要的 commit 开始省略，按仓库合并成一行概要。
+    返回 (prompt, report)，report 包含 budget / used / dropped_tokens / reduced_commits / omitted_commits，
+    reduced_commits 为没有升到最详细一档的 commit 数（含被省略的）。
+    """
+    budget = budget or get_token_budget()
+    levels = [_commit_levels(c) for c in commits]
+    costs = [[estimate_tokens(text) for text in lv] for lv in levels]
+    chosen = [0] * len(commits)
+    used = estimate_tokens(header) + estimate_tokens(footer) + sum(cost[0] for cost in costs)
+
+    order = sorted(range(len(commits)), key=lambda i: -_significance(commits[i]))
+    omitted = set()
+    for i in reversed(order):
+        if used <= budget:
+            break
+        omitted.add(i)
+        used -= costs[i][0]
+
+    max_level = max((len(lv) for lv in levels), default=1)
+    for level in range(1, max_level):
+        for i in order:
+            if i in omitted or chosen[i] != level - 1 or level >= len(levels[i]):
+                continue
+            delta = costs[i][level] - costs[i][chosen[i]]
+            if used + delta <= budget:
+                chosen[i] = level
+                used += delta
+
+    parts = [header]
+    parts.extend(levels[i][chosen[i]] for i in range(len(commits)) if i not in omitted)
+    if omitted:
+        by_repo = {}
+        for i in sorted(omitted):
+            by_repo.setdefault(commits[i]["repo"], []).append(commits[i])
+        for repo, cs in by_repo.items():
+            additions = sum((c.get("stats") or {}).get("additions", 0) for c in cs)
+            deletions = sum((c.get("stats") or {}).get("deletions", 0) for c in cs)
+            line = f"【{repo}】另有 {len(cs)} 个较小的 commits 未逐条列出（+{additions}/-{deletions} 行）\n"
+            parts.append(line)
+            used += estimate_tokens(line)
+        parts.append("\n")
+    dropped = sum(costs[i][-1] - (0 if i in omitted else costs[i][chosen[i]]) for i in range(len(commits)))
+    reduced = sum(1 for i in range(len(commits)) if i in omitted or chosen[i] < len(levels[i]) - 1)
+    if reduced:
+        parts.append(f"（受篇幅限制，{reduced} 个 commits 的细节已按目录汇总或省略）\n")
+    parts.append(footer)
+    report = {"budget": budget, "used": used, "dropped_tokens": dropped,
+              "reduced_commits": reduced, "omitted_commits": len(omitted)}
+    return "".join(parts), report
+
+
+def print_report(report):
+    """打印预算使用情况"""
+    if report["reduced_commits"]:
+        print(f"✂️ 提示文本约 {report['used']} / {report['budget']} token，"
+              f"{report['reduced_commits']} 个 commits 的细节被汇总或省略"
+              f"（其中 {report['omitted_commits']} 个未逐条列出，约省略 {report['dropped_tokens']} token）")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+速率限制感知的请求调度器
+
+- 读取 X-RateLimit-Remaining / X-RateLimit-Reset / Retry-After 调整节奏
+- 并发数按 AIMD 自适应：遇到限流减半，连续成功后逐步恢复
+- 403(限流) / 429 / 5xx 按带抖动的指数退避重试
+- 剩余配额低于 rate_limit_reserve 时，普通请求让路，只放行 high 优先级（commit 详情）请求
+
+并发请求的响应到达顺序与服务端扣减配额的顺序不同，最后到达的 X-RateLimit-Remaining
+不一定是最新的。所以按 X-RateLimit-Reset 区分配额窗口，记录每个窗口内见过的最大和最小
+remaining：最小值用于保留区判断，两者之差（加上最大值本身是否由扣费请求带回）即消耗的配额。
+"""
+import random
+import threading
+import time
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+DEFAULT_RESERVE = 100
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_MAX_WAIT = 60
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+
+class RateLimitExceeded(Exception):
+    """配额耗尽且等不到重置时间"""
+
+
+class RateLimiter:
+    """在全局并发上限内按速率限制调度请求，线程安全"""
+
+    def __init__(self, max_concurrency, reserve=DEFAULT_RESERVE, max_retries=DEFAULT_MAX_RETRIES,
+                 max_wait=DEFAULT_MAX_WAIT):
+        self.max_concurrency = max_concurrency
+        self.allowed = max_concurrency
+        self.reserve = reserve
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        # X-RateLimit-Reset -> {"max", "min", "charged_at_max"}
+        self.windows = {}
+        self.retries = 0
+        self.throttled = 0
+
+        self._active = 0
+        self._paused_until = 0.0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    # ---- 调度 ----
+
+    def _must_yield(self, priority):
+        """普通请求在配额进入保留区后需要等待重置"""
+        return (priority != "high" and self.remaining is not None
+                and self.remaining <= self.reserve and self.reset_at and self.reset_at > time.time())
+
+    def acquire(self, priority="normal"):
+        """等待一个可用名额；普通请求在保留区内且重置时间超过 max_wait 时抛出 RateLimitExceeded"""
+        with self._cond:
+            while True:
+                now = time.time()
+                if self._must_yield(priority):
+                    wait = self.reset_at - now
+                    if wait > self.max_wait:
+                        raise RateLimitExceeded(
+                            f"剩余配额 {self.remaining} 已进入保留区，{int(wait)} 秒后重置")
+                elif self._paused_until > now:
+                    wait = self._paused_until - now
+                elif self._active < self.allowed:
+                    self._active += 1
+                    return
+                else:
+                    wait = None
+                self._cond.wait(wait)
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    # ---- 响应处理 ----
+
+    def observe(self, response):
+        """从响应头更新配额状态，并按结果调整并发数"""
+        headers = response.headers
+        with self._cond:
+            remaining = headers.get("X-RateLimit-Remaining")
+            # GraphQL / search 使用独立的配额，只统计 REST core 配额
+            if headers.get("X-RateLimit-Resource", "core") != "core":
+                remaining = None
+            if remaining is not None:
+                self._observe_quota(int(remaining), int(headers.get("X-RateLimit-Reset") or 0),
+                                    charged=response.status_code != 304)
+                if headers.get("X-RateLimit-Limit") is not None:
+                    self.limit = int(headers["X-RateLimit-Limit"])
+
+            if self.is_throttled(response):
+                self.throttled += 1
+                self.allowed = max(1, self.allowed // 2)
+                self._successes = 0
+            elif response.status_code < 400:
+                self._successes += 1
+                if self._successes >= 10 and self.allowed < self.max_concurrency:
+                    self.allowed += 1
+                    self._successes = 0
+                    self._cond.notify_all()
+
+    def _observe_quota(self, remaining, reset, charged):
+        """
+        记录一个响应带回的 remaining（调用方持有锁）
+
+        charged 表示这个响应本身扣了配额（304 不扣）：窗口内最大的 remaining 如果来自扣费的响应，
+        说明在它之前还有 1 个配额被用掉了。
+        """
+        window = self.windows.get(reset)
+        if window is None:
+            self.windows[reset] = {"max": remaining, "min": remaining, "charged_at_max": charged}
+        else:
+            if remaining > window["max"]:
+                window["max"] = remaining
+                window["charged_at_max"] = charged
+            elif remaining == window["max"]:
+                window["charged_at_max"] = window["charged_at_max"] or charged
+            window["min"] = min(window["min"], remaining)
+        # 当前窗口为重置时间最晚的一个，保留区判断使用其中最小的 remaining
+        current = max(self.windows)
+        self.remaining = self.windows[current]["min"]
+        self.reset_at = current or None
+
+    def used(self):
+        """本次运行消耗的 core 配额（各窗口之和）"""
+        with self._cond:
+            return sum(w["max"] - w["min"] + (1 if w["charged_at_max"] else 0) for w in self.windows.values())
+
+    @staticmethod
+    def is_throttled(response):
+        """判断是否是限流响应（429，或带限流标记的 403）"""
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        headers = response.headers
+        return headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in headers
+
+    def should_retry(self, response, attempt):
+        return attempt < self.max_retries and (
+            response.status_code in RETRY_STATUS or self.is_throttled(response))
+
+    def retry_delay(self, response, attempt):
+        """
+        计算重试前的等待秒数
+
+        优先使用 Retry-After；主配额耗尽时等到 X-RateLimit-Reset；
+        其余情况用带完全抖动的指数退避。
+        """
+        headers = response.headers if response is not None else {}
+        if headers.get("Retry-After"):
+            try:
+                return min(float(headers["Retry-After"]), self.max_wait)
+            except ValueError:
+                pass
+        if headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset"):
+            wait = int(headers["X-RateLimit-Reset"]) - time.time() + 1
+            if wait > self.max_wait:
+                raise RateLimitExceeded(f"配额已耗尽，{int(wait)} 秒后重置")
+            return max(wait, 0)
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+    def note_retry(self, response, delay):
+        """记录一次重试；限流响应会让所有请求一起暂停 delay 秒"""
+        with self._cond:
+            self.retries += 1
+            if response is not None and self.is_throttled(response):
+                self._paused_until = max(self._paused_until, time.time() + delay)
+
+    def summary(self):
+        """返回本次运行的配额使用摘要"""
+        if self.remaining is None:
+            return None
+        parts = [f"消耗配额 {self.used()}", f"剩余 {self.remaining}/{self.limit or '?'}"]
+        if self.reset_at:
+            parts.append(f"{time.strftime('%H:%M:%S', time.localtime(self.reset_at))} 重置")
+        if self.retries:
+            parts.append(f"重试 {self.retries} 次")
+        if self.throttled:
+            parts.append(f"触发限流 {self.throttled} 次")
+        return "，".join(parts)
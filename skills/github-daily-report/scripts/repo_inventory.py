@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+仓库清单缓存：持久化 full_name / pushed_at / archived / size / default_branch
+
+仓库列表按 pushed 倒序返回，所以：
+- 增量刷新只需要翻到上次刷新之后没有 push 的位置就可以停下
+- 扫描某个时间窗口时，pushed_at 早于窗口起点的仓库不可能有新 commits，直接跳过，
+  列表也翻到窗口起点之前就停止
+超过 repo_inventory_ttl_hours（默认 24 小时）后做一次完整刷新，清掉已删除 / 改名的仓库。
+"""
+import json
+import os
+from datetime import datetime, timezone, timedelta
+from config_manager import CONFIG_DIR, ensure_config_dir, load_config
+import github_client
+
+INVENTORY_FILE = CONFIG_DIR / "repo_inventory.json"
+DEFAULT_TTL_HOURS = 24
+# 增量刷新时多往回翻一点，容忍本地与 GitHub 的时钟偏差
+REFRESH_OVERLAP = timedelta(minutes=10)
+# 与原先 get_all_repos 的上限一致
+OWNED_LIMIT = 200
+COLLABORATOR_MAX_PAGES = 5
+
+
+def _iso(dt):
+    """统一为 GitHub 的时间格式，便于直接按字符串比较"""
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _load(username):
+    try:
+        with open(INVENTORY_FILE, "r") as f:
+            inventory = json.load(f)
+        if inventory.get("username") == username:
+            return inventory
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _save(inventory):
+    ensure_config_dir()
+    tmp = INVENTORY_FILE.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(inventory, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, INVENTORY_FILE)
+
+
+def _entry(r):
+    return {
+        "full_name": r["full_name"],
+        "pushed_at": r.get("pushed_at") or "",
+        "archived": r.get("archived", False),
+        "size": r.get("size", 0),
+        "default_branch": r.get("default_branch")
+    }
+
+
+def _list_repos(token, username, stop_before):
+    """
+    按 pushed 倒序列出自己的仓库和参与的仓库，pushed_at 早于 stop_before 时停止翻页
+
+    stop_before 为空字符串时列出全部（受原有数量上限约束）。
+    """
+    stop = (lambda r: (r.get("pushed_at") or "") < stop_before) if stop_before else None
+    repos = []
+
+    params = {"sort": "pushed", "direction": "desc"}
+    try:
+        for r in github_client.paginate(f"/users/{username}/repos", token, params=params, stop=stop):
+            repos.append(_entry(r))
+            if len(repos) >= OWNED_LIMIT:
+                break
+    except github_client.GitHubAPIError as e:
+        print(f"获取仓库列表失败: {e.status_code}")
+        return None
+    except Exception as e:
+        # 配额耗尽（RateLimitExceeded）或重试后仍失败的网络错误
+        print(f"获取仓库列表失败: {e}")
+        return None
+
+    params = {"affiliation": "collaborator", "sort": "pushed", "direction": "desc"}
+    try:
+        for r in github_client.paginate("/user/repos", token, params=params, stop=stop,
+                                        max_pages=COLLABORATOR_MAX_PAGES):
+            repos.append(_entry(r))
+    except github_client.GitHubAPIError:
+        pass
+    except Exception as e:
+        # 少了参与的仓库却记为已刷新，下次增量刷新就补不回来，按失败处理
+        print(f"获取参与的仓库列表失败: {e}")
+        return None
+
+    return repos
+
+
+def refresh(token, username, since=None):
+    """
+    刷新并返回仓库清单
+
+    since 为窗口起点：清单需要完整覆盖 pushed_at >= since 的仓库，为空表示需要全部仓库。
+    TTL 内只做增量刷新：翻到上次刷新之后没有 push 的位置为止；
+    需要比上次覆盖范围更早的仓库时，再往后多翻到 since 为止。
+    """
+    now = datetime.now(timezone.utc)
+    ttl = timedelta(hours=float(load_config().get('repo_inventory_ttl_hours', DEFAULT_TTL_HOURS)))
+    since_str = _iso(since) if since else ""
+    stored = _load(username)
+
+    expired = (stored is None or
+               now - datetime.fromisoformat(stored["refreshed_at"].replace("Z", "+00:00")) > ttl)
+    if expired:
+        inventory = {"username": username, "repos": {}, "covered_since": since_str}
+        stop_before = since_str
+    elif since_str < stored["covered_since"]:
+        # 需要更早的仓库，这次要翻得更深
+        stop_before = since_str
+        inventory = dict(stored, covered_since=since_str)
+    else:
+        inventory = stored
+        refreshed_at = datetime.fromisoformat(stored["refreshed_at"].replace("Z", "+00:00"))
+        stop_before = _iso(refreshed_at - REFRESH_OVERLAP)
+
+    listed = _list_repos(token, username, stop_before)
+    if listed is None:
+        # 列表失败（API 错误、配额耗尽、网络错误）时沿用旧清单，过期的也比没有好
+        return stored or inventory
+    for entry in listed:
+        inventory["repos"][entry["full_name"]] = entry
+    inventory["refreshed_at"] = _iso(now)
+    _save(inventory)
+    return inventory
+
+
+def get_active_repos(token, username, since=None):
+    """
+    返回 pushed_at 不早于 since 的仓库（按 pushed_at 倒序）
+
+    since 不为空时同时跳过已归档的仓库。返回 (repos, skipped)，
+    skipped 为清单中被跳过的仓库数。
+    """
+    inventory = refresh(token, username, since)
+    entries = sorted(inventory["repos"].values(), key=lambda e: e["pushed_at"], reverse=True)
+    if since:
+        since_str = _iso(since)
+        entries_active = [e for e in entries if e["pushed_at"] >= since_str and not e["archived"]]
+    else:
+        entries_active = entries
+    return [e["full_name"] for e in entries_active], len(entries) - len(entries_active)
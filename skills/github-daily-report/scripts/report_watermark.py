@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+日报水位：按日期记录每个仓库已经写进日报的最新 commit
+
+追加更新时只保留水位之后的 commits，没有新 commits 就不再获取详情、也不再生成提示。
+每个仓库记录最新的 committer 时间，以及恰好在这个时间上的完整 sha（同一秒可能有多个 commits）。
+
+注意：与 commit_store 一样按 committer 时间比较，committer 时间早于水位的 commits
+（例如推送了之前在本地提交的旧 commits）不会再出现在追加内容里。
+"""
+import json
+import os
+from datetime import datetime
+from config_manager import CONFIG_DIR, ensure_config_dir
+from fetch_engine import commit_full_sha
+
+WATERMARK_FILE = CONFIG_DIR / "report_watermarks.json"
+# 只保留最近这么多天的水位
+KEEP_DAYS = 14
+
+
+def _load_all():
+    try:
+        with open(WATERMARK_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load(date_str):
+    """返回 date_str 当天的水位 {repo: {"time": ..., "shas": [...]}}"""
+    return _load_all().get(date_str, {})
+
+
+def is_new(commit, marks):
+    """commit 是否在水位之后（尚未写进日报）"""
+    mark = marks.get(commit["repo"])
+    if not mark:
+        return True
+    if commit["time"] != mark["time"]:
+        return commit["time"] > mark["time"]
+    return commit_full_sha(commit) not in mark["shas"]
+
+
+def since_times(marks):
+    """
+    各仓库水位对应的列表起点 {repo: datetime}，追加更新时从这里开始列出
+
+    起点与水位时间相同（同一秒内的 commits 仍会列出，由 is_new 按 sha 过滤）。
+    """
+    return {repo: datetime.fromisoformat(mark["time"].replace("Z", "+00:00")) for repo, mark in marks.items()}
+
+
+def advance(date_str, commits):
+    """把 commits 记为已写进 date_str 的日报"""
+    data = _load_all()
+    marks = data.setdefault(date_str, {})
+    for c in commits:
+        mark = marks.get(c["repo"])
+        sha = commit_full_sha(c)
+        if not mark or c["time"] > mark["time"]:
+            marks[c["repo"]] = {"time": c["time"], "shas": [sha]}
+        elif c["time"] == mark["time"] and sha not in mark["shas"]:
+            mark["shas"].append(sha)
+
+    for old in sorted(data)[:-KEEP_DAYS]:
+        del data[old]
+
+    ensure_config_dir()
+    tmp = WATERMARK_FILE.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, WATERMARK_FILE)
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+运行追踪：逐请求记录 GitHub 调用，并按阶段汇总耗时、请求数和内存
+
+- 每个 GitHub 请求（含重试）写一行 JSON 到追踪文件：阶段、接口、仓库、状态码、
+  延迟、传输字节、缓存命中（304）、剩余配额
+- 阶段（repo_listing / commit_listing / detail_enrichment / prompt_rendering）由
+  phase() 标记，嵌套时外层阶段暂停计时；运行结束打印各阶段汇总，并追加到追踪文件末尾
+- 阶段栈按线程保存：后台线程（watch 模式的详情线程等）里的阶段单独嵌套、单独计时；
+  fetch_engine 线程池的工作线程通过 inherit() 把请求计入提交任务时所在的阶段
+- --profile 用 cProfile 分析整个运行，--trace-memory 用 tracemalloc 记录各阶段的峰值内存
+
+入口脚本通过 run(main) 启动，命令行开关会在调用 main 之前从 sys.argv 中移除：
+  --trace [PATH]   逐请求追踪（默认 /tmp/github_daily_trace.jsonl）
+  --profile        cProfile，结果保存到 /tmp/github_daily_report.prof 并打印耗时最多的函数
+  --trace-memory   tracemalloc，打印各阶段峰值内存和分配最多的代码位置
+"""
+import json
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+DEFAULT_TRACE_PATH = "/tmp/github_daily_trace.jsonl"
+PROFILE_PATH = "/tmp/github_daily_report.prof"
+PROFILE_TOP = 25
+MEMORY_TOP = 10
+# 不在任何阶段内的请求归入这一项
+NO_PHASE = "other"
+
+_lock = threading.Lock()
+_enabled = False
+_trace_file = None
+_memory = False
+# 每个线程自己的阶段栈 stack（[[name, 开始时间]]）和继承的阶段 parent
+_local = threading.local()
+_phases = {}
+
+_SHA = re.compile(r"^[0-9a-f]{7,40}$")
+
+
+def enable(trace_path=None, memory=False):
+    """打开阶段统计；trace_path 不为空时同时逐请求写追踪文件"""
+    global _enabled, _trace_file, _memory
+    _enabled = True
+    if trace_path:
+        _trace_file = open(trace_path, "w", buffering=1)
+    if memory:
+        import tracemalloc
+        tracemalloc.start()
+        _memory = True
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def current():
+    """当前线程所在的阶段：自己打开的最内层阶段，其次是 inherit() 继承的阶段"""
+    stack = _stack()
+    return stack[-1][0] if stack else getattr(_local, "parent", None)
+
+
+def inherit(func):
+    """包装交给其他线程执行的 func：执行期间没有打开阶段时，请求计入调用 inherit 时所在的阶段"""
+    if not _enabled:
+        return func
+    parent = current()
+
+    def run(*args, **kwargs):
+        saved = getattr(_local, "parent", None)
+        _local.parent = parent
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.parent = saved
+    return run
+
+
+def _stats(name):
+    return _phases.setdefault(name, {
+        "wall_s": 0.0, "requests": 0, "bytes": 0, "cache_hits": 0, "retries": 0, "errors": 0,
+        "latencies": [], "peak_mem": 0,
+    })
+
+
+def _checkpoint_memory(name):
+    """把上一个检查点以来的峰值内存记到 name 上，并重新开始统计峰值"""
+    if not _memory:
+        return
+    import tracemalloc
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    stats = _stats(name)
+    stats["peak_mem"] = max(stats["peak_mem"], peak)
+
+
+@contextmanager
+def phase(name):
+    """标记一个阶段，期间发出的请求都计入该阶段（也可以作为装饰器使用）"""
+    if not _enabled:
+        yield
+        return
+    stack = _stack()
+    now = time.perf_counter()
+    with _lock:
+        if stack:
+            parent = stack[-1]
+            _stats(parent[0])["wall_s"] += now - parent[1]
+        _checkpoint_memory(current() or NO_PHASE)
+        stack.append([name, now])
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        with _lock:
+            _, started = stack.pop()
+            _stats(name)["wall_s"] += now - started
+            _checkpoint_memory(name)
+            if stack:
+                stack[-1][1] = now
+
+
+def _endpoint(path):
+    """把 URL 路径归一成接口模板，返回 (endpoint, repo)"""
+    parts = path.strip("/").split("/")
+    repo = None
+    if len(parts) >= 3 and parts[0] == "repos":
+        repo = f"{parts[1]}/{parts[2]}"
+        parts = ["repos", "{repo}"] + parts[3:]
+        if len(parts) >= 4 and parts[2] == "compare":
+            parts[3] = "{range}"
+        elif len(parts) >= 4 and _SHA.match(parts[3]):
+            parts[3] = "{sha}"
+    elif len(parts) >= 2 and parts[0] == "users":
+        parts[1] = "{user}"
+    return "/" + "/".join(parts), repo
+
+
+def _response_bytes(response, streamed):
+    length = response.headers.get("Content-Length")
+    if length is not None:
+        return int(length)
+    if streamed:
+        # 流式响应的响应体由调用方读取，这里不能提前读出
+        return None
+    try:
+        return len(response.content)
+    except Exception:
+        return None
+
+
+def record_request(method, url, response, latency, attempt, conditional=False, error=None):
+    """记录一次 HTTP 请求（_send 的每次尝试都会调用一次）"""
+    if not _enabled:
+        return
+    endpoint, repo = _endpoint(urlparse(url).path)
+    streamed = method == "stream"
+    status = response.status_code if response is not None else None
+    size = _response_bytes(response, streamed) if response is not None else None
+    cache = None
+    if conditional:
+        cache = "hit" if status == 304 else "miss"
+    name = current() or NO_PHASE
+    with _lock:
+        stats = _stats(name)
+        stats["requests"] += 1
+        stats["bytes"] += size or 0
+        stats["latencies"].append(latency)
+        stats["cache_hits"] += cache == "hit"
+        stats["retries"] += attempt > 0
+        stats["errors"] += error is not None or (status is not None and status >= 400)
+        if _trace_file:
+            _trace_file.write(json.dumps({
+                "ts": round(time.time(), 3),
+                "phase": name,
+                "method": "GET" if streamed else method.upper(),
+                "endpoint": endpoint,
+                "repo": repo,
+                "status": status,
+                "latency_ms": round(latency * 1000, 1),
+                "bytes": size,
+                "cache": cache,
+                "rate_remaining": response.headers.get("X-RateLimit-Remaining") if response is not None else None,
+                "attempt": attempt,
+                "error": str(error) if error else None,
+            }, ensure_ascii=False) + "\n")
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0
+
+
+def summary():
+    """各阶段汇总，按总耗时从高到低排序"""
+    rows = []
+    with _lock:
+        for name, s in _phases.items():
+            if not s["requests"] and s["wall_s"] < 0.0005:
+                continue
+            rows.append({
+                "phase": name,
+                "wall_s": round(s["wall_s"], 3),
+                "requests": s["requests"],
+                "bytes": s["bytes"],
+                "cache_hits": s["cache_hits"],
+                "retries": s["retries"],
+                "errors": s["errors"],
+                "latency_p50_ms": round(_percentile(s["latencies"], 0.5) * 1000, 1),
+                "latency_p95_ms": round(_percentile(s["latencies"], 0.95) * 1000, 1),
+                "peak_mem_mb": round(s["peak_mem"] / 1024 / 1024, 1) if _memory else None,
+            })
+    return sorted(rows, key=lambda r: -r["wall_s"])
+
+
+def print_summary():
+    """打印阶段汇总，并把汇总追加到追踪文件末尾"""
+    if not _enabled:
+        return
+    with _lock:
+        _checkpoint_memory(current() or NO_PHASE)
+    rows = summary()
+    print("")
+    print("⏱️ 各阶段耗时：")
+    for r in rows:
+        line = (f"  {r['phase']:<18} {r['wall_s']:>8.3f}s  {r['requests']:>5} 个请求  "
+                f"{r['bytes'] / 1024:>9.1f} KB  p50 {r['latency_p50_ms']:.0f}ms / p95 {r['latency_p95_ms']:.0f}ms")
+        if r["cache_hits"] or r["retries"]:
+            line += f"  缓存命中 {r['cache_hits']}，重试 {r['retries']}"
+        if r["peak_mem_mb"] is not None:
+            line += f"  峰值内存 {r['peak_mem_mb']:.1f} MB"
+        print(line)
+    if _trace_file:
+        for r in rows:
+            _trace_file.write(json.dumps(dict(r, type="phase_summary"), ensure_ascii=False) + "\n")
+        print(f"📁 请求追踪已保存到: {_trace_file.name}")
+
+
+def _print_memory_top():
+    import tracemalloc
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    print("")
+    print(f"🧠 当前仍占用内存最多的 {MEMORY_TOP} 个位置：")
+    for stat in snapshot.statistics("lineno")[:MEMORY_TOP]:
+        frame = stat.traceback[0]
+        print(f"  {stat.size / 1024:>9.1f} KB  {frame.filename}:{frame.lineno}")
+
+
+def parse_args(argv):
+    """从 argv 中取出 --trace [PATH] / --profile / --trace-memory，返回 (options, 剩余参数)"""
+    options = {"trace": None, "profile": False, "memory": False}
+    rest = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--trace":
+            if i + 1 < len(argv) and not argv[i + 1].startswith("-"):
+                options["trace"] = argv[i + 1]
+                i += 1
+            else:
+                options["trace"] = DEFAULT_TRACE_PATH
+        elif arg == "--profile":
+            options["profile"] = True
+        elif arg == "--trace-memory":
+            options["memory"] = True
+        else:
+            rest.append(arg)
+        i += 1
+    return options, rest
+
+
+def run(main, trace=None, profile=False, memory=False):
+    """
+    按开关运行入口函数 main
+
+    参数为空时从 sys.argv 读取开关（并从 sys.argv 中移除，main 看不到它们）。
+    """
+    if trace is None and not profile and not memory:
+        options, sys.argv[1:] = parse_args(sys.argv[1:])
+        trace, profile, memory = options["trace"], options["profile"], options["memory"]
+    if not (trace or profile or memory):
+        return main()
+
+    enable(trace, memory)
+    profiler = None
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        return main()
+    finally:
+        if profiler:
+            profiler.disable()
+        print_summary()
+        if profiler:
+            import pstats
+            profiler.dump_stats(PROFILE_PATH)
+            print("")
+            print(f"🔬 耗时最多的 {PROFILE_TOP} 个函数（累计时间）：")
+            pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(PROFILE_TOP)
+            print(f"📁 完整的 cProfile 结果已保存到: {PROFILE_PATH}（可用 snakeviz 等工具查看）")
+        if _memory:
+            import tracemalloc
+            _print_memory_top()
+            tracemalloc.stop()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+快照：保存一次运行获取到的 commits，之后离线重新生成日报
+
+--record [PATH] 在获取完成后把整理好的 commits（含 stats / files）和日期等信息
+写入 gzip 压缩的 JSON；--from-snapshot [PATH] 跳过所有网络请求，直接用快照里的 commits
+渲染 Markdown 日报、摘要和各种提示文本，同一个快照每次生成的结果完全一致。
+
+--from-snapshot 也可以读取 generate_report_v2.py 保存的 /tmp/github_daily_commits.json。
+"""
+import gzip
+import json
+import os
+from datetime import datetime, timezone
+
+DEFAULT_SNAPSHOT_PATH = "/tmp/github_daily_snapshot.json.gz"
+SNAPSHOT_VERSION = 1
+
+
+def save(path, commits, **meta):
+    """把 commits 和附加信息（date、report_date 等）写入快照，返回路径"""
+    data = dict(meta)
+    data.setdefault("date", datetime.now(timezone.utc).strftime("%Y-%m-%d"))
+    data.update(
+        version=SNAPSHOT_VERSION,
+        recorded_at=datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        total_commits=len(commits),
+        commits=commits,
+    )
+    tmp = f"{path}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    print(f"📼 已录制 {len(commits)} 个 commits 到快照: {path}")
+    return path
+
+
+def load(path):
+    """读取快照（gzip 或普通 JSON），返回 dict，至少包含 date 和 commits"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw[:2] == b"\x1f\x8b":
+        raw = gzip.decompress(raw)
+    data = json.loads(raw.decode("utf-8"))
+    if isinstance(data, list):
+        data = {"commits": data}
+    data.setdefault("commits", [])
+    data.setdefault("date", datetime.now(timezone.utc).strftime("%Y-%m-%d"))
+    print(f"📼 从快照读取 {len(data['commits'])} 个 commits（{data['date']}）: {path}")
+    return data
+
+
+def repos_with_commits(commits):
+    """按首次出现的顺序列出有 commits 的仓库"""
+    return list(dict.fromkeys(c["repo"] for c in commits))
+
+
+def _path_arg(argv, name):
+    if name not in argv:
+        return None
+    i = argv.index(name)
+    if i + 1 < len(argv) and not argv[i + 1].startswith("-"):
+        return argv[i + 1]
+    return DEFAULT_SNAPSHOT_PATH
+
+
+def parse_args(argv):
+    """解析 --record [PATH] / --from-snapshot [PATH]，返回 (record_path, snapshot_path)，未指定的为 None"""
+    return _path_arg(argv, "--record"), _path_arg(argv, "--from-snapshot")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+团队批量模式：一次运行为多个成员生成日报
+
+每个仓库的时间窗口只请求一次（不带 author 过滤），在本地按作者登录名拆分；
+commit 详情对所有成员合并后统一获取（detail_cache 按 sha 共享），最后每人输出一份报告。
+请求数只与仓库数成正比，而不是仓库数 × 人数。
+
+成员列表来自 config.json 的 team（或命令行 --users a,b），仓库列表为 repositories。
+无法对应到 GitHub 账号的 commits（提交邮箱没有关联账号）不会计入任何人。
+
+用法:
+  python team_report.py [--users alice,bob] [--date YYYY-MM-DD] [--out DIR]
+"""
+import json
+import os
+import sys
+from datetime import datetime, timezone, timedelta
+sys.path.insert(0, str(__file__).rsplit('/', 1)[0])
+from config_manager import get_github_token, get_repositories, get_fetch_backend, load_config
+from fetch_engine import fetch_details, commit_full_sha
+from commit_source import collect_commits, get_commit_detail
+from fetch_commits_with_diff import generate_llm_prompt
+import github_client
+import run_trace
+
+DEFAULT_OUTPUT_DIR = "/tmp/github_daily_team"
+
+
+def get_team():
+    """config.json 中的成员列表"""
+    return load_config().get('team', [])
+
+
+def partition_by_author(commits, users):
+    """按作者登录名（不区分大小写）拆分 commits，返回 {user: [commit, ...]}"""
+    by_login = {u.lower(): u for u in users}
+    result = {u: [] for u in users}
+    for c in commits:
+        user = by_login.get((c.get("author") or "").lower())
+        if user:
+            result[user].append(c)
+    return result
+
+
+def fetch_team_commits(users, start_time, end_time):
+    """
+    获取团队成员在时间范围内的 commits（含详情），返回 {user: [commit, ...]}
+
+    每个仓库只列一次，详情只为成员的 commits 获取一次。
+    """
+    token = get_github_token()
+    repos = get_repositories()
+    if not token or not repos:
+        print("❌ GitHub 配置不完整，请先运行: python config_manager.py")
+        return {}
+
+    print(f"📊 正在获取 {len(users)} 位成员的 commits...")
+    print(f"   时间范围: {start_time.strftime('%Y-%m-%d %H:%M')} ~ {end_time.strftime('%Y-%m-%d %H:%M')}")
+    print(f"   监控仓库: {', '.join(repos)}")
+    print("")
+
+    # git 镜像后端无法把提交邮箱对应到 GitHub 账号，团队模式使用 REST 列表
+    backend = "rest" if get_fetch_backend() == "git" else None
+    members = {u.lower() for u in users}
+    commits = collect_commits(repos, None, token, start_time, end_time,
+                              keep=lambda c: (c.get("author") or "").lower() in members,
+                              with_details=False, backend=backend)
+    by_user = partition_by_author(commits, users)
+    team_commits = [c for user in users for c in by_user[user]]
+
+    # compare 模式的区间合计会混入其他成员的改动，这里始终逐个 commit 获取详情
+    if team_commits:
+        print(f"  🔎 正在获取 {len(team_commits)} 个 commits 的详细改动...")
+        with run_trace.phase("detail_enrichment"):
+            fetch_details(team_commits, lambda c: get_commit_detail(c["repo"], commit_full_sha(c), token))
+
+    print("")
+    github_client.print_request_summary()
+    return by_user
+
+
+def write_reports(by_user, date_str, out_dir=DEFAULT_OUTPUT_DIR):
+    """每位成员输出 {user}.json（commits）和 {user}.txt（LLM 提示文本）"""
+    os.makedirs(out_dir, exist_ok=True)
+    for user, commits in by_user.items():
+        with open(os.path.join(out_dir, f"{user}.json"), "w") as f:
+            json.dump({"date": date_str, "user": user, "total_commits": len(commits), "commits": commits},
+                      f, indent=2, ensure_ascii=False)
+        with open(os.path.join(out_dir, f"{user}.txt"), "w") as f:
+            f.write(generate_llm_prompt(commits, date_str))
+        print(f"  👤 {user}: {len(commits)} 个 commits")
+    print(f"📁 报告已保存到: {out_dir}")
+
+
+def main():
+    args = sys.argv[1:]
+    users = get_team()
+    if "--users" in args:
+        users = [u.strip() for u in args[args.index("--users") + 1].split(",") if u.strip()]
+    if not users:
+        print("❌ 未配置团队成员，请在 config.json 中设置 team 或使用 --users")
+        return
+
+    now = datetime.now(timezone.utc)
+    start_time = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if "--date" in args:
+        start_time = datetime.strptime(args[args.index("--date") + 1], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    end_time = start_time + timedelta(days=1) - timedelta(seconds=1)
+    out_dir = args[args.index("--out") + 1] if "--out" in args else DEFAULT_OUTPUT_DIR
+
+    by_user = fetch_team_commits(users, start_time, end_time)
+    if by_user:
+        write_reports(by_user, start_time.strftime("%Y-%m-%d"), out_dir)
+
+
+if __name__ == "__main__":
+    run_trace.run(main)
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+watch 模式：常驻后台，让本地 commit 库始终是最新的，生成日报时直接读取本地库
+
+- 启动时把配置的仓库增量同步到 commit_store（从昨天 00:00 UTC 起，覆盖灵活版的默认范围）
+- webhook：在 watch_host:watch_port 接收 GitHub push 事件，用 webhook_secret 校验
+  X-Hub-Signature-256，payload 中自己的 commits 立即写入本地库（没有配置 secret 时不启动）；
+  branches 不是 all 时只接收默认分支的 push
+- 事件轮询（兜底）：带 ETag 轮询 /users/{user}/events，间隔取 watch_poll_interval 与
+  X-Poll-Interval 中的较大者；出现 PushEvent 的仓库按高水位增量同步
+- 后台线程为新 commits 获取 stats / files，写入 commit_store 和 detail_cache；
+  每 10 分钟按 detail_cache_max_mb 淘汰一次详情缓存并清空进程内 memo
+
+守护进程定期在 watch_state.json 写入心跳。心跳新鲜时 generate_report_v2.py /
+generate_report_flexible.py 不再请求列表接口，直接查询本地库（只为尚未补齐详情的 commits 发请求）。
+
+用法:
+  python watch_daemon.py [--no-webhook] [--no-poll]   启动守护进程（Ctrl+C 退出）
+  python watch_daemon.py status                       查看守护进程状态
+
+本地测试：benchmarks/mock_github.py 提供事件接口，benchmarks/webhook_sender.py 发送签名的 push payload。
+"""
+import hashlib
+import hmac
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+sys.path.insert(0, str(__file__).rsplit('/', 1)[0])
+from config_manager import CONFIG_DIR, ensure_config_dir, load_config
+from config_manager import get_github_token, get_github_username, get_repositories, get_branch_mode
+import run_trace
+
+STATE_FILE = CONFIG_DIR / "watch_state.json"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+DEFAULT_POLL_INTERVAL = 60
+# 启动同步覆盖的天数（昨天 00:00 UTC 起）
+SYNC_DAYS = 1
+HEARTBEAT_SECONDS = 15
+# 定期按 detail_cache_max_mb 淘汰详情缓存、清空进程内 memo（普通脚本只在退出时淘汰）
+MAINTENANCE_SECONDS = 600
+# 心跳超过这个秒数视为守护进程已停止
+STALE_SECONDS = 120
+# GitHub webhook payload 最大 25MB
+MAX_PAYLOAD_BYTES = 25 * 1024 * 1024
+
+
+def _iso(dt):
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _utc(value):
+    """push payload 的时间带本地时区偏移，统一为 UTC 的 GitHub 格式"""
+    return _iso(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+# ---- 状态 / 心跳 ----
+
+def load_state():
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def serving(start_time, username, repos):
+    """守护进程在运行、账号一致且本地库覆盖了 start_time 之后的所有配置仓库时返回状态，否则返回 None"""
+    state = load_state()
+    if not state or time.time() - state.get("heartbeat", 0) > STALE_SECONDS:
+        return None
+    if not _alive(state.get("pid", 0)) or state.get("username") != username:
+        return None
+    if state.get("since", "") > _iso(start_time) or not set(repos) <= set(state.get("repos", [])):
+        return None
+    return state
+
+
+def read_store(start_time, end_time, username, repos):
+    """
+    watch 守护进程在运行时直接从本地库读取时间范围内的 commits（按时间升序），否则返回 None
+
+    尚未补齐详情的 commits 不带 stats / files，由调用方照常补充。
+    """
+    state = serving(start_time, username, repos)
+    if not state:
+        return None
+    import commit_store
+    store = commit_store.CommitStore()
+    try:
+        commits = store.query(start_time, end_time, author=username, repos=repos)
+    finally:
+        store.close()
+    age = int(time.time() - state["heartbeat"])
+    print(f"📡 watch 守护进程在运行（{age} 秒前心跳），直接读取本地 commit 库")
+    return commits
+
+
+def print_status():
+    state = load_state()
+    if not state:
+        print("😴 watch 守护进程未运行")
+        return
+    age = int(time.time() - state.get("heartbeat", 0))
+    running = age <= STALE_SECONDS and _alive(state.get("pid", 0))
+    print(f"{'✅ 运行中' if running else '⚠️ 已停止'}（pid {state.get('pid')}，{age} 秒前心跳）")
+    print(f"   账号: {state.get('username')}，仓库: {len(state.get('repos', []))} 个，覆盖自 {state.get('since')}")
+    print(f"   webhook: {state.get('webhook') or '未启用'}，事件轮询: {'启用' if state.get('poll') else '未启用'}")
+    print(f"   已接收 push {state.get('pushes', 0)} 次，补齐详情 {state.get('enriched', 0)} 个，"
+          f"待补齐 {state.get('pending', 0)} 个")
+
+
+# ---- 后台补充详情 ----
+
+class Enricher:
+    """单个后台线程按入队顺序获取 commit 详情，写入 commit_store（detail_cache 由 get_commit_detail 写入）"""
+
+    def __init__(self, store, token):
+        self.store = store
+        self.token = token
+        self.queue = queue.Queue()
+        self.pending = set()
+        self.done = 0
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def add(self, items):
+        """加入 (repo, 完整 sha)，已在队列中的跳过"""
+        with self._lock:
+            for item in items:
+                item = tuple(item)
+                if item not in self.pending:
+                    self.pending.add(item)
+                    self.queue.put(item)
+
+    def _run(self):
+        from commit_source import get_commit_detail
+        while True:
+            repo, sha = self.queue.get()
+            try:
+                detail = get_commit_detail(repo, sha, self.token)
+                if detail:
+                    self.store.set_details(repo, sha, detail)
+                    self.done += 1
+            except Exception as e:
+                print(f"  ⚠️ {repo}@{sha[:7]} 详情获取失败: {e}")
+            finally:
+                # 失败的留在库里（has_details = 0），下次同步后重新入队
+                with self._lock:
+                    self.pending.discard((repo, sha))
+
+
+# ---- webhook ----
+
+def verify_signature(secret, body, header):
+    """校验 X-Hub-Signature-256（HMAC-SHA256，十六进制，前缀 sha256=）"""
+    if not secret or not header or not header.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, header[len("sha256="):])
+
+
+def tracks_ref(payload, all_branches):
+    """push 的 ref 是否在扫描范围内：branches=all 时任意分支，否则只有仓库的默认分支（不含 tag）"""
+    ref = payload.get("ref") or ""
+    if not ref.startswith("refs/heads/"):
+        return False
+    if all_branches:
+        return True
+    repository = payload["repository"]
+    default_branch = repository.get("default_branch") or repository.get("master_branch") or "main"
+    return ref == f"refs/heads/{default_branch}"
+
+
+def commits_from_push(payload, username):
+    """从 push payload 中取出 username 的 commits，返回 (repo, commits)"""
+    from fetch_engine import login_from_email
+    repo = payload["repository"]["full_name"]
+    commits = []
+    for c in payload.get("commits") or []:
+        author = c.get("author") or {}
+        login = author.get("username") or login_from_email(author.get("email"))
+        if (login or "").lower() != username.lower():
+            continue
+        commits.append({
+            "sha": c["id"][:7],
+            "message": c["message"],
+            "repo": repo,
+            "url": c["url"],
+            "time": _utc(c["timestamp"])
+        })
+    return repo, commits
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    daemon = None
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, message):
+        body = json.dumps({"message": message}, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        header = self.headers.get("Content-Length")
+        if header is None:
+            return self._reply(411, "Content-Length required")
+        try:
+            length = int(header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            return self._reply(400, f"bad Content-Length: {header}")
+        if length > MAX_PAYLOAD_BYTES:
+            return self._reply(413, "payload too large")
+        body = self.rfile.read(length)
+        if not verify_signature(self.daemon.secret, body, self.headers.get("X-Hub-Signature-256")):
+            print("  🚫 webhook 签名校验失败，已拒绝")
+            return self._reply(401, "invalid signature")
+
+        event = self.headers.get("X-GitHub-Event")
+        if event == "ping":
+            return self._reply(200, "pong")
+        if event != "push":
+            return self._reply(202, f"ignored event: {event}")
+        try:
+            payload = json.loads(body)
+            if not tracks_ref(payload, self.daemon.all_branches):
+                return self._reply(202, f"ignored ref: {payload.get('ref')}")
+            repo, commits = commits_from_push(payload, self.daemon.username)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return self._reply(400, f"bad payload: {e}")
+        added = self.daemon.on_push(repo, commits)
+        return self._reply(202, f"{added} new commits")
+
+
+# ---- 事件轮询 ----
+
+class EventsPoller:
+    """带 ETag 轮询 /users/{user}/events，新的 PushEvent 所在仓库交给 on_push_repos 同步"""
+
+    def __init__(self, username, token, repos, on_push_repos, interval=DEFAULT_POLL_INTERVAL):
+        self.path = f"/users/{username}/events"
+        self.token = token
+        self.repos = set(repos)
+        self.on_push_repos = on_push_repos
+        self.interval = interval
+        self.etag = None
+        # 已处理的最新事件 ID；第一次轮询只记录位置（启动同步已经覆盖之前的事件）
+        self.last_id = None
+
+    def poll_once(self):
+        """轮询一次，返回下次轮询前等待的秒数"""
+        import github_client
+        headers = {"If-None-Match": self.etag} if self.etag else None
+        response = github_client.get(self.path, self.token, params={"per_page": 100}, headers=headers,
+                                     use_cache=False)
+        wait = max(self.interval, int(response.headers.get("X-Poll-Interval") or 0))
+        if response.status_code == 304:
+            return wait
+        if response.status_code != 200:
+            print(f"  ⚠️ 事件轮询失败: {response.status_code}")
+            return wait
+        self.etag = response.headers.get("ETag")
+
+        events = response.json()
+        newest = max((int(e["id"]) for e in events), default=self.last_id)
+        if self.last_id is not None:
+            pushed = [e["repo"]["name"] for e in events
+                      if int(e["id"]) > self.last_id and e.get("type") == "PushEvent"]
+            pushed = [r for r in dict.fromkeys(pushed) if r in self.repos]
+            if pushed:
+                self.on_push_repos(pushed)
+        self.last_id = newest
+        return wait
+
+    def run(self):
+        while True:
+            try:
+                wait = self.poll_once()
+            except Exception as e:
+                print(f"  ⚠️ 事件轮询失败: {e}")
+                wait = self.interval
+            time.sleep(wait)
+
+
+# ---- 守护进程 ----
+
+class WatchDaemon:
+    def __init__(self, token, username, repos, config):
+        import commit_store
+        self.token = token
+        self.username = username
+        self.repos = repos
+        self.secret = config.get("webhook_secret")
+        self.host = config.get("watch_host", DEFAULT_HOST)
+        self.port = int(config.get("watch_port", DEFAULT_PORT))
+        self.poll_interval = int(config.get("watch_poll_interval", DEFAULT_POLL_INTERVAL))
+        # 与列表同步一致：默认只接收默认分支的 push
+        self.all_branches = get_branch_mode() == "all"
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.since = today - timedelta(days=SYNC_DAYS)
+        self.store = commit_store.CommitStore()
+        self.enricher = Enricher(self.store, token)
+        self.pushes = 0
+        self.webhook_url = None
+        self.poll = False
+        self.started_at = _iso(datetime.now(timezone.utc))
+        self._sync_lock = threading.Lock()
+        # webhook、轮询线程和心跳循环都会写状态文件
+        self._state_lock = threading.Lock()
+
+    def sync(self, repos):
+        """增量同步列表，缺少详情的 commits 交给后台线程"""
+        import commit_store
+        with self._sync_lock:
+            added = commit_store.sync(self.store, repos, self.username, self.token, self.since,
+                                      with_details=False)
+        self.enricher.add(self.store.missing_details(self.username))
+        return added
+
+    def on_push(self, repo, commits):
+        """webhook 收到的 commits 直接写入本地库，不改动同步高水位（由轮询 / 启动同步维护）"""
+        self.pushes += 1
+        if repo not in self.repos:
+            print(f"  📭 {repo} 不在监控列表中，忽略 push")
+            return 0
+        added = self.store.add_commits(commits, self.username)
+        print(f"  📬 webhook: {repo} 新增 {added} 个 commits")
+        self.enricher.add((repo, c["url"].rsplit("/", 1)[-1]) for c in commits)
+        self.write_state()
+        return added
+
+    def on_push_repos(self, repos):
+        added = self.sync(repos)
+        print(f"  🔔 事件轮询: {', '.join(repos)} 有新 push，新增 {added} 个 commits")
+        self.write_state()
+
+    def maintain(self):
+        """常驻运行时定期限制详情缓存和 ETag 缓存的磁盘占用，以及详情 memo 的内存占用"""
+        import detail_cache
+        import github_client
+        try:
+            detail_cache.evict()
+            cache = github_client.get_cache()
+            if cache:
+                cache.evict()
+        except Exception as e:
+            print(f"  ⚠️ 缓存淘汰失败: {e}")
+        detail_cache.clear_memo()
+
+    def write_state(self):
+        state = {
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "heartbeat": time.time(),
+            "username": self.username,
+            "repos": self.repos,
+            "since": _iso(self.since),
+            "webhook": self.webhook_url,
+            "poll": self.poll,
+            "pushes": self.pushes,
+            "enriched": self.enricher.done,
+            "pending": len(self.enricher.pending),
+        }
+        tmp = f"{STATE_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._state_lock:
+            with open(tmp, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp, STATE_FILE)
+
+    def start_webhook(self):
+        if not self.secret:
+            print("⚠️ 未配置 webhook_secret，不启动 webhook 接收（只使用事件轮询）")
+            return None
+        handler = type("BoundWebhookHandler", (WebhookHandler,), {"daemon": self})
+        server = ThreadingHTTPServer((self.host, self.port), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.webhook_url = f"http://{self.host}:{server.server_address[1]}/"
+        print(f"📮 webhook 接收: {self.webhook_url}（Content type 选 application/json，事件选 push）")
+        return server
+
+    def run(self, webhook=True, poll=True):
+        ensure_config_dir()
+        print(f"👀 watch 模式：{self.username}，{len(self.repos)} 个仓库")
+        print(f"🔄 正在同步 {self.since.strftime('%Y-%m-%d')} 以来的 commits...")
+        added = self.sync(self.repos)
+        print(f"✅ 本地库新增 {added} 个 commits，{len(self.enricher.pending)} 个 commits 在后台补充详情")
+
+        server = self.start_webhook() if webhook else None
+        if poll:
+            poller = EventsPoller(self.username, self.token, self.repos, self.on_push_repos, self.poll_interval)
+            threading.Thread(target=poller.run, daemon=True).start()
+            self.poll = True
+            print(f"📡 事件轮询: 每 {self.poll_interval} 秒（服务端 X-Poll-Interval 更大时以其为准）")
+        if not server and not poll:
+            print("❌ webhook 和事件轮询都未启用")
+            return
+
+        last_maintenance = time.monotonic()
+        try:
+            while True:
+                self.write_state()
+                if time.monotonic() - last_maintenance >= MAINTENANCE_SECONDS:
+                    self.maintain()
+                    last_maintenance = time.monotonic()
+                time.sleep(HEARTBEAT_SECONDS)
+        except KeyboardInterrupt:
+            print("")
+            print("👋 watch 模式已退出")
+        finally:
+            if server:
+                server.shutdown()
+            try:
+                os.remove(STATE_FILE)
+            except OSError:
+                pass
+            self.store.close()
+
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ["status"]:
+        print_status()
+        return
+    token = get_github_token()
+    username = get_github_username()
+    repos = get_repositories()
+    if not token or not username:
+        print("❌ GitHub 配置不完整")
+        return
+    if not repos:
+        print("❌ 未配置监控的仓库列表")
+        return
+    WatchDaemon(token, username, repos, load_config()).run(
+        webhook="--no-webhook" not in args, poll="--no-poll" not in args)
+
+
+if __name__ == "__main__":
+    run_trace.run(main)